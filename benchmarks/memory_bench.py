@@ -0,0 +1,95 @@
+# Edge Light - Memory Benchmark
+# Headless RSS measurement of the low-memory transitions
+#
+#   python benchmarks/memory_bench.py            # low-memory mode
+#   python benchmarks/memory_bench.py --normal   # resources kept resident
+
+import os
+import sys
+import tempfile
+import time
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from PyQt5.QtWidgets import QApplication
+from PyQt5.QtCore import QEvent
+
+import settings_manager
+from memory import get_rss_bytes
+
+SETTLE_SECONDS = 0.3
+
+
+def settle(app):
+    """Run the event loop briefly, including deferred deletes."""
+    deadline = time.monotonic() + SETTLE_SECONDS
+    while time.monotonic() < deadline:
+        app.processEvents()
+        app.sendPostedEvents(None, QEvent.DeferredDelete)
+        time.sleep(0.01)
+
+
+def main():
+    low_memory = '--normal' not in sys.argv
+
+    # Keep the benchmark away from the real settings file
+    data_dir = tempfile.mkdtemp(prefix="edgelight_bench_")
+    settings_manager.get_settings_path = lambda: os.path.join(data_dir, 'settings.json')
+
+    app = QApplication(sys.argv)
+    samples = []
+
+    def sample(label):
+        rss = get_rss_bytes()
+        samples.append((label, rss))
+
+    sample("qt_application")
+
+    from overlay import GlowOverlay
+    from tray import TrayManager
+
+    settings = settings_manager.get_settings_manager()
+    settings.set('low_memory_mode', low_memory)
+    settings.set('fade_duration_ms', 0)
+    tray = TrayManager(GlowOverlay, settings)
+    settle(app)
+    sample("tray_ready")
+
+    tray._show_popup()
+    settle(app)
+    sample("popup_shown")
+
+    tray.popup.hide()
+    if low_memory:
+        tray._release_popup()   # What the release timer does after the delay
+    settle(app)
+    sample("popup_hidden")
+
+    tray.set_enabled(True)
+    tray.overlay.repaint()
+    settle(app)
+    sample("light_on")
+
+    tray.set_enabled(False)
+    settle(app)
+    sample("light_off")
+
+    tray.autostart.shutdown()
+
+    mode = "low-memory" if low_memory else "normal"
+    print(f"Edge Light RSS ({mode} mode, {app.platformName()})")
+    previous = None
+    for label, rss in samples:
+        if rss is None:
+            print(f"  {label:<16} unavailable")
+            continue
+        delta = "" if previous is None else f"  ({(rss - previous) / 1024 / 1024:+.2f} MB)"
+        print(f"  {label:<16} {rss / 1024 / 1024:8.2f} MB{delta}")
+        previous = rss
+    print(f"  popup resident: {tray.popup is not None}, "
+          f"overlay caches resident: {bool(tray.overlay._plans)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+# Edge Light - Background Rendering Benchmark
+# GUI-thread cost while a slider is dragged across a ring drawn by a
+# static plugin renderer (the "glow" gradient from plugins/ by default)
+#
+#   python benchmarks/raster_bench.py               # renderer on the worker thread
+#   python benchmarks/raster_bench.py --sync        # everything on the GUI thread
+#   python benchmarks/raster_bench.py --size=15360x8640 --steps=120 --renderer=bands
+
+import os
+import sys
+import tempfile
+import time
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from PyQt5.QtWidgets import QApplication
+
+import settings_manager
+from metrics import get_metrics
+
+FRAME_INTERVAL = 1 / 60     # Slider events arrive at display refresh rate
+PLUGINS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'plugins')
+
+
+def get_option(name, default=None):
+    prefix = f"--{name}="
+    for arg in sys.argv[1:]:
+        if arg.startswith(prefix):
+            return arg[len(prefix):]
+    return default
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def main():
+    background = '--sync' not in sys.argv
+    width, height = (int(v) for v in get_option('size', '7680x4320').split('x'))
+    steps = int(get_option('steps', 120))
+    renderer_name = get_option('renderer', 'glow')
+
+    data_dir = tempfile.mkdtemp(prefix="edgelight_bench_")
+    settings_manager.get_settings_path = lambda: os.path.join(data_dir, 'settings.json')
+
+    app = QApplication(sys.argv)
+    from overlay import GlowOverlay
+    from renderers import RendererRegistry
+
+    renderer = RendererRegistry(PLUGINS_DIR).create(renderer_name)
+    if renderer is None or renderer.animated:
+        sys.exit(f"error: {renderer_name!r} is not a static plugin renderer")
+
+    overlay = GlowOverlay()
+    overlay.set_renderer(renderer, budget_ms=60_000)   # Measure, never fall back
+    overlay.set_fade_duration(0)
+    overlay.set_transition_duration(0)
+    overlay.set_background_rendering(background)
+    overlay.set_glow_width(400)
+    overlay.set_exclusion_zones([[width // 3, 0, width // 3, 200], [0, height // 2, 300, 300]])
+    overlay.set_enabled(True)
+    overlay.setGeometry(0, 0, width, height)
+    app.processEvents()
+    if overlay._background is not None:
+        overlay._background.wait()
+    app.processEvents()
+
+    metrics = get_metrics()
+    renders = metrics.counter('overlay.background_renders')
+    paints = metrics.counter('overlay.paints')
+    renders_before = renders.snapshot()
+    paints_before = paints.snapshot()
+    paint_total_before = metrics.histogram('overlay.paint').total
+
+    # Time the GUI thread spends per slider step: the change itself plus
+    # the event processing (paints) it causes, not the idle wait
+    busy_ms = []
+    started = time.perf_counter()
+    for step in range(steps):
+        tick = time.perf_counter()
+        overlay.set_brightness(step % 101)
+        busy = time.perf_counter() - tick
+        while time.perf_counter() - tick < FRAME_INTERVAL:
+            t0 = time.perf_counter()
+            app.processEvents()
+            busy += time.perf_counter() - t0
+            time.sleep(0.001)
+        busy_ms.append(busy * 1000)
+    drag_renders = renders.snapshot() - renders_before
+    engaged = overlay._background is not None
+    if engaged:
+        overlay._background.wait()
+    app.processEvents()
+    elapsed = time.perf_counter() - started
+    paint_count = paints.snapshot() - paints_before
+    paint_ms = metrics.histogram('overlay.paint').total - paint_total_before
+
+    mode = "background" if background else "synchronous"
+    print(f"Edge Light {renderer_name!r} renderer ({mode}, {width}x{height}, {app.platformName()})")
+    print(f"  {steps} slider steps in {elapsed:.2f} s")
+    print(f"  GUI ms per step: mean {sum(busy_ms) / len(busy_ms):.2f}, "
+          f"p95 {percentile(busy_ms, 0.95):.2f}, max {max(busy_ms):.2f}")
+    over_budget = sum(1 for ms in busy_ms if ms > FRAME_INTERVAL * 1000)
+    print(f"  steps over the {FRAME_INTERVAL * 1000:.1f} ms frame budget: {over_budget}")
+    print(f"  paints: {paint_count}, {paint_ms:.0f} ms on the GUI thread in all")
+    if background:
+        print(f"  background images completed: {drag_renders} during the drag, "
+              f"{renders.snapshot() - renders_before} in all")
+        # The numbers above are only worth comparing if the worker did the painting
+        if not engaged:
+            sys.exit("error: the renderer never ran on the worker thread")
+        if not drag_renders:
+            sys.exit("error: no background image finished while the slider moved")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+# Edge Light - Golden Render Comparison
+# Sweeps random ring configurations and compares the overlay's Qt output
+# (offscreen) with the NumPy reference rasterizer. Needs numpy.
+#
+#   python benchmarks/render_compare.py                      # 2000 configs
+#   python benchmarks/render_compare.py --count=10000 --seed=7
+#   python benchmarks/render_compare.py --tolerance=2 --save-failures=out/
+#   python benchmarks/render_compare.py --ratios=1,1.25,1.5,1.75,2   # display scales
+#   python benchmarks/render_compare.py --reference-only     # rasterizer speed
+
+import os
+import random
+import sys
+import time
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+try:
+    import numpy as np
+except ImportError:
+    sys.exit("render_compare needs numpy (pip install numpy)")
+
+from PyQt5.QtWidgets import QApplication
+from PyQt5.QtGui import QImage
+
+from constants import (
+    EDGE_OPTIONS, BRIGHTNESS_MIN, BRIGHTNESS_MAX, COLOR_TEMP_MIN, COLOR_TEMP_MAX,
+    GLOW_WIDTH_MIN, GLOW_WIDTH_MAX,
+)
+from render_plan import (
+    EDGES, parse_edge_specs, parse_exclusion_zones,
+    scale_edge_specs, scale_rect, to_device_pixels,
+)
+from reference_render import rasterize_ring, diff_frames, diff_image
+
+MAX_REPORTED_FAILURES = 10
+
+
+def get_option(name, default=None):
+    prefix = f"--{name}="
+    for arg in sys.argv[1:]:
+        if arg.startswith(prefix):
+            return arg[len(prefix):]
+    return default
+
+
+def random_config(rng: random.Random, ratios) -> dict:
+    """One overlay configuration, in settings terms plus a screen size and scale."""
+    width = rng.randint(16, 640)
+    height = rng.randint(16, 480)
+    edge_specs = {}
+    for edge in EDGES:
+        if rng.random() < 0.3:
+            spec = {}
+            if rng.random() < 0.5:
+                spec['enabled'] = rng.random() < 0.5
+            if rng.random() < 0.5:
+                spec['thickness'] = rng.randint(GLOW_WIDTH_MIN, GLOW_WIDTH_MAX)
+            if rng.random() < 0.5:
+                spec['inset'] = rng.randint(0, 120)
+            if rng.random() < 0.3:
+                spec['brightness'] = rng.randint(BRIGHTNESS_MIN, BRIGHTNESS_MAX)
+            if rng.random() < 0.3:
+                spec['color_temperature'] = rng.randint(COLOR_TEMP_MIN, COLOR_TEMP_MAX)
+            edge_specs[edge] = spec
+    zones = [
+        [rng.randint(-50, width), rng.randint(-50, height),
+         rng.randint(1, width), rng.randint(1, height)]
+        for _ in range(rng.choice((0, 0, 1, 2)))
+    ]
+    return {
+        'width': width,
+        'height': height,
+        'edge_selection': rng.choice(EDGE_OPTIONS)[0],
+        'glow_width': rng.randint(GLOW_WIDTH_MIN, GLOW_WIDTH_MAX),
+        'brightness': rng.randint(BRIGHTNESS_MIN, BRIGHTNESS_MAX),
+        'color_temperature': rng.randint(COLOR_TEMP_MIN, COLOR_TEMP_MAX),
+        'max_brightness': rng.choice((None, None, rng.randint(0, 100))),
+        'edge_specs': edge_specs,
+        'exclusion_zones': zones,
+        'ratio': rng.choice(ratios),
+    }
+
+
+def expected_frame(config: dict) -> np.ndarray:
+    """The reference frame in device pixels (logical sizes scaled by the ratio)."""
+    ratio = config['ratio']
+    return rasterize_ring(
+        scale_edge_specs(parse_edge_specs(config['edge_specs']), ratio),
+        to_device_pixels(config['width'], ratio), to_device_pixels(config['height'], ratio),
+        config['edge_selection'], to_device_pixels(config['glow_width'], ratio),
+        config['brightness'], config['color_temperature'],
+        max_brightness=config['max_brightness'],
+        exclusion_zones=[scale_rect(zone, ratio)
+                         for zone in parse_exclusion_zones(config['exclusion_zones'])],
+        premultiplied=True,
+    )
+
+
+def apply_config(overlay, config: dict) -> None:
+    overlay.set_edge_selection(config['edge_selection'])
+    overlay.set_glow_width(config['glow_width'])
+    overlay.set_brightness(config['brightness'])
+    overlay.set_color_temperature(config['color_temperature'])
+    overlay.set_brightness_limit(config['max_brightness'])
+    overlay.set_edge_specs(config['edge_specs'])
+    overlay.set_exclusion_zones(config['exclusion_zones'])
+
+
+def qimage_to_rgba(image: QImage) -> np.ndarray:
+    """(height, width, 4) premultiplied RGBA array from a QImage."""
+    image = image.convertToFormat(QImage.Format_ARGB32_Premultiplied)
+    width, height = image.width(), image.height()
+    data = np.frombuffer(image.constBits().asstring(image.sizeInBytes()), dtype=np.uint8)
+    bgra = data.reshape(height, image.bytesPerLine() // 4, 4)[:, :width]
+    return bgra[..., [2, 1, 0, 3]]
+
+
+def save_rgba(path: str, frame: np.ndarray) -> None:
+    height, width = frame.shape[:2]
+    data = np.ascontiguousarray(frame).tobytes()
+    QImage(data, width, height, width * 4, QImage.Format_RGBA8888_Premultiplied).save(path)
+
+
+def main():
+    count = int(get_option('count', 2000))
+    seed = int(get_option('seed', 1))
+    tolerance = int(get_option('tolerance', 1))
+    failures_dir = get_option('save-failures')
+    ratios = [float(r) for r in get_option('ratios', '1').split(',')]
+    rng = random.Random(seed)
+    configs = [random_config(rng, ratios) for _ in range(count)]
+
+    if '--reference-only' in sys.argv:
+        started = time.perf_counter()
+        pixels = 0
+        for config in configs:
+            pixels += expected_frame(config)[..., 0].size
+        elapsed = time.perf_counter() - started
+        print(f"Reference rasterizer: {count} frames, {pixels / 1e6:.1f} Mpx "
+              f"in {elapsed:.2f} s ({count / elapsed:.0f} frames/s)")
+        return
+
+    app = QApplication(sys.argv)
+    from overlay import GlowOverlay
+    overlay = GlowOverlay()
+
+    failures = []
+    worst = 0
+    reference_time = qt_time = 0.0
+    for index, config in enumerate(configs):
+        t0 = time.perf_counter()
+        expected = expected_frame(config)
+        t1 = time.perf_counter()
+        apply_config(overlay, config)
+        actual = qimage_to_rgba(
+            overlay.render_to_image(config['width'], config['height'], config['ratio'])
+        )
+        t2 = time.perf_counter()
+        reference_time += t1 - t0
+        qt_time += t2 - t1
+
+        result = diff_frames(expected, actual, tolerance)
+        worst = max(worst, result.max_error)
+        if result.mismatched:
+            failures.append((index, config, result))
+            if failures_dir:
+                os.makedirs(failures_dir, exist_ok=True)
+                stem = os.path.join(failures_dir, f"config_{index:05d}")
+                save_rgba(stem + "_expected.png", expected)
+                save_rgba(stem + "_actual.png", actual)
+                save_rgba(stem + "_diff.png", diff_image(expected, actual, tolerance))
+
+    print(f"Edge Light render comparison ({app.platformName()}, seed {seed}, "
+          f"tolerance {tolerance})")
+    print(f"  {count} configurations, {len(failures)} mismatched, worst channel error {worst}")
+    print(f"  reference {reference_time:.2f} s, Qt {qt_time:.2f} s")
+    for index, config, result in failures[:MAX_REPORTED_FAILURES]:
+        print(f"  #{index}: {result.mismatched}/{result.total} px off "
+              f"(max {result.max_error}) {config}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+# Edge Light - Replay Benchmark
+# Headless replay of a session recorded with --record
+#
+#   python benchmarks/replay_bench.py recording.jsonl               # recorded timing
+#   python benchmarks/replay_bench.py recording.jsonl --speed=max   # back to back
+#   python benchmarks/replay_bench.py recording.jsonl --json out.json
+
+import json
+import os
+import sys
+import tempfile
+import time
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from PyQt5.QtWidgets import QApplication
+from PyQt5.QtCore import QEvent
+
+import settings_manager
+from constants import POLICY_ENV
+from metrics import get_metrics
+from recorder import load_recording
+
+COUNTERS = ('overlay.paints', 'settings.writes', 'settings.bytes_written')
+
+
+def get_option(name, default=None):
+    prefix = f"--{name}="
+    for i, arg in enumerate(sys.argv):
+        if arg.startswith(prefix):
+            return arg[len(prefix):]
+        if arg == f"--{name}" and i + 1 < len(sys.argv):
+            return sys.argv[i + 1]
+    return default
+
+
+def build_handlers(tray):
+    """Map recorded event names to the handlers the live app would run."""
+    hotkeys = {'toggle': tray.toggle, 'panel': tray.open_panel}
+    return {
+        'brightness': tray._on_brightness_changed,
+        'color_temperature': tray._on_temperature_changed,
+        'glow_width': tray._on_width_changed,
+        'edge_selection': tray._on_edge_selection_changed,
+        'toggle': lambda value: tray.toggle(),
+        'breathing': tray._on_breathing_changed,
+        'schedule': tray._on_schedule_changed,
+        'call_watch': tray._on_call_watch_changed,
+        'tray_click': lambda value: tray._show_popup(),
+        'hotkey': lambda value: hotkeys[value](),
+        'screen': lambda value: tray.overlay.setGeometry(0, 0, value[0], value[1]),
+    }
+
+
+def pump(app):
+    app.processEvents()
+    app.sendPostedEvents(None, QEvent.DeferredDelete)
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def main():
+    paths = [arg for arg in sys.argv[1:] if not arg.startswith('--')
+             and arg != get_option('json')]
+    if not paths:
+        print("usage: replay_bench.py recording.jsonl [--speed=max] [--json out.json]")
+        sys.exit(2)
+    header, events = load_recording(paths[0])
+    max_speed = get_option('speed', 'recorded') == 'max'
+
+    # Start from the recorded policy and user layers, away from the real
+    # files, so locked and policy-default values stay policy values
+    data_dir = tempfile.mkdtemp(prefix="edgelight_replay_")
+    settings_path = os.path.join(data_dir, 'settings.json')
+    policy_path = os.path.join(data_dir, 'policy.json')
+    with open(settings_path, 'w', encoding='utf-8') as f:
+        json.dump(header.get('settings', {}), f)
+    with open(policy_path, 'w', encoding='utf-8') as f:
+        json.dump(header.get('policy', {}), f)
+    settings_manager.get_settings_path = lambda: settings_path
+    os.environ[POLICY_ENV] = policy_path
+
+    app = QApplication(sys.argv)
+
+    from core import EdgeLightCore
+    from hotkey import NullHotkeyManager
+    from autostart import AutostartBackend
+
+    # No keyboard hook or login item: recorded hotkeys are replayed directly
+    core = EdgeLightCore(settings_manager.get_settings_manager(),
+                         hotkey_backend=NullHotkeyManager(),
+                         autostart_backend=AutostartBackend(),
+                         show_tray_icon=False)
+    core.start()
+    tray = core.tray
+    tray.ensure_initialized()
+    width, height = header.get('screen', (1920, 1080))
+    tray.overlay.setGeometry(0, 0, width, height)
+    pump(app)
+
+    handlers = build_handlers(tray)
+    metrics = get_metrics()
+    before = {name: metrics.counter(name).snapshot() for name in COUNTERS}
+    latencies = {}
+    skipped = 0
+
+    start = time.perf_counter()
+    for t_ms, event, value in events:
+        handler = handlers.get(event)
+        if handler is None:
+            skipped += 1
+            continue
+        if not max_speed:
+            # Idle (but keep the event loop running) until the recorded time
+            while (time.perf_counter() - start) * 1000 < t_ms:
+                pump(app)
+                time.sleep(0.001)
+        began = time.perf_counter()
+        handler(value)
+        pump(app)
+        latencies.setdefault(event, []).append((time.perf_counter() - began) * 1000)
+    total_ms = (time.perf_counter() - start) * 1000
+
+    core.stop()
+
+    report = {
+        'recording': os.path.abspath(paths[0]),
+        'speed': 'max' if max_speed else 'recorded',
+        'platform': app.platformName(),
+        'events': sum(len(v) for v in latencies.values()),
+        'skipped': skipped,
+        'total_ms': round(total_ms, 3),
+        'counters': {name: metrics.counter(name).snapshot() - before[name] for name in COUNTERS},
+        'latency_ms': {
+            event: {
+                'count': len(samples),
+                'mean': round(sum(samples) / len(samples), 3),
+                'p95': round(percentile(samples, 0.95), 3),
+                'max': round(max(samples), 3),
+            }
+            for event, samples in sorted(latencies.items())
+        },
+    }
+
+    print(f"Edge Light replay ({report['speed']} speed, {report['platform']})")
+    print(f"  {report['events']} events in {total_ms:.1f} ms"
+          + (f", {skipped} unknown skipped" if skipped else ""))
+    for name, delta in report['counters'].items():
+        print(f"  {name:<24} {delta}")
+    print(f"  {'event':<18} {'count':>6} {'mean ms':>9} {'p95 ms':>9} {'max ms':>9}")
+    for event, stats in report['latency_ms'].items():
+        print(f"  {event:<18} {stats['count']:>6} {stats['mean']:>9.3f} "
+              f"{stats['p95']:>9.3f} {stats['max']:>9.3f}")
+
+    json_path = get_option('json')
+    if json_path:
+        with open(json_path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+# Edge Light - Usage Log Benchmark
+# Append throughput, reopen cost and stats query time for a usage history,
+# compared with rebuilding the rollups from every segment
+#
+#   python benchmarks/usage_bench.py                        # 60 days, 500 changes/day
+#   python benchmarks/usage_bench.py --days=90 --changes=2000
+
+import os
+import random
+import sys
+import tempfile
+import time
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from PyQt5.QtWidgets import QApplication
+
+from metrics import get_metrics
+from usage_log import UsageLog, UsageRollups, ROLLUPS_FILENAME
+
+
+def get_option(name, default=None):
+    prefix = f"--{name}="
+    for arg in sys.argv[1:]:
+        if arg.startswith(prefix):
+            return arg[len(prefix):]
+    return default
+
+
+def flush_and_wait(app, log):
+    """Let the writer fold everything (after its catch-up), the way Diagnostics does."""
+    done = []
+    log.flushed.connect(lambda: done.append(True))
+    log.flush()
+    while not done:
+        app.processEvents()
+        time.sleep(0.0005)
+
+
+def main():
+    days = int(get_option('days', 60))
+    changes = int(get_option('changes', 500))
+    app = QApplication(sys.argv)
+
+    directory = tempfile.mkdtemp(prefix="edgelight_usage_")
+    rng = random.Random(1)
+    state = [False, 60, 4500, 175, 0.25]
+    clock = [time.time() - days * 86400]
+
+    # History: `changes` state changes spread over each day
+    written = get_metrics().counter('usage.records')
+    log = UsageLog(lambda: tuple(state), directory, 15, clock=lambda: clock[0])
+    log.start()
+    started = time.perf_counter()
+    for _ in range(days * changes):
+        clock[0] += 86400 / changes
+        state[0] = rng.random() < 0.6
+        state[1] = rng.randint(20, 100)
+        log.sample()
+    log.close()
+    write_s = time.perf_counter() - started
+    records = written.snapshot()   # Off -> off samples aren't logged
+    size = sum(os.path.getsize(os.path.join(directory, n)) for n in os.listdir(directory))
+
+    # Reopening reads the rollups and only the records after the cursor
+    started = time.perf_counter()
+    log = UsageLog(lambda: tuple(state), directory, 15, clock=lambda: clock[0])
+    log.start()
+    flush_and_wait(app, log)
+    stats = log.stats(days)
+    reopen_s = time.perf_counter() - started
+    started = time.perf_counter()
+    log.stats(days)
+    query_s = time.perf_counter() - started
+    log.close()
+
+    # What every startup would cost without rollups
+    os.remove(os.path.join(directory, ROLLUPS_FILENAME))
+    started = time.perf_counter()
+    UsageRollups(15).catch_up(directory)
+    rebuild_s = time.perf_counter() - started
+
+    on_hours = sum(totals.on_seconds for _, totals in stats) / 3600
+    energy = sum(totals.energy_wh for _, totals in stats)
+    print(f"Edge Light usage log ({days} days, {changes} changes/day, {app.platformName()})")
+    print(f"  {records} records, {size / 1024:.0f} KB on disk")
+    print(f"  append + flush:   {write_s:.2f} s ({records / write_s:,.0f} records/s)")
+    print(f"  reopen + stats:   {reopen_s * 1000:.1f} ms")
+    print(f"  stats query:      {query_s * 1000:.1f} ms")
+    print(f"  full rebuild:     {rebuild_s * 1000:.1f} ms (avoided at startup)")
+    print(f"  history: {on_hours:.1f} h on, {energy:.0f} Wh")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+# Edge Light - Example Renderer Plugins
+# Set "renderer" to "rounded", "bands", "glow" or "pulse" in edgelight_settings.json
+#
+# A plugin is any .py file in this folder with a RENDERERS list of
+# RingRenderer subclasses. See src/renderers.py for the interface.
+
+import math
+
+from PyQt5.QtCore import QPointF, QRect, QRectF, Qt
+from PyQt5.QtGui import QColor, QImage, QLinearGradient, QPainter, QPainterPath, QRegion
+
+from renderers import RingRenderer, FillPath, FillRect, fill_in_bands
+
+BRAND_COLOR = QColor(0, 120, 215)
+BAND_COUNT = 12
+PULSE_PERIOD_S = 2.0
+PULSE_LOW = 0.4     # Dimmest point of the pulse, as a fraction of the ring's alpha
+
+
+class RoundedRingRenderer(RingRenderer):
+    """The solid ring with rounded outer and inner corners."""
+
+    name = "rounded"
+
+    def render(self, geometry, now):
+        lit = QRegion()
+        for rect, _ in geometry.plan:
+            lit = lit.united(QRegion(rect))
+        if lit.isEmpty():
+            return []
+        radius = geometry.glow_width
+
+        outline = QPainterPath()
+        outline.addRoundedRect(QRectF(0, 0, geometry.width, geometry.height), radius, radius)
+        hole = QRegion(0, 0, geometry.width, geometry.height).subtracted(lit).boundingRect()
+        if not hole.isEmpty():
+            inner = QPainterPath()
+            inner.addRoundedRect(QRectF(hole), radius, radius)
+            outline = outline.subtracted(inner)
+        lit_path = QPainterPath()
+        lit_path.addRegion(lit)
+        return [FillPath(outline.intersected(lit_path), geometry.color)]
+
+
+class BandsRenderer(RingRenderer):
+    """Alternating ring-colour and brand-colour bands, painted once into an image."""
+
+    name = "bands"
+
+    def render(self, geometry, now):
+        brand = QColor(BRAND_COLOR)
+        brand.setAlpha(geometry.color.alpha())
+        image = QImage(geometry.width, geometry.height, QImage.Format_ARGB32_Premultiplied)
+        image.fill(Qt.transparent)
+        painter = QPainter(image)
+        band = max(1, max(geometry.width, geometry.height) // BAND_COUNT)
+        for rect, color in geometry.plan:
+            horizontal = rect.width() >= rect.height()
+            start, length = (rect.x(), rect.width()) if horizontal else (rect.y(), rect.height())
+            # Bands are aligned to the screen, so they line up across edges
+            for offset in range(start - start % band, start + length, band):
+                lo, hi = max(offset, start), min(offset + band, start + length)
+                if horizontal:
+                    piece = QRect(lo, rect.y(), hi - lo, rect.height())
+                else:
+                    piece = QRect(rect.x(), lo, rect.width(), hi - lo)
+                painter.fillRect(piece, brand if (offset // band) % 2 else color)
+        painter.end()
+        return image
+
+
+class GlowRenderer(RingRenderer):
+    """The ring fading from full colour at the screen edge to nothing at its inner edge."""
+
+    name = "glow"
+
+    def render(self, geometry, now):
+        faded = QColor(geometry.color)
+        faded.setAlpha(0)
+        # Every lit pixel is written outright, so there is nothing to clear
+        image = QImage(geometry.width, geometry.height, QImage.Format_ARGB32_Premultiplied)
+        painter = QPainter(image)
+        painter.setCompositionMode(QPainter.CompositionMode_Source)
+        for rect, color in geometry.plan:
+            # Fade away from whichever screen edge the rect lies along
+            if rect.width() >= rect.height():
+                outer, inner = QPointF(0, rect.top()), QPointF(0, rect.bottom() + 1)
+                if rect.center().y() > geometry.height // 2:
+                    outer, inner = inner, outer
+            else:
+                outer, inner = QPointF(rect.left(), 0), QPointF(rect.right() + 1, 0)
+                if rect.center().x() > geometry.width // 2:
+                    outer, inner = inner, outer
+            gradient = QLinearGradient(outer, inner)
+            gradient.setColorAt(0, color)
+            gradient.setColorAt(1, faded)
+            fill_in_bands(painter, rect, gradient)
+        painter.end()
+        return image
+
+
+class PulseRenderer(RingRenderer):
+    """The solid ring breathing like a status light (redrawn every frame)."""
+
+    name = "pulse"
+    animated = True
+
+    def render(self, geometry, now):
+        phase = (1 + math.cos(2 * math.pi * now / PULSE_PERIOD_S)) / 2
+        level = PULSE_LOW + (1 - PULSE_LOW) * phase
+        commands = []
+        for rect, color in geometry.plan:
+            color = QColor(color)
+            color.setAlpha(int(color.alpha() * level))
+            commands.append(FillRect(rect, color))
+        return commands
+
+
+RENDERERS = [RoundedRingRenderer, BandsRenderer, GlowRenderer, PulseRenderer]
@@ -0,0 +1,264 @@
+# Edge Light - Adaptive Brightness
+# Follows an ambient light sensor through a smoothing filter and a lux curve
+
+import bisect
+import glob
+import math
+import os
+import sys
+import time
+from typing import List, Optional, Tuple
+
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal
+
+from constants import (
+    BRIGHTNESS_MIN, BRIGHTNESS_MAX,
+    AMBIENT_POLL_INTERVAL_MS, AMBIENT_SMOOTHING_SECONDS,
+    AMBIENT_HYSTERESIS, AMBIENT_HYSTERESIS_MIN_LUX, AMBIENT_MIN_BRIGHTNESS_STEP,
+)
+from log import get_logger
+
+_log = get_logger('ambient')
+
+# (lux, brightness) points of the user's curve
+CurvePoint = Tuple[float, int]
+
+
+class AmbientBackend:
+    """
+    Interface for reading an ambient light sensor.
+    The base class is the 'no sensor' backend.
+    """
+
+    name = "none"
+
+    def is_supported(self) -> bool:
+        return False
+
+    def read(self) -> Optional[float]:
+        """Get the current illuminance in lux, or None if it can't be read."""
+        return None
+
+
+class IioAmbientBackend(AmbientBackend):
+    """
+    Linux IIO light sensors. Pass root to read a fake tree, e.g. in tests
+    (<root>/<device>/in_illuminance_raw, and optionally _scale and _offset;
+    or in_illuminance_input, already in lux).
+    """
+
+    name = "iio"
+
+    def __init__(self, root: str = "/sys/bus/iio/devices"):
+        self._root = root
+        self._device: Optional[str] = None
+
+    def is_supported(self) -> bool:
+        return self._find_device() is not None
+
+    def _find_device(self) -> Optional[str]:
+        if self._device is None or not os.path.isdir(self._device):
+            candidates = sorted(
+                glob.glob(os.path.join(self._root, '*', 'in_illuminance_raw'))
+                + glob.glob(os.path.join(self._root, '*', 'in_illuminance_input'))
+            )
+            self._device = os.path.dirname(candidates[0]) if candidates else None
+            if self._device is not None:
+                _log.debug("Light sensor: %s", self._device)
+        return self._device
+
+    def _read_attr(self, device: str, attr: str) -> Optional[float]:
+        try:
+            with open(os.path.join(device, attr), 'r') as f:
+                return float(f.read().strip())
+        except (OSError, ValueError):
+            return None
+
+    def read(self) -> Optional[float]:
+        device = self._find_device()
+        if device is None:
+            return None
+        lux = self._read_attr(device, 'in_illuminance_input')
+        if lux is None:
+            raw = self._read_attr(device, 'in_illuminance_raw')
+            if raw is None:
+                return None
+            scale = self._read_attr(device, 'in_illuminance_scale')
+            offset = self._read_attr(device, 'in_illuminance_offset')
+            lux = (raw + (offset or 0.0)) * (1.0 if scale is None else scale)
+        if not math.isfinite(lux):
+            return None
+        return max(0.0, lux)
+
+
+def get_ambient_backend() -> AmbientBackend:
+    """Get the backend for the current platform."""
+    if sys.platform.startswith('linux'):
+        return IioAmbientBackend()
+    return AmbientBackend()
+
+
+def parse_lux_curve(entries) -> List[CurvePoint]:
+    """
+    Build a sorted curve from the settings representation, a list of
+    [lux, brightness] pairs. Invalid entries are skipped.
+    """
+    points = {}
+    for entry in entries or []:
+        try:
+            lux, brightness = entry
+            lux = float(lux)
+            brightness = int(brightness)
+        except (TypeError, ValueError) as e:
+            _log.warning("Ignoring lux curve entry %r: %s", entry, e)
+            continue
+        if not math.isfinite(lux) or lux < 0:
+            _log.warning("Ignoring lux curve entry %r: lux must be 0 or more", entry)
+            continue
+        points[lux] = max(BRIGHTNESS_MIN, min(BRIGHTNESS_MAX, brightness))
+    return sorted(points.items())
+
+
+def _perceived(lux: float) -> float:
+    """Roughly how bright a lux level looks: logarithmic, defined at 0."""
+    return math.log10(1.0 + lux)
+
+
+def lux_to_brightness(curve: List[CurvePoint], lux: float) -> Optional[int]:
+    """
+    Brightness for a lux level, interpolated between the curve's points on
+    a log scale (so 10 -> 100 lux is as big a step as 100 -> 1000) and
+    held flat past either end. None for an empty curve.
+    """
+    if not curve:
+        return None
+    luxes = [point[0] for point in curve]
+    index = bisect.bisect_right(luxes, lux)
+    if index == 0:
+        return curve[0][1]
+    if index == len(curve):
+        return curve[-1][1]
+    (lux0, b0), (lux1, b1) = curve[index - 1], curve[index]
+    span = _perceived(lux1) - _perceived(lux0)
+    t = (_perceived(lux) - _perceived(lux0)) / span if span > 0 else 1.0
+    return int(round(b0 + (b1 - b0) * t))
+
+
+class LuxFilter:
+    """
+    Exponential smoothing with a time constant (irregular sample spacing
+    is fine), followed by hysteresis: the output only moves once the
+    smoothed value leaves a band around it, so sensor noise and a hand
+    passing in front of the sensor don't change anything.
+    """
+
+    def __init__(self, time_constant: float = AMBIENT_SMOOTHING_SECONDS,
+                 hysteresis: float = AMBIENT_HYSTERESIS,
+                 hysteresis_min_lux: float = AMBIENT_HYSTERESIS_MIN_LUX):
+        self.time_constant = time_constant
+        self.hysteresis = hysteresis
+        self.hysteresis_min_lux = hysteresis_min_lux
+        self.reset()
+
+    def reset(self) -> None:
+        self._smoothed: Optional[float] = None
+        self._last_time: Optional[float] = None
+        self.value: Optional[float] = None     # Filtered output
+
+    def update(self, lux: float, now: float) -> Optional[float]:
+        """Feed a sample taken at `now` (seconds). Returns the output."""
+        if self._smoothed is None:
+            self._smoothed = lux     # First sample: nothing to smooth against yet
+        else:
+            elapsed = max(0.0, now - self._last_time)
+            alpha = 1.0 - math.exp(-elapsed / self.time_constant) if self.time_constant > 0 else 1.0
+            self._smoothed += alpha * (lux - self._smoothed)
+        self._last_time = now
+
+        if self.value is None:
+            self.value = self._smoothed
+        else:
+            band = max(self.hysteresis_min_lux, self.value * self.hysteresis)
+            if abs(self._smoothed - self.value) > band:
+                self.value = self._smoothed
+        return self.value
+
+
+class AmbientLight(QObject):
+    """
+    Adaptive brightness: polls the sensor, filters the readings and maps
+    them through the lux curve. brightnessChanged fires only when the
+    target moves by at least AMBIENT_MIN_BRIGHTNESS_STEP, which keeps the
+    overlay from repainting for changes nobody would see.
+    """
+
+    brightnessChanged = pyqtSignal(int)
+
+    def __init__(self, backend: Optional[AmbientBackend] = None,
+                 poll_ms: int = AMBIENT_POLL_INTERVAL_MS, parent=None):
+        super().__init__(parent)
+
+        self._backend = backend
+        self._curve: List[CurvePoint] = []
+        self._filter = LuxFilter()
+        self._brightness: Optional[int] = None
+        self._clock = time.monotonic
+
+        self._timer = QTimer(self)
+        self._timer.setInterval(poll_ms)
+        self._timer.timeout.connect(self.evaluate)
+
+    def set_curve(self, entries) -> None:
+        """Set the lux -> brightness curve (settings representation)."""
+        self._curve = parse_lux_curve(entries)
+        if not self._curve:
+            _log.warning("Lux curve has no usable points; adaptive brightness is idle")
+        self._brightness = None     # Re-apply under the new curve
+        if self._timer.isActive():
+            self.evaluate()
+
+    def set_active(self, active: bool) -> None:
+        """Start or stop following the sensor."""
+        if active == self._timer.isActive():
+            return
+        if active:
+            if not self._get_backend().is_supported():
+                _log.info("No ambient light sensor found")
+                return
+            self._filter.reset()
+            self._brightness = None
+            self._timer.start()
+            self.evaluate()
+        else:
+            self._timer.stop()
+
+    def is_active(self) -> bool:
+        return self._timer.isActive()
+
+    def lux(self) -> Optional[float]:
+        """Filtered illuminance from the last evaluation."""
+        return self._filter.value
+
+    def brightness(self) -> Optional[int]:
+        """Brightness last emitted, or None before the first reading."""
+        return self._brightness
+
+    def evaluate(self, now: Optional[float] = None) -> None:
+        """Take one sensor reading and emit the brightness if it moved enough."""
+        lux = self._get_backend().read()
+        if lux is None:
+            return
+        filtered = self._filter.update(lux, self._clock() if now is None else now)
+        target = lux_to_brightness(self._curve, filtered)
+        if target is None:
+            return
+        if self._brightness is not None and abs(target - self._brightness) < AMBIENT_MIN_BRIGHTNESS_STEP:
+            return
+        _log.debug("Ambient %.1f lux (filtered %.1f) -> brightness %d", lux, filtered, target)
+        self._brightness = target
+        self.brightnessChanged.emit(target)
+
+    def _get_backend(self) -> AmbientBackend:
+        if self._backend is None:
+            self._backend = get_ambient_backend()
+        return self._backend
@@ -0,0 +1,170 @@
+# Edge Light - Animation Engine
+# Drives fades, value transitions and the breathing effect
+
+import math
+import time
+from typing import Callable, Dict, Optional
+
+from PyQt5.QtCore import Qt, QObject, QTimer
+
+from constants import ANIMATION_MAX_FPS
+
+
+def ease_linear(t: float) -> float:
+    return t
+
+
+def ease_in_cubic(t: float) -> float:
+    return t * t * t
+
+
+def ease_out_cubic(t: float) -> float:
+    t = 1.0 - t
+    return 1.0 - t * t * t
+
+
+def ease_in_out_cubic(t: float) -> float:
+    if t < 0.5:
+        return 4.0 * t * t * t
+    t = -2.0 * t + 2.0
+    return 1.0 - t * t * t / 2.0
+
+
+class Tween:
+    """A single value moving from start to end over a fixed duration."""
+
+    __slots__ = ('start', 'end', 'duration', 'setter', 'easing', 'on_finished', 'started_at')
+
+    def __init__(self, start, end, duration, setter, easing, on_finished, started_at):
+        self.start = start
+        self.end = end
+        self.duration = duration
+        self.setter = setter
+        self.easing = easing
+        self.on_finished = on_finished
+        self.started_at = started_at
+
+    def step(self, now: float) -> bool:
+        """Apply the value for 'now'. Returns True when finished."""
+        progress = (now - self.started_at) / self.duration if self.duration > 0 else 1.0
+        if progress >= 1.0:
+            self.setter(self.end)
+            return True
+        self.setter(self.start + (self.end - self.start) * self.easing(progress))
+        return False
+
+
+class Oscillation:
+    """A value swinging between low and high with a sine wave, until cancelled."""
+
+    __slots__ = ('low', 'high', 'period', 'setter', 'started_at')
+
+    def __init__(self, low, high, period, setter, started_at):
+        self.low = low
+        self.high = high
+        self.period = period
+        self.setter = setter
+        self.started_at = started_at
+
+    def step(self, now: float) -> bool:
+        phase = ((now - self.started_at) / self.period) % 1.0
+        # Start at the top of the wave so there is no jump from a steady state
+        level = (math.cos(phase * 2.0 * math.pi) + 1.0) / 2.0
+        self.setter(self.low + (self.high - self.low) * level)
+        return False
+
+
+class Animator(QObject):
+    """
+    Frame-rate capped animation driver.
+
+    All running animations share one timer, which only runs while
+    at least one animation is active - an idle overlay has no timers.
+    """
+
+    def __init__(self, max_fps: int = ANIMATION_MAX_FPS,
+                 clock: Callable[[], float] = time.monotonic, parent=None):
+        super().__init__(parent)
+
+        self._clock = clock
+        self._animations: Dict[str, object] = {}
+
+        self._timer = QTimer(self)
+        self._timer.setTimerType(Qt.PreciseTimer)
+        self._timer.setInterval(max(1, 1000 // max_fps))
+        self._timer.timeout.connect(self._tick)
+
+    def animate(self, key: str, start: float, end: float, duration_ms: int,
+                setter: Callable[[float], None],
+                easing: Callable[[float], float] = ease_in_out_cubic,
+                on_finished: Optional[Callable[[], None]] = None) -> None:
+        """
+        Animate a value, replacing any running animation with the same key.
+        A zero duration applies the end value immediately.
+        """
+        self._animations.pop(key, None)
+
+        if duration_ms <= 0 or start == end:
+            setter(end)
+            if on_finished:
+                on_finished()
+            self._update_timer()
+            return
+
+        self._animations[key] = Tween(
+            start, end, duration_ms / 1000.0, setter, easing, on_finished, self._clock()
+        )
+        setter(start)
+        self._update_timer()
+
+    def oscillate(self, key: str, low: float, high: float, period_ms: int,
+                  setter: Callable[[float], None]) -> None:
+        """Swing a value between low and high until cancelled."""
+        self._animations[key] = Oscillation(
+            low, high, max(1, period_ms) / 1000.0, setter, self._clock()
+        )
+        self._update_timer()
+
+    def cancel(self, key: str) -> bool:
+        """Stop an animation where it is. Returns True if one was running."""
+        found = self._animations.pop(key, None) is not None
+        self._update_timer()
+        return found
+
+    def is_animating(self, key: str = None) -> bool:
+        """Check if a given animation (or any animation) is running."""
+        if key is None:
+            return bool(self._animations)
+        return key in self._animations
+
+    def target(self, key: str, default=None):
+        """Get the value an animation is heading to."""
+        animation = self._animations.get(key)
+        if isinstance(animation, Tween):
+            return animation.end
+        return default
+
+    def _update_timer(self) -> None:
+        if self._animations and not self._timer.isActive():
+            self._timer.start()
+        elif not self._animations and self._timer.isActive():
+            self._timer.stop()
+
+    def _tick(self) -> None:
+        now = self._clock()
+        finished = []
+
+        for key, animation in list(self._animations.items()):
+            if animation.step(now):
+                finished.append((key, animation))
+
+        for key, animation in finished:
+            # Only drop it if it wasn't replaced from inside a setter
+            if self._animations.get(key) is animation:
+                del self._animations[key]
+
+        self._update_timer()
+
+        for _, animation in finished:
+            if animation.on_finished:
+                animation.on_finished()
@@ -1,19 +1,29 @@
-# Edge Light - Windows Auto-Start Manager
-# Handles adding/removing Edge Light from Windows startup
+# Edge Light - Auto-Start Manager
+# Handles adding/removing Edge Light from the login items
+# (Windows Run registry key or XDG autostart desktop entry)
 
 import os
 import sys
-import winreg
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from PyQt5.QtCore import QObject, pyqtSignal
+
+from constants import BACKGROUND_FLAG
+from log import get_logger
 
 APP_NAME = "EdgeLight"
 REGISTRY_PATH = r"Software\Microsoft\Windows\CurrentVersion\Run"
+DESKTOP_FILENAME = "EdgeLight.desktop"
+
+_log = get_logger('autostart')
 
 
 def get_executable_path() -> str:
     """Get the path to the current executable or script."""
     if getattr(sys, 'frozen', False):
-        # Running as compiled executable
-        return sys.executable
+        # Running as compiled executable (quoted: the path may contain spaces)
+        return f'"{sys.executable}"'
     else:
         # Running as script - use pythonw to avoid console
         python_path = sys.executable
@@ -23,68 +33,194 @@ def get_executable_path() -> str:
         return f'"{python_path}" "{script_path}"'
 
 
-def is_autostart_enabled() -> bool:
-    """Check if Edge Light is set to start with Windows."""
-    try:
-        key = winreg.OpenKey(
-            winreg.HKEY_CURRENT_USER,
-            REGISTRY_PATH,
-            0,
-            winreg.KEY_READ
-        )
+def get_autostart_command() -> str:
+    """Command registered to run at login (starts in background mode)."""
+    return f"{get_executable_path()} {BACKGROUND_FLAG}"
+
+
+class AutostartBackend:
+    """
+    Interface for a platform login-item mechanism.
+    The base class is the 'unsupported platform' backend.
+    """
+
+    name = "none"
+
+    def is_supported(self) -> bool:
+        return False
+
+    def is_enabled(self) -> bool:
+        """Check if Edge Light is registered to start at login."""
+        return False
+
+    def enable(self, command: str) -> bool:
+        """Register the command to run at login."""
+        return False
+
+    def disable(self) -> bool:
+        """Remove the login registration."""
+        return False
+
+
+class WindowsRunKeyBackend(AutostartBackend):
+    """HKCU Run registry key."""
+
+    name = "windows"
+
+    def __init__(self, registry_path: str = REGISTRY_PATH, value_name: str = APP_NAME):
+        import winreg
+        self._winreg = winreg
+        self._registry_path = registry_path
+        self._value_name = value_name
+
+    def is_supported(self) -> bool:
+        return True
+
+    def is_enabled(self) -> bool:
+        winreg = self._winreg
+        try:
+            key = winreg.OpenKey(
+                winreg.HKEY_CURRENT_USER,
+                self._registry_path,
+                0,
+                winreg.KEY_READ
+            )
+            try:
+                winreg.QueryValueEx(key, self._value_name)
+                return True
+            except OSError:
+                return False
+            finally:
+                winreg.CloseKey(key)
+        except OSError:
+            return False
+
+    def enable(self, command: str) -> bool:
+        winreg = self._winreg
         try:
-            value, _ = winreg.QueryValueEx(key, APP_NAME)
+            key = winreg.OpenKey(
+                winreg.HKEY_CURRENT_USER,
+                self._registry_path,
+                0,
+                winreg.KEY_SET_VALUE
+            )
+            winreg.SetValueEx(key, self._value_name, 0, winreg.REG_SZ, command)
             winreg.CloseKey(key)
+
+            _log.info("Auto-start enabled: %s", command)
             return True
-        except WindowsError:
+        except OSError as e:
+            _log.error("Failed to enable auto-start: %s", e)
+            return False
+
+    def disable(self) -> bool:
+        winreg = self._winreg
+        try:
+            key = winreg.OpenKey(
+                winreg.HKEY_CURRENT_USER,
+                self._registry_path,
+                0,
+                winreg.KEY_SET_VALUE
+            )
+
+            try:
+                winreg.DeleteValue(key, self._value_name)
+            except OSError:
+                pass  # Key doesn't exist, that's fine
+
             winreg.CloseKey(key)
+            _log.info("Auto-start disabled")
+            return True
+        except OSError as e:
+            _log.error("Failed to disable auto-start: %s", e)
             return False
-    except WindowsError:
-        return False
 
 
-def enable_autostart() -> bool:
-    """Add Edge Light to Windows startup."""
-    try:
-        key = winreg.OpenKey(
-            winreg.HKEY_CURRENT_USER,
-            REGISTRY_PATH,
-            0,
-            winreg.KEY_SET_VALUE
-        )
-        
-        exe_path = get_executable_path()
-        winreg.SetValueEx(key, APP_NAME, 0, winreg.REG_SZ, exe_path)
-        winreg.CloseKey(key)
-        
-        print(f"Auto-start enabled: {exe_path}")
+class XdgAutostartBackend(AutostartBackend):
+    """
+    Desktop entry in $XDG_CONFIG_HOME/autostart (freedesktop.org spec).
+    Pass config_home to work against another directory, e.g. in tests.
+    """
+
+    name = "xdg"
+
+    def __init__(self, config_home: Optional[str] = None):
+        if config_home is None:
+            config_home = os.environ.get('XDG_CONFIG_HOME') or os.path.join(
+                os.path.expanduser('~'), '.config')
+        self.path = os.path.join(config_home, 'autostart', DESKTOP_FILENAME)
+
+    def is_supported(self) -> bool:
         return True
-    except WindowsError as e:
-        print(f"Failed to enable auto-start: {e}")
-        return False
 
+    def is_enabled(self) -> bool:
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    key, _, value = line.strip().partition('=')
+                    if key == 'Hidden' and value.lower() == 'true':
+                        return False
+            return True
+        except OSError:
+            return False
 
-def disable_autostart() -> bool:
-    """Remove Edge Light from Windows startup."""
-    try:
-        key = winreg.OpenKey(
-            winreg.HKEY_CURRENT_USER,
-            REGISTRY_PATH,
-            0,
-            winreg.KEY_SET_VALUE
+    def enable(self, command: str) -> bool:
+        entry = (
+            "[Desktop Entry]\n"
+            "Type=Application\n"
+            "Name=Edge Light\n"
+            "Comment=Screen-edge ring light\n"
+            f"Exec={command}\n"
+            "Terminal=false\n"
+            "X-GNOME-Autostart-enabled=true\n"
         )
-        
         try:
-            winreg.DeleteValue(key, APP_NAME)
-        except WindowsError:
-            pass  # Key doesn't exist, that's fine
-        
-        winreg.CloseKey(key)
-        print("Auto-start disabled")
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            temp_path = self.path + ".tmp"
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                f.write(entry)
+            os.replace(temp_path, self.path)
+
+            _log.info("Auto-start enabled: %s", command)
+            return True
+        except OSError as e:
+            _log.error("Failed to enable auto-start: %s", e)
+            return False
+
+    def disable(self) -> bool:
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass  # Entry doesn't exist, that's fine
+        except OSError as e:
+            _log.error("Failed to disable auto-start: %s", e)
+            return False
+        _log.info("Auto-start disabled")
         return True
-    except WindowsError as e:
-        print(f"Failed to disable auto-start: {e}")
-        return False
+
+
+def get_autostart_backend() -> AutostartBackend:
+    """Get the backend for the current platform."""
+    if sys.platform == 'win32':
+        return WindowsRunKeyBackend()
+    if sys.platform.startswith(('linux', 'freebsd', 'openbsd')):
+        return XdgAutostartBackend()
+    return AutostartBackend()
+
+
+def is_autostart_enabled() -> bool:
+    """Check if Edge Light is set to start at login."""
+    return get_autostart_backend().is_enabled()
+
+
+def enable_autostart() -> bool:
+    """Add Edge Light to the login items."""
+    return get_autostart_backend().enable(get_autostart_command())
+
+
+def disable_autostart() -> bool:
+    """Remove Edge Light from the login items."""
+    return get_autostart_backend().disable()
 
 
 def set_autostart(enabled: bool) -> bool:
@@ -93,3 +229,70 @@ def set_autostart(enabled: bool) -> bool:
         return enable_autostart()
     else:
         return disable_autostart()
+
+
+class AutostartService(QObject):
+    """
+    Keeps a cached auto-start state for the GUI.
+    All backend I/O (registry, filesystem) runs on one worker thread;
+    results come back through Qt signals on the GUI thread.
+    """
+
+    stateChanged = pyqtSignal(bool)          # Cached state refreshed
+    applyFinished = pyqtSignal(bool, bool)   # Requested state, verified success
+
+    def __init__(self, backend: Optional[AutostartBackend] = None, parent=None):
+        super().__init__(parent)
+
+        self._backend = backend
+        self._cached_state: Optional[bool] = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="autostart")
+
+    def is_supported(self) -> bool:
+        return self._get_backend().is_supported()
+
+    def cached_state(self) -> Optional[bool]:
+        """Last known state, or None before the first refresh finished."""
+        return self._cached_state
+
+    def refresh(self) -> None:
+        """Re-read the state in the background."""
+        self._executor.submit(self._refresh_worker)
+
+    def apply(self, enabled: bool) -> None:
+        """Enable or disable auto-start in the background, then verify it."""
+        self._executor.submit(self._apply_worker, enabled)
+
+    def shutdown(self) -> None:
+        """Stop the worker thread once queued work is done."""
+        self._executor.shutdown(wait=False)
+
+    def _get_backend(self) -> AutostartBackend:
+        if self._backend is None:
+            self._backend = get_autostart_backend()
+        return self._backend
+
+    def _refresh_worker(self) -> None:
+        try:
+            state = self._get_backend().is_enabled()
+        except Exception as e:
+            _log.error("Error reading auto-start state: %s", e)
+            return
+        self._cached_state = state
+        self.stateChanged.emit(state)
+
+    def _apply_worker(self, enabled: bool) -> None:
+        backend = self._get_backend()
+        try:
+            if enabled:
+                backend.enable(get_autostart_command())
+            else:
+                backend.disable()
+            state = backend.is_enabled()
+        except Exception as e:
+            _log.error("Error changing auto-start: %s", e)
+            state = self._cached_state
+
+        self._cached_state = state
+        self.applyFinished.emit(enabled, state == enabled)
+        self.stateChanged.emit(bool(state))
@@ -0,0 +1,200 @@
+# Edge Light - Layered Configuration
+# Built-in defaults < machine policy file < per-user file, resolved into a snapshot
+
+import copy
+import json
+import os
+import sys
+from types import MappingProxyType
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+from constants import POLICY_FILENAME, POLICY_ENV
+from log import get_logger
+
+_log = get_logger('config')
+
+# (st_mtime_ns, st_size) of a layer file, or None if it doesn't exist
+FileSignature = Optional[Tuple[int, int]]
+
+
+def get_policy_path() -> str:
+    """
+    Machine-wide policy file: EDGELIGHT_POLICY if set, otherwise
+    %ProgramData%\\EdgeLight\\policy.json or /etc/edgelight/policy.json.
+    """
+    override = os.environ.get(POLICY_ENV)
+    if override:
+        return override
+    if sys.platform == 'win32':
+        base = os.environ.get('ProgramData', r'C:\ProgramData')
+        return os.path.join(base, 'EdgeLight', POLICY_FILENAME)
+    return os.path.join('/etc', 'edgelight', POLICY_FILENAME)
+
+
+def file_signature(path: str) -> FileSignature:
+    """Cheap change detection for a layer file."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+def parse_json_layer(data: bytes, source: str) -> Optional[Dict[str, Any]]:
+    """Parse a layer file's contents; None if it isn't a JSON object."""
+    try:
+        parsed = json.loads(data.decode('utf-8'))
+    except (json.JSONDecodeError, UnicodeDecodeError) as e:
+        _log.warning("Could not read %s: %s", source, e)
+        return None
+    if not isinstance(parsed, dict):
+        _log.warning("Ignoring %s: not a JSON object", source)
+        return None
+    return parsed
+
+
+def read_json_layer(path: str) -> Dict[str, Any]:
+    """Read a JSON object from a layer file ({} if missing or broken)."""
+    try:
+        with open(path, 'rb') as f:
+            data = f.read()
+    except FileNotFoundError:
+        return {}
+    except (IOError, OSError) as e:
+        _log.warning("Could not read %s: %s", path, e)
+        return {}
+    parsed = parse_json_layer(data, path)
+    return {} if parsed is None else parsed
+
+
+class Policy:
+    """
+    An administrator's policy file:
+
+        {
+          "defaults": {"brightness": 50},           # Replace built-in defaults
+          "locked":   {"hotkey_toggle": "alt+shift+l"},   # Fixed, user can't change
+          "ranges":   {"brightness": [0, 70]}        # Clamp numeric settings
+        }
+    """
+
+    __slots__ = ('defaults', 'locked', 'ranges')
+
+    def __init__(self, defaults: Optional[Dict[str, Any]] = None,
+                 locked: Optional[Dict[str, Any]] = None,
+                 ranges: Optional[Dict[str, Tuple[Optional[float], Optional[float]]]] = None):
+        self.defaults = defaults or {}
+        self.locked = locked or {}
+        self.ranges = ranges or {}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'Policy':
+        """Build a policy, dropping malformed sections and ranges."""
+        defaults = data.get('defaults', {})
+        locked = data.get('locked', {})
+        if not isinstance(defaults, dict):
+            _log.warning("Ignoring policy 'defaults': not an object")
+            defaults = {}
+        if not isinstance(locked, dict):
+            _log.warning("Ignoring policy 'locked': not an object")
+            locked = {}
+
+        ranges = {}
+        raw_ranges = data.get('ranges', {})
+        for key, bounds in (raw_ranges.items() if isinstance(raw_ranges, dict) else ()):
+            try:
+                low, high = bounds
+                if low is not None:
+                    low = float(low)
+                if high is not None:
+                    high = float(high)
+                if low is not None and high is not None and low > high:
+                    raise ValueError("min is above max")
+            except (TypeError, ValueError) as e:
+                _log.warning("Ignoring policy range for %s: %s", key, e)
+                continue
+            ranges[key] = (low, high)
+
+        return cls(defaults, locked, ranges)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """The policy in its file format."""
+        return {
+            'defaults': copy.deepcopy(self.defaults),
+            'locked': copy.deepcopy(self.locked),
+            'ranges': {key: list(bounds) for key, bounds in self.ranges.items()},
+        }
+
+
+def clamp_to_range(value: Any, bounds: Tuple[Optional[float], Optional[float]]) -> Any:
+    """Clamp a number, keeping ints as ints. Non-numbers pass through."""
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return value
+    low, high = bounds
+    clamped = value
+    if low is not None and clamped < low:
+        clamped = low
+    if high is not None and clamped > high:
+        clamped = high
+    return int(round(clamped)) if isinstance(value, int) else clamped
+
+
+class SettingsSnapshot:
+    """
+    The resolved settings. Read-only: container values are handed out
+    as copies, so nobody can change the snapshot behind the manager's back.
+    """
+
+    __slots__ = ('_values', '_locked', '_ranges')
+
+    def __init__(self, values: Dict[str, Any], locked: frozenset,
+                 ranges: Mapping[str, Tuple[Optional[float], Optional[float]]]):
+        self._values = MappingProxyType(values)
+        self._locked = locked
+        self._ranges = MappingProxyType(dict(ranges))
+
+    def get(self, key: str, default: Any = None) -> Any:
+        value = self._values.get(key, default)
+        if isinstance(value, (list, dict)):
+            return copy.deepcopy(value)
+        return value
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._values
+
+    def to_dict(self) -> Dict[str, Any]:
+        return copy.deepcopy(dict(self._values))
+
+    def is_locked(self, key: str) -> bool:
+        return key in self._locked
+
+    def get_range(self, key: str) -> Optional[Tuple[Optional[float], Optional[float]]]:
+        """(min, max) enforced by policy, either may be None; None if unrestricted."""
+        return self._ranges.get(key)
+
+    def diff(self, newer: 'SettingsSnapshot') -> Dict[str, Any]:
+        """Keys whose value differs in the newer snapshot, with the new values."""
+        missing = object()
+        changed = {}
+        for key in self._values.keys() | newer._values.keys():
+            value = newer._values.get(key, missing)
+            if value != self._values.get(key, missing):
+                changed[key] = None if value is missing else copy.deepcopy(value)
+        return changed
+
+
+def resolve_settings(defaults: Dict[str, Any], policy: Policy,
+                     user: Dict[str, Any]) -> SettingsSnapshot:
+    """Layer the settings, then apply the policy's ranges and locks."""
+    values = copy.deepcopy(defaults)
+    values.update(copy.deepcopy(policy.defaults))
+    values.update(copy.deepcopy(user))
+
+    for key, bounds in policy.ranges.items():
+        if key in values:
+            values[key] = clamp_to_range(values[key], bounds)
+
+    # Locked values win over everything, ranges included
+    values.update(copy.deepcopy(policy.locked))
+
+    return SettingsSnapshot(values, frozenset(policy.locked), policy.ranges)
@@ -24,7 +24,47 @@ DEFAULT_SETTINGS = {
     "glow_width": 175,             # pixels (150-200 default range)
     "hotkey_toggle": "alt+shift+l",    # Toggle light on/off
     "hotkey_panel": "alt+shift+p",     # Open settings panel
+    "hotkey_isolation": False,         # Run the keyboard hook in a helper process
     "edge_selection": EDGE_ALL,        # Which edges to light up
+    "edge_specs": {},                  # Per-edge overrides, e.g. {"top": {"thickness": 120}}
+    "exclusion_zones": [],             # [x, y, width, height] areas the ring leaves uncovered
+    "avoid_taskbar": False,            # Keep the ring off the taskbar
+    "schedule_enabled": False,         # Follow the daily schedule below
+    "schedule": [                      # Keyframes, interpolated between
+        {"time": "07:00", "color_temperature": 5500, "brightness": 60},
+        {"time": "12:00", "color_temperature": 6500, "brightness": 70},
+        {"time": "18:00", "color_temperature": 4000, "brightness": 55},
+        {"time": "22:00", "color_temperature": 2700, "brightness": 35},
+    ],
+    "auto_off_minutes": 0,             # Turn off after N minutes (0 = never)
+    "fade_duration_ms": 250,           # Fade in/out when toggling (0 = instant)
+    "transition_duration_ms": 600,     # Smooth scheduled value changes
+    "breathing_enabled": False,        # Slow pulse of the ring
+    "breathing_period_ms": 4000,
+    "breathing_depth": 15,             # How far the pulse dips (percent)
+    "prewarm_overlay": False,          # Map the overlay window ahead of the first toggle
+    "background_rendering": True,      # Run static renderer plugins off the GUI thread
+    "renderer": "solid",               # Ring renderer: "solid" or a plugin's name
+    "renderer_budget_ms": 8,           # Plugin frame time before falling back to "solid"
+    "watchdog_enabled": False,         # Log GUI thread stalls (also: --watchdog)
+    "watchdog_threshold_ms": 500,      # Stall length that gets logged
+    "log_level": "info",               # debug, info, warning or error
+    "log_categories": [],              # Only keep these categories (empty = all)
+    "log_to_file": False,              # Also write the log to edgelight.log
+    "low_memory_mode": False,          # Free the settings panel and render caches when idle
+    "call_watch_enabled": False,       # Light on while a video-call app is running
+    "call_watch_processes": [          # Executable names ('.exe' optional)
+        "zoom", "ms-teams", "teams", "obs64", "obs", "webexhost", "skype",
+    ],
+    "power_saver_enabled": False,      # Dim the ring and stop animations on battery
+    "power_saver_threshold": 100,      # ...at or below this charge (100 = always on battery)
+    "power_saver_max_brightness": 40,
+    "usage_log_enabled": False,        # Keep a local log of on-time, brightness and energy
+    "usage_panel_watts": 15,           # Extra panel draw for a full-screen ring at full brightness
+    "ambient_enabled": False,          # Follow the ambient light sensor
+    "ambient_curve": [                 # [lux, brightness] points, interpolated on a log scale
+        [0, 25], [10, 35], [100, 55], [400, 75], [1000, 100],
+    ],
 }
 
 # Setting ranges
@@ -37,9 +77,94 @@ COLOR_TEMP_MAX = 6500   # Cool (blue/white)
 GLOW_WIDTH_MIN = 50
 GLOW_WIDTH_MAX = 400
 
+BREATHING_PERIOD_MIN_MS = 500
+
+# Schedule engine never updates the ring more often than this
+SCHEDULE_MIN_STEP_SECONDS = 20
+
+# Animations never redraw faster than this
+ANIMATION_MAX_FPS = 60
+
+# Delay after startup before pre-warming the overlay window
+OVERLAY_PREWARM_DELAY_MS = 1000
+
+# Login launches (from auto-start) bring up only the tray icon and
+# hotkeys, and build the rest after this delay or on first use
+BACKGROUND_FLAG = "--background"
+BACKGROUND_INIT_DELAY_MS = 20000
+
+# Ring renderer plugins: .py files in this folder next to the settings file.
+# A plugin that misses its frame budget this many frames in a row is
+# replaced by the built-in renderer.
+BUILTIN_RENDERER = "solid"
+PLUGINS_DIRNAME = "plugins"
+RENDERER_OVERRUN_FRAMES = 3
+
+# Low-memory mode: how long the settings panel stays hidden before it is freed
+POPUP_RELEASE_DELAY_MS = 60000
+
+# Video-call process watcher polling cadence
+PROCESS_WATCH_INTERVAL_MS = 3000
+
+# Power source is re-read this often (Windows also reacts to power broadcasts)
+POWER_POLL_INTERVAL_MS = 60000
+
+# Adaptive brightness: sensor polling, smoothing time constant, and how far
+# the filtered reading (relative, with a floor for dark rooms) and the
+# resulting brightness must move before the ring is updated
+AMBIENT_POLL_INTERVAL_MS = 1000
+AMBIENT_SMOOTHING_SECONDS = 8.0
+AMBIENT_HYSTERESIS = 0.15
+AMBIENT_HYSTERESIS_MIN_LUX = 3.0
+AMBIENT_MIN_BRIGHTNESS_STEP = 3
+
+# Usage log: a folder of daily binary segments next to the settings file.
+# State is sampled this often, the light's state is re-logged this often
+# while it stays on, queued records are written in batches this often, and
+# segments older than the retention period are deleted (rollups are kept).
+USAGE_DIRNAME = "usage"
+USAGE_ROLLUPS_FORMAT = "edgelight-usage-rollups/1"
+USAGE_SAMPLE_MS = 10000
+USAGE_HEARTBEAT_SECONDS = 300
+USAGE_FLUSH_SECONDS = 30
+USAGE_RETENTION_DAYS = 90
+
 # Settings file location (relative to executable)
 SETTINGS_FILENAME = "edgelight_settings.json"
 
+# Hotkey helper process (keyboard hook isolated from the GUI process)
+HOTKEY_HELPER_FLAG = "--hotkey-helper"
+HOTKEY_HELPER_EXIT_UNAVAILABLE = 3               # Helper can't hook here; don't restart
+HOTKEY_HELPER_RESTART_DELAYS_MS = (500, 2000, 10000)   # Backoff, then in-process fallback
+HOTKEY_HELPER_STABLE_SECONDS = 60                # Uptime that resets the backoff
+
+# Interaction recording (--record[=path]) for replay benchmarks
+RECORD_FLAG = "--record"
+RECORDING_FORMAT = "edgelight-recording/2"
+RECORDING_FLUSH_MS = 1000
+
+# Machine-wide policy file (admin defaults, locked keys, ranges);
+# the environment variable points at another file
+POLICY_FILENAME = "policy.json"
+POLICY_ENV = "EDGELIGHT_POLICY"
+
+# Edits to the settings files are applied once they stop changing for this long
+SETTINGS_RELOAD_DEBOUNCE_MS = 300
+
+# Event loop stall watchdog
+WATCHDOG_FLAG = "--watchdog"
+WATCHDOG_LOG_FILENAME = "edgelight_stalls.log"
+WATCHDOG_HEARTBEAT_MS = 100
+WATCHDOG_MAX_ENTRIES = 50             # Stalls kept in memory
+WATCHDOG_MAX_LOG_BYTES = 256 * 1024   # Log file is trimmed to stay under this
+
+# Application log
+LOG_LEVEL_FLAG = "--log-level"        # e.g. --log-level=debug
+LOG_FILENAME = "edgelight.log"
+LOG_RING_CAPACITY = 2000              # Records kept in memory for "Save recent log"
+LOG_FILE_MAX_BYTES = 1024 * 1024      # Rotate the log file past this size
+LOG_FILE_BACKUPS = 3
+
 # Color temperature to RGB mapping reference points
 COLOR_TEMP_MAP = {
     2700: (255, 180, 107),   # Warm (incandescent)
@@ -0,0 +1,169 @@
+# Edge Light - Application Core
+# Everything but the QApplication, so Edge Light can run inside a host app
+
+from typing import Optional
+
+from PyQt5.QtWidgets import QApplication
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal
+
+from constants import OVERLAY_PREWARM_DELAY_MS, BACKGROUND_INIT_DELAY_MS
+from profiler import get_startup_profiler
+from log import get_logger
+from settings_manager import SettingsManager, get_settings_manager
+
+_log = get_logger('app')
+
+
+class HotkeySignalBridge(QObject):
+    """Bridge to emit Qt signals from hotkey threads."""
+    toggle_pressed = pyqtSignal()
+    panel_pressed = pyqtSignal()
+
+
+def create_hotkey_manager(settings: SettingsManager):
+    """The platform hotkey manager, with the hook in a helper process if configured."""
+    if settings.model.hotkey_isolation:
+        from hotkey_process import IsolatedHotkeyManager
+        return IsolatedHotkeyManager()
+    from hotkey import ThreadSafeMultiHotkeyManager
+    return ThreadSafeMultiHotkeyManager()
+
+
+class EdgeLightCore(QObject):
+    """
+    The overlay, tray/panel, hotkeys, settings hot reload and the
+    watchers, on an existing QApplication (the standalone app's, or a
+    host's). Backends left as None get the platform defaults:
+
+        settings_store     SettingsManager (get_settings_manager())
+        hotkey_backend     hotkey manager (hotkey.NullHotkeyManager for none)
+        autostart_backend  autostart.AutostartBackend (the base class for none)
+        screen             QScreen the ring surrounds (the primary screen)
+
+    start() and stop() can be called more than once; stop() saves the
+    settings and leaves the QApplication running.
+    """
+
+    # Quit was picked from the tray menu (the core has already stopped)
+    quitRequested = pyqtSignal()
+
+    def __init__(self, settings_store: Optional[SettingsManager] = None,
+                 hotkey_backend=None, autostart_backend=None, screen=None,
+                 show_tray_icon: bool = True, background: bool = False, parent=None):
+        """
+        background is the login launch mode: unless the light has to come
+        on right away, only the tray icon and hotkeys are built at start()
+        and the rest once the app has been idle for a while.
+        """
+        super().__init__(parent)
+
+        self.settings = settings_store
+        self.hotkey_manager = hotkey_backend
+        self._autostart_backend = autostart_backend
+        self._screen = screen
+        self._show_tray_icon = show_tray_icon
+        self._background = background
+
+        self.tray = None
+        self.hotkey_bridge = None
+        self._settings_watcher = None
+        self._idle_timer = QTimer(self)
+        self._idle_timer.setSingleShot(True)
+        self._idle_timer.timeout.connect(self._idle_startup)
+        self._defer_init = False
+
+    @property
+    def overlay(self):
+        """The GlowOverlay, or None before it has been built."""
+        return self.tray.overlay if self.tray is not None else None
+
+    def is_running(self) -> bool:
+        return self.tray is not None
+
+    def start(self) -> None:
+        """Build the tray, overlay and hotkeys. Needs a QApplication."""
+        if self.tray is not None:
+            return
+        if QApplication.instance() is None:
+            raise RuntimeError("EdgeLightCore needs a QApplication")
+        profiler = get_startup_profiler()
+
+        if self.settings is None:
+            with profiler.phase('settings'):
+                self.settings = get_settings_manager()
+        from settings_watch import SettingsWatcher
+        self._settings_watcher = SettingsWatcher(self.settings, parent=self)
+        model = self.settings.model
+
+        self._defer_init = self._background and not model.enabled
+
+        if self.hotkey_manager is None:
+            self.hotkey_manager = create_hotkey_manager(self.settings)
+        self.hotkey_bridge = HotkeySignalBridge(self)
+
+        from overlay import GlowOverlay
+        from tray import TrayManager
+        screen = self._screen
+        with profiler.phase('tray'):
+            self.tray = TrayManager(
+                lambda: GlowOverlay(screen), self.settings, self.hotkey_manager,
+                autostart_backend=self._autostart_backend,
+                defer_init=self._defer_init, show_icon=self._show_tray_icon,
+            )
+        self.tray.quitRequested.connect(self._on_quit_requested)
+
+        with profiler.phase('hotkeys'):
+            self.hotkey_manager.register_hotkey('toggle', model.hotkey_toggle,
+                                                self.hotkey_bridge.toggle_pressed)
+            self.hotkey_manager.register_hotkey('panel', model.hotkey_panel,
+                                                self.hotkey_bridge.panel_pressed)
+            self.hotkey_bridge.toggle_pressed.connect(self.tray.toggle)
+            self.hotkey_bridge.panel_pressed.connect(self.tray.open_panel)
+            self.hotkey_manager.start()
+
+        # Finish deferred work while idle, then map the overlay window so
+        # the first toggle is instant
+        self._idle_timer.start(
+            BACKGROUND_INIT_DELAY_MS if self._defer_init else OVERLAY_PREWARM_DELAY_MS
+        )
+
+    def _idle_startup(self) -> None:
+        profiler = get_startup_profiler()
+        self.tray.ensure_initialized()
+        if self.settings.model.prewarm_overlay and not self.tray.overlay.is_enabled():
+            with profiler.phase('overlay_prewarm'):
+                self.tray.overlay.prewarm()
+        profiler.mark('idle_startup_done')
+        if self._defer_init:
+            profiler.print_report()
+
+    def stop(self) -> None:
+        """Tear everything down and save the settings; the QApplication keeps running."""
+        if self.tray is None:
+            return
+        self._idle_timer.stop()
+        self.hotkey_manager.stop()
+        self.tray.shutdown()
+        self.tray.deleteLater()
+        self.tray = None
+        self.hotkey_bridge.deleteLater()
+        self.hotkey_bridge = None
+        self._settings_watcher.deleteLater()
+        self._settings_watcher = None
+        self.settings.save()
+        _log.info("Core stopped")
+
+    def _on_quit_requested(self) -> None:
+        self.stop()
+        self.quitRequested.emit()
+
+    # Controls for hosts (the same actions as the hotkeys and tray)
+
+    def toggle(self) -> None:
+        self.tray.toggle()
+
+    def set_enabled(self, enabled: bool) -> None:
+        self.tray.set_enabled(enabled)
+
+    def open_panel(self) -> None:
+        self.tray.open_panel()
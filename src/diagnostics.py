@@ -0,0 +1,120 @@
+# Edge Light - Diagnostics View
+# Shows the runtime metrics (rejected settings, recent usage) and exports the metrics as JSON
+
+import time
+
+from PyQt5.QtWidgets import (
+    QWidget, QVBoxLayout, QHBoxLayout, QPlainTextEdit, QPushButton,
+    QFileDialog, QApplication,
+)
+from PyQt5.QtCore import Qt
+from PyQt5.QtGui import QFont
+
+from constants import APP_NAME
+from metrics import get_metrics
+
+USAGE_REPORT_DAYS = 7
+
+BUTTON_STYLE = """
+    QPushButton {
+        background-color: #2A2A2A;
+        color: #B0B0B0;
+        border: 1px solid #505050;
+        border-radius: 4px;
+        padding: 6px 12px;
+        font-size: 11px;
+    }
+    QPushButton:hover {
+        background-color: #353535;
+        border-color: #606060;
+    }
+"""
+
+
+class DiagnosticsWindow(QWidget):
+    """Small window with a metrics report, refresh, copy and export."""
+
+    def __init__(self, settings, usage_log=None, parent=None):
+        super().__init__(parent)
+
+        self._settings = settings
+        self._usage_log = usage_log
+        if usage_log is not None:
+            usage_log.flushed.connect(self._update_report)
+
+        self.setWindowTitle(f"{APP_NAME} - Diagnostics")
+        self.setWindowFlags(Qt.Window | Qt.WindowStaysOnTopHint)
+        self.setStyleSheet("background-color: #1E1E1E;")
+        self.resize(560, 420)
+
+        layout = QVBoxLayout(self)
+
+        self.report = QPlainTextEdit()
+        self.report.setReadOnly(True)
+        self.report.setFont(QFont("Consolas", 9))
+        self.report.setStyleSheet("""
+            QPlainTextEdit {
+                background-color: #151515;
+                color: #E0E0E0;
+                border: 1px solid #404040;
+            }
+        """)
+        layout.addWidget(self.report)
+
+        buttons = QHBoxLayout()
+        for label, handler in (
+            ("Refresh", self.refresh),
+            ("Copy", self._copy),
+            ("Export JSON...", self._export),
+        ):
+            button = QPushButton(label)
+            button.setStyleSheet(BUTTON_STYLE)
+            button.clicked.connect(handler)
+            buttons.addWidget(button)
+        buttons.addStretch()
+        layout.addLayout(buttons)
+
+        self.refresh()
+
+    def refresh(self):
+        """
+        Re-read the metrics registry and the settings validation report.
+        Usage totals are shown as last folded, then again once the usage
+        log has written out what it had queued.
+        """
+        self._update_report()
+        if self._usage_log is not None and self._usage_log.is_active():
+            self._usage_log.flush()
+
+    def _update_report(self):
+        text = get_metrics().format_report()
+        rejected = self._settings.rejected_fields()
+        if rejected:
+            lines = [problem.describe() for problem in rejected]
+            text += "\n\nSettings not used as saved:\n  " + "\n  ".join(lines)
+        if self._usage_log is not None and self._usage_log.is_active():
+            lines = []
+            for day, totals in self._usage_log.stats(USAGE_REPORT_DAYS):
+                average = totals.average_brightness
+                lines.append(
+                    f"{day}  on {totals.on_seconds / 3600:5.2f} h  "
+                    f"avg {'-' if average is None else f'{average:.0f}%':>4}  "
+                    f"{totals.energy_wh:6.1f} Wh  turned on {totals.turned_on}x"
+                )
+            text += "\n\nUsage (approximate extra panel energy):\n  " + "\n  ".join(lines)
+        self.report.setPlainText(text)
+
+    def showEvent(self, event):
+        self.refresh()
+        super().showEvent(event)
+
+    def _copy(self):
+        QApplication.clipboard().setText(self.report.toPlainText())
+
+    def _export(self):
+        default_name = time.strftime("edgelight_metrics_%Y%m%d_%H%M%S.json")
+        path, _ = QFileDialog.getSaveFileName(
+            self, "Export Metrics", default_name, "JSON files (*.json)"
+        )
+        if path:
+            get_metrics().export_json(path)
@@ -2,14 +2,20 @@
 # Uses the 'keyboard' library for reliable Windows hotkey detection
 
 import threading
+import time
 from typing import Callable, Optional, Dict
 
+from log import get_logger
+from metrics import get_metrics
+
+_log = get_logger('hotkey')
+
 try:
     import keyboard
     KEYBOARD_AVAILABLE = True
 except ImportError:
     KEYBOARD_AVAILABLE = False
-    print("Warning: keyboard library not available, global hotkeys disabled")
+    _log.warning("keyboard library not available, global hotkeys disabled")
 
 
 def hotkey_to_display_string(hotkey_str: str) -> str:
@@ -77,7 +83,7 @@ class MultiHotkeyManager:
     def update_hotkey(self, name: str, new_hotkey_str: str):
         """Update an existing hotkey's key combination."""
         if name not in self._hotkeys:
-            print(f"Hotkey '{name}' not found")
+            _log.warning("Hotkey '%s' not found", name)
             return
         
         normalized = normalize_hotkey(new_hotkey_str)
@@ -90,7 +96,15 @@ class MultiHotkeyManager:
         if self._running:
             self._register_single(name)
         
-        print(f"Hotkey '{name}' changed to: {hotkey_to_display_string(normalized)}")
+        _log.info("Hotkey '%s' changed to: %s", name, hotkey_to_display_string(normalized))
+    
+    def unregister_hotkey(self, name: str):
+        """Remove a hotkey."""
+        if name not in self._hotkeys:
+            return
+        if self._running:
+            self._unregister_single(name)
+        del self._hotkeys[name]
     
     def get_hotkey(self, name: str) -> str:
         """Get the current hotkey string for a named hotkey."""
@@ -101,7 +115,7 @@ class MultiHotkeyManager:
     def start(self):
         """Start listening for all registered hotkeys."""
         if not KEYBOARD_AVAILABLE:
-            print("Hotkey support not available (keyboard library not installed)")
+            _log.warning("Hotkey support not available (keyboard library not installed)")
             return
         
         if self._running:
@@ -112,7 +126,7 @@ class MultiHotkeyManager:
         for name in self._hotkeys:
             self._register_single(name)
         
-        print("Hotkey manager started")
+        _log.info("Hotkey manager started")
     
     def stop(self):
         """Stop listening for all hotkeys."""
@@ -136,9 +150,9 @@ class MultiHotkeyManager:
                 suppress=False,
                 trigger_on_release=False
             )
-            print(f"Registered hotkey '{name}': {hotkey_str}")
+            _log.info("Registered hotkey '%s': %s", name, hotkey_str)
         except Exception as e:
-            print(f"Failed to register hotkey '{name}' ({hotkey_str}): {e}")
+            _log.error("Failed to register hotkey '%s' (%s): %s", name, hotkey_str, e)
     
     def _unregister_single(self, name: str):
         """Unregister a single hotkey."""
@@ -152,7 +166,7 @@ class MultiHotkeyManager:
         except (KeyError, ValueError):
             pass
         except Exception as e:
-            print(f"Error unregistering hotkey '{name}': {e}")
+            _log.error("Error unregistering hotkey '%s': %s", name, e)
     
     def is_running(self) -> bool:
         """Check if hotkey manager is running."""
@@ -169,6 +183,9 @@ class ThreadSafeMultiHotkeyManager:
         """Initialize the thread-safe manager."""
         self.manager = MultiHotkeyManager()
         self._signals = {}
+        self._emitted_at: Dict[str, float] = {}
+        self._dispatch_latency = get_metrics().histogram('hotkey.dispatch_latency')
+        self._press_count = get_metrics().counter('hotkey.presses')
     
     def register_hotkey(self, name: str, hotkey_str: str, qt_signal):
         """
@@ -180,15 +197,25 @@ class ThreadSafeMultiHotkeyManager:
             qt_signal: Qt signal to emit when hotkey is pressed
         """
         self._signals[name] = qt_signal
+        # Connected first, so it runs as the GUI thread starts dispatching
+        qt_signal.connect(lambda: self._on_dispatched(name))
         self.manager.register_hotkey(name, hotkey_str, lambda: self._emit_signal(name))
     
     def _emit_signal(self, name: str):
         """Emit the Qt signal for the given hotkey name."""
         if name in self._signals:
+            self._emitted_at[name] = time.perf_counter()
+            self._press_count.inc()
             try:
                 self._signals[name].emit()
             except Exception as e:
-                print(f"Error emitting signal for '{name}': {e}")
+                _log.error("Error emitting signal for '%s': %s", name, e)
+    
+    def _on_dispatched(self, name: str):
+        """Runs on the GUI thread: record hook-to-dispatch latency."""
+        emitted_at = self._emitted_at.pop(name, None)
+        if emitted_at is not None:
+            self._dispatch_latency.observe(time.perf_counter() - emitted_at)
     
     def update_hotkey(self, name: str, new_hotkey_str: str):
         """Update an existing hotkey."""
@@ -205,3 +232,29 @@ class ThreadSafeMultiHotkeyManager:
     def stop(self):
         """Stop listening for hotkeys."""
         self.manager.stop()
+
+
+class NullHotkeyManager:
+    """
+    Hotkey manager that never hooks the keyboard, for embedding hosts
+    that have their own shortcuts and for headless rigs.
+    """
+    
+    def __init__(self):
+        self._hotkeys: Dict[str, str] = {}
+    
+    def register_hotkey(self, name: str, hotkey_str: str, qt_signal):
+        self._hotkeys[name] = hotkey_str
+    
+    def update_hotkey(self, name: str, new_hotkey_str: str):
+        if name in self._hotkeys:
+            self._hotkeys[name] = new_hotkey_str
+    
+    def get_hotkey(self, name: str) -> str:
+        return self._hotkeys.get(name, "")
+    
+    def start(self):
+        pass
+    
+    def stop(self):
+        pass
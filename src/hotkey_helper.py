@@ -0,0 +1,96 @@
+# Edge Light - Hotkey Helper Process
+# Owns the global keyboard hook in a separate process (no Qt imported here)
+#
+# Protocol: one JSON object per line.
+#   app -> helper (stdin):  {"op": "register", "name": "toggle", "hotkey": "alt+shift+l"}
+#                           {"op": "unregister", "name": "toggle"}
+#                           {"op": "quit"}
+#   helper -> app (stdout): {"event": "ready"}
+#                           {"event": "hotkey", "name": "toggle", "t": <unix time>}
+# Diagnostics go to stderr. The helper exits when stdin closes.
+
+import json
+import os
+import sys
+import threading
+import time
+
+from constants import HOTKEY_HELPER_EXIT_UNAVAILABLE
+from log import get_log, get_logger
+from hotkey import KEYBOARD_AVAILABLE, MultiHotkeyManager
+
+_log = get_logger('hotkey')
+
+
+class HotkeyHelper:
+    """The helper's side of the pipe: commands in, chord IDs out."""
+
+    def __init__(self, stdin, stdout):
+        self._stdin = stdin
+        self._stdout = stdout
+        self._write_lock = threading.Lock()   # Hook callbacks run on the hook thread
+        self._manager = MultiHotkeyManager()
+
+    def send(self, message: dict) -> None:
+        line = (json.dumps(message, separators=(',', ':')) + "\n").encode('utf-8')
+        with self._write_lock:
+            try:
+                self._stdout.write(line)
+                self._stdout.flush()
+            except (OSError, ValueError):
+                pass  # App went away; stdin EOF ends the loop
+
+    def _on_hotkey(self, name: str) -> None:
+        self.send({'event': 'hotkey', 'name': name, 't': time.time()})
+
+    def handle(self, command: dict) -> bool:
+        """Apply one command. Returns False when the helper should exit."""
+        op = command.get('op')
+        name = command.get('name')
+        if op == 'register' and name and command.get('hotkey'):
+            self._manager.register_hotkey(
+                name, command['hotkey'], lambda n=name: self._on_hotkey(n)
+            )
+        elif op == 'unregister' and name:
+            self._manager.unregister_hotkey(name)
+        elif op == 'quit':
+            return False
+        else:
+            _log.warning("Unknown helper command: %r", command)
+        return True
+
+    def run(self) -> int:
+        self._manager.start()
+        self.send({'event': 'ready'})
+        try:
+            for raw in self._stdin:
+                try:
+                    command = json.loads(raw.decode('utf-8'))
+                except ValueError:
+                    _log.warning("Bad helper command: %r", raw)
+                    continue
+                if not isinstance(command, dict) or not self.handle(command):
+                    break
+        finally:
+            self._manager.stop()
+        return 0
+
+
+def run_helper() -> int:
+    """Entry point for --hotkey-helper."""
+    log = get_log()
+    log.set_console(True)   # stderr, relayed into the app's log
+    if not KEYBOARD_AVAILABLE:
+        return HOTKEY_HELPER_EXIT_UNAVAILABLE
+
+    # Raw fds: windowed builds may not set up sys.stdin/sys.stdout
+    stdin = os.fdopen(0, 'rb')
+    stdout = os.fdopen(1, 'wb')
+    try:
+        return HotkeyHelper(stdin, stdout).run()
+    finally:
+        log.shutdown()
+
+
+if __name__ == "__main__":
+    sys.exit(run_helper())
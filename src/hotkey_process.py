@@ -0,0 +1,203 @@
+# Edge Light - Isolated Hotkey Manager
+# Runs the keyboard hook in a supervised helper process (see hotkey_helper.py)
+
+import json
+import os
+import sys
+import time
+from typing import Dict, List
+
+from PyQt5.QtCore import QObject, QProcess, QTimer
+
+from constants import (
+    HOTKEY_HELPER_FLAG, HOTKEY_HELPER_EXIT_UNAVAILABLE,
+    HOTKEY_HELPER_RESTART_DELAYS_MS, HOTKEY_HELPER_STABLE_SECONDS,
+)
+from hotkey import ThreadSafeMultiHotkeyManager, normalize_hotkey
+from log import get_logger
+from metrics import get_metrics
+
+_log = get_logger('hotkey')
+
+
+def get_helper_command() -> List[str]:
+    """Program and arguments that start the helper."""
+    if getattr(sys, 'frozen', False):
+        return [sys.executable, HOTKEY_HELPER_FLAG]
+    main_script = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'main.py')
+    return [sys.executable, main_script, HOTKEY_HELPER_FLAG]
+
+
+class IsolatedHotkeyManager(QObject):
+    """
+    Same interface as ThreadSafeMultiHotkeyManager, but the hook lives in a
+    helper process that reports matched chords over its stdout. A helper
+    that dies is restarted with backoff; if restarts keep failing, the
+    hotkeys fall back to the in-process hook.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+
+        self._hotkeys: Dict[str, str] = {}     # name -> normalized hotkey
+        self._signals = {}
+        self._running = False
+        self._started_at = 0.0
+        self._failures = 0
+        self._fallback = None
+
+        self._process = None
+        self._restart_timer = QTimer(self)
+        self._restart_timer.setSingleShot(True)
+        self._restart_timer.timeout.connect(self._spawn)
+
+        self._dispatch_latency = get_metrics().histogram('hotkey.dispatch_latency')
+        self._press_count = get_metrics().counter('hotkey.presses')
+        self._restart_count = get_metrics().counter('hotkey.helper_restarts')
+
+    def register_hotkey(self, name: str, hotkey_str: str, qt_signal):
+        """Register a hotkey with a Qt signal (emitted on the GUI thread)."""
+        self._signals[name] = qt_signal
+        self._hotkeys[name] = normalize_hotkey(hotkey_str)
+        if self._fallback is not None:
+            self._fallback.register_hotkey(name, hotkey_str, qt_signal)
+        else:
+            self._send_registration(name)
+
+    def update_hotkey(self, name: str, new_hotkey_str: str):
+        """Update an existing hotkey."""
+        if name not in self._hotkeys:
+            _log.warning("Hotkey '%s' not found", name)
+            return
+        self._hotkeys[name] = normalize_hotkey(new_hotkey_str)
+        if self._fallback is not None:
+            self._fallback.update_hotkey(name, new_hotkey_str)
+        else:
+            self._send_registration(name)
+
+    def get_hotkey(self, name: str) -> str:
+        """Get the current hotkey string."""
+        return self._hotkeys.get(name, "")
+
+    def start(self):
+        """Start the helper."""
+        if self._running:
+            return
+        self._running = True
+        if self._fallback is not None:
+            self._fallback.start()
+        else:
+            self._spawn()
+
+    def stop(self):
+        """Ask the helper to exit (killing it if it doesn't)."""
+        self._running = False
+        self._restart_timer.stop()
+        if self._fallback is not None:
+            self._fallback.stop()
+        process, self._process = self._process, None
+        if process is None:
+            return
+        if process.state() != QProcess.NotRunning:
+            self._write(process, {'op': 'quit'})
+            process.closeWriteChannel()
+            if not process.waitForFinished(1000):
+                process.kill()
+                process.waitForFinished(1000)
+        process.deleteLater()
+
+    def is_isolated(self) -> bool:
+        """False once the hotkeys fell back to the in-process hook."""
+        return self._fallback is None
+
+    def _spawn(self):
+        if not self._running:
+            return
+        program, *args = get_helper_command()
+        process = QProcess(self)
+        process.started.connect(lambda: self._on_started(process))
+        process.readyReadStandardOutput.connect(lambda: self._on_stdout(process))
+        process.readyReadStandardError.connect(lambda: self._on_stderr(process))
+        process.finished.connect(lambda code, status: self._on_finished(process, code))
+        process.errorOccurred.connect(lambda error: self._on_error(process, error))
+        self._process = process
+        self._started_at = time.monotonic()
+        process.start(program, args)
+
+    def _on_started(self, process: QProcess):
+        for name in self._hotkeys:
+            self._send_registration(name)
+
+    def _send_registration(self, name: str):
+        process = self._process
+        if process is not None and process.state() == QProcess.Running:
+            self._write(process, {'op': 'register', 'name': name, 'hotkey': self._hotkeys[name]})
+
+    def _write(self, process: QProcess, message: dict):
+        process.write((json.dumps(message) + "\n").encode('utf-8'))
+
+    def _on_stdout(self, process: QProcess):
+        while process.canReadLine():
+            raw = bytes(process.readLine())
+            try:
+                message = json.loads(raw.decode('utf-8'))
+            except ValueError:
+                _log.warning("Bad message from hotkey helper: %r", raw)
+                continue
+            event = message.get('event')
+            if event == 'hotkey':
+                self._dispatch(message.get('name'), message.get('t'))
+            elif event == 'ready':
+                _log.info("Hotkey helper ready (pid %s)", process.processId())
+
+    def _dispatch(self, name: str, pressed_at):
+        signal = self._signals.get(name)
+        if signal is None:
+            return
+        self._press_count.inc()
+        if isinstance(pressed_at, (int, float)):
+            self._dispatch_latency.observe(max(0.0, time.time() - pressed_at))
+        signal.emit()
+
+    def _on_stderr(self, process: QProcess):
+        text = bytes(process.readAllStandardError()).decode('utf-8', errors='replace')
+        for line in text.splitlines():
+            if line.strip():
+                _log.info("helper: %s", line.rstrip())
+
+    def _on_error(self, process: QProcess, error):
+        if error == QProcess.FailedToStart:
+            _log.error("Hotkey helper failed to start: %s", process.errorString())
+            self._on_finished(process, -1)
+
+    def _on_finished(self, process: QProcess, exit_code: int):
+        if process is not self._process:
+            return  # Stopped on purpose, or already handled
+        self._process = None
+        process.deleteLater()
+        if not self._running:
+            return
+
+        if exit_code == HOTKEY_HELPER_EXIT_UNAVAILABLE:
+            _log.warning("Hotkey helper can't hook the keyboard here; hotkeys disabled")
+            return
+
+        if time.monotonic() - self._started_at >= HOTKEY_HELPER_STABLE_SECONDS:
+            self._failures = 0
+        if self._failures >= len(HOTKEY_HELPER_RESTART_DELAYS_MS):
+            self._fall_back()
+            return
+
+        delay = HOTKEY_HELPER_RESTART_DELAYS_MS[self._failures]
+        self._failures += 1
+        self._restart_count.inc()
+        _log.warning("Hotkey helper exited (code %s), restarting in %d ms", exit_code, delay)
+        self._restart_timer.start(delay)
+
+    def _fall_back(self):
+        """Give up on the helper and hook the keyboard in this process."""
+        _log.error("Hotkey helper keeps failing; using the in-process hook")
+        self._fallback = ThreadSafeMultiHotkeyManager()
+        for name, hotkey_str in self._hotkeys.items():
+            self._fallback.register_hotkey(name, hotkey_str, self._signals[name])
+        self._fallback.start()
@@ -0,0 +1,213 @@
+# Edge Light - Structured Logger
+# In-memory ring buffer log with optional background console/file sinks
+
+import os
+import queue
+import sys
+import threading
+import time
+from collections import deque
+from typing import Iterable, List, Optional
+
+from constants import LOG_RING_CAPACITY, LOG_FILE_MAX_BYTES, LOG_FILE_BACKUPS
+
+DEBUG = 10
+INFO = 20
+WARNING = 30
+ERROR = 40
+
+LEVEL_NAMES = {DEBUG: "DEBUG", INFO: "INFO", WARNING: "WARN", ERROR: "ERROR"}
+LEVELS_BY_NAME = {
+    "debug": DEBUG, "info": INFO, "warning": WARNING, "warn": WARNING, "error": ERROR,
+}
+
+
+def format_record(record: tuple) -> str:
+    """Format a (time, level, category, thread, message) record as one line."""
+    timestamp, level, category, thread, message = record
+    clock = time.strftime("%H:%M:%S", time.localtime(timestamp))
+    millis = int((timestamp % 1) * 1000)
+    return f"{clock}.{millis:03d} {LEVEL_NAMES.get(level, level):<5} {category:<10} [{thread}] {message}"
+
+
+class _SinkThread(threading.Thread):
+    """Writes records to the console and/or a rotating file, off the caller's thread."""
+
+    def __init__(self):
+        super().__init__(name="edgelight-log", daemon=True)
+        self.queue = queue.SimpleQueue()
+        self.console = None
+        self.file_path: Optional[str] = None
+        self.max_bytes = LOG_FILE_MAX_BYTES
+        self.backups = LOG_FILE_BACKUPS
+        self._file = None
+
+    def run(self):
+        while True:
+            record = self.queue.get()
+            if record is None:
+                break
+            line = format_record(record) + "\n"
+            try:
+                if self.console is not None:
+                    self.console.write(line)
+                    self.console.flush()
+                if self.file_path:
+                    self._write_file(line)
+            except (IOError, OSError, ValueError):
+                pass  # Nowhere left to report it
+        if self._file is not None:
+            self._file.close()
+
+    def _write_file(self, line: str):
+        if self._file is None:
+            self._file = open(self.file_path, 'a', encoding='utf-8')
+        self._file.write(line)
+        self._file.flush()
+        if self._file.tell() > self.max_bytes:
+            self._rotate()
+
+    def _rotate(self):
+        """edgelight.log -> edgelight.log.1 -> ... -> edgelight.log.N (dropped)."""
+        self._file.close()
+        self._file = None
+        for i in range(self.backups, 0, -1):
+            source = self.file_path if i == 1 else f"{self.file_path}.{i - 1}"
+            if os.path.exists(source):
+                os.replace(source, f"{self.file_path}.{i}")
+
+
+class RingLog:
+    """
+    The log itself: a bounded deque of records.
+
+    deque.append with maxlen is atomic under the GIL, so any thread
+    (hook thread, worker threads, GUI) can log without taking a lock.
+    Records below the level, or outside the category filter, are
+    dropped before any formatting happens.
+    """
+
+    def __init__(self, capacity: int = LOG_RING_CAPACITY):
+        self._records = deque(maxlen=capacity)
+        self.level = INFO
+        self._categories: Optional[frozenset] = None
+        self._sink: Optional[_SinkThread] = None
+
+    def configure(self, level=None, categories: Optional[Iterable[str]] = None) -> None:
+        """
+        Set the minimum level (number or name) and the categories to keep
+        (None or empty = all).
+        """
+        if level is not None:
+            if isinstance(level, str):
+                level = LEVELS_BY_NAME.get(level.lower(), INFO)
+            self.level = level
+        if categories is not None:
+            self._categories = frozenset(categories) or None
+
+    def enabled_for(self, level: int, category: str) -> bool:
+        if level < self.level:
+            return False
+        return self._categories is None or category in self._categories
+
+    def log(self, level: int, category: str, message: str, *args) -> None:
+        if level < self.level:
+            return
+        if self._categories is not None and category not in self._categories:
+            return
+        if args:
+            message = message % args
+        record = (time.time(), level, category, threading.current_thread().name, message)
+        self._records.append(record)
+        sink = self._sink
+        if sink is not None:
+            sink.queue.put(record)
+
+    def recent(self, count: Optional[int] = None) -> List[tuple]:
+        """Most recent records, oldest first."""
+        records = list(self._records)
+        return records if count is None else records[-count:]
+
+    def format_recent(self, count: Optional[int] = None) -> str:
+        return "\n".join(format_record(r) for r in self.recent(count))
+
+    def dump(self, path: str) -> bool:
+        """Write the buffered records to a file (for bug reports)."""
+        try:
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(self.format_recent() + "\n")
+            return True
+        except (IOError, OSError) as e:
+            self.log(ERROR, 'log', "Could not dump log: %s", e)
+            return False
+
+    def set_console(self, enabled: bool) -> None:
+        """Echo records to stderr (from the sink thread). No-op without a console."""
+        stream = sys.stderr if enabled else None
+        if stream is None and self._sink is None:
+            return
+        self._ensure_sink().console = stream
+
+    def set_file(self, path: Optional[str], max_bytes: int = LOG_FILE_MAX_BYTES,
+                 backups: int = LOG_FILE_BACKUPS) -> None:
+        """Also write records to a size-rotated file (None to stop)."""
+        if path is None and self._sink is None:
+            return
+        sink = self._ensure_sink()
+        sink.max_bytes = max_bytes
+        sink.backups = backups
+        sink.file_path = path
+
+    def shutdown(self) -> None:
+        """Flush and stop the sink thread."""
+        sink, self._sink = self._sink, None
+        if sink is not None:
+            sink.queue.put(None)
+            sink.join(timeout=1.0)
+
+    def _ensure_sink(self) -> _SinkThread:
+        if self._sink is None:
+            self._sink = _SinkThread()
+            self._sink.start()
+        return self._sink
+
+
+class Logger:
+    """A category-bound handle on the ring log."""
+
+    __slots__ = ('_log', 'category')
+
+    def __init__(self, ring_log: RingLog, category: str):
+        self._log = ring_log
+        self.category = category
+
+    def debug(self, message: str, *args) -> None:
+        if DEBUG >= self._log.level:
+            self._log.log(DEBUG, self.category, message, *args)
+
+    def info(self, message: str, *args) -> None:
+        if INFO >= self._log.level:
+            self._log.log(INFO, self.category, message, *args)
+
+    def warning(self, message: str, *args) -> None:
+        self._log.log(WARNING, self.category, message, *args)
+
+    def error(self, message: str, *args) -> None:
+        self._log.log(ERROR, self.category, message, *args)
+
+
+# Global log instance
+_ring_log = None
+
+
+def get_log() -> RingLog:
+    """Get the global ring log."""
+    global _ring_log
+    if _ring_log is None:
+        _ring_log = RingLog()
+    return _ring_log
+
+
+def get_logger(category: str) -> Logger:
+    """Get a logger for a category such as 'hotkey' or 'settings'."""
+    return Logger(get_log(), category)
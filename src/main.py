@@ -3,6 +3,7 @@
 
 import sys
 import os
+import time
 
 # Add src directory to path for imports
 if getattr(sys, 'frozen', False):
@@ -12,83 +13,157 @@ else:
     
 sys.path.insert(0, src_dir)
 
+from constants import HOTKEY_HELPER_FLAG
+if HOTKEY_HELPER_FLAG in sys.argv:
+    # Keyboard hook helper: must not import Qt
+    from hotkey_helper import run_helper
+    sys.exit(run_helper())
+
+from profiler import get_startup_profiler
+get_startup_profiler()  # Start the clock before the heavy imports
+
+from log import get_log
+# Echo the log to the console in source runs (windowed builds have none)
+get_log().set_console(not getattr(sys, 'frozen', False) or get_startup_profiler().verbose)
+
 from PyQt5.QtWidgets import QApplication
-from PyQt5.QtCore import QObject, pyqtSignal
+from PyQt5.QtCore import Qt, QTimer
+
+from constants import (
+    APP_NAME, BACKGROUND_FLAG,
+    WATCHDOG_FLAG, WATCHDOG_LOG_FILENAME,
+    LOG_LEVEL_FLAG, LOG_FILENAME, RECORD_FLAG,
+)
+from settings_manager import get_settings_manager, get_data_dir
+from core import EdgeLightCore
+from hotkey import hotkey_to_display_string
+
+
+def get_record_path_arg():
+    """Get the recording path from --record[=path], or None if not recording."""
+    for arg in sys.argv[1:]:
+        if arg == RECORD_FLAG:
+            return os.path.join(
+                get_data_dir(), time.strftime("edgelight_recording_%Y%m%d_%H%M%S.jsonl")
+            )
+        if arg.startswith(RECORD_FLAG + "="):
+            return arg.split("=", 1)[1]
+    return None
 
-from constants import APP_NAME
-from settings_manager import get_settings_manager
-from overlay import GlowOverlay
-from tray import TrayManager
-from hotkey import ThreadSafeMultiHotkeyManager, hotkey_to_display_string
 
+def get_log_level_arg():
+    """Get the level from --log-level=<name>, or None."""
+    for arg in sys.argv[1:]:
+        if arg.startswith(LOG_LEVEL_FLAG + "="):
+            return arg.split("=", 1)[1]
+    return None
 
-class HotkeySignalBridge(QObject):
-    """Bridge to emit Qt signals from hotkey threads."""
-    toggle_pressed = pyqtSignal()
-    panel_pressed = pyqtSignal()
+
+def enable_high_dpi():
+    """
+    Work in logical pixels and let Qt report the exact (possibly
+    fractional) device pixel ratio; the overlay rasterizes at that ratio.
+    Must run before the QApplication is created.
+    """
+    QApplication.setAttribute(Qt.AA_EnableHighDpiScaling, True)
+    QApplication.setAttribute(Qt.AA_UseHighDpiPixmaps, True)
+    if hasattr(QApplication, 'setHighDpiScaleFactorRoundingPolicy'):   # Qt 5.14+
+        QApplication.setHighDpiScaleFactorRoundingPolicy(
+            Qt.HighDpiScaleFactorRoundingPolicy.PassThrough
+        )
 
 
 def main():
     """Main entry point for Edge Light application."""
+    profiler = get_startup_profiler()
     
     # Create Qt application
-    app = QApplication(sys.argv)
-    app.setApplicationName(APP_NAME)
-    app.setQuitOnLastWindowClosed(False)
-    
-    # Apply dark theme
-    app.setStyleSheet("""
-        QToolTip {
-            background-color: #2D2D2D;
-            color: #E0E0E0;
-            border: 1px solid #404040;
-            padding: 5px;
-            border-radius: 3px;
-        }
-    """)
-    
-    # Initialize settings and get saved hotkeys
-    settings = get_settings_manager()
-    hotkey_toggle = settings.get('hotkey_toggle', 'alt+shift+l')
-    hotkey_panel = settings.get('hotkey_panel', 'alt+shift+p')
+    with profiler.phase('qt_application'):
+        enable_high_dpi()
+        app = QApplication(sys.argv)
+        app.setApplicationName(APP_NAME)
+        app.setQuitOnLastWindowClosed(False)
+        
+        # Apply dark theme
+        app.setStyleSheet("""
+            QToolTip {
+                background-color: #2D2D2D;
+                color: #E0E0E0;
+                border: 1px solid #404040;
+                padding: 5px;
+                border-radius: 3px;
+            }
+        """)
     
-    # Initialize components
-    overlay = GlowOverlay()
+    with profiler.phase('settings'):
+        settings = get_settings_manager()
     
-    # Setup hotkey bridge (converts thread callbacks to Qt signals)
-    hotkey_bridge = HotkeySignalBridge()
-    
-    # Create multi-hotkey manager
-    hotkey_manager = ThreadSafeMultiHotkeyManager()
+    # Log level, category filter and optional file sink
+    log = get_log()
+    log.configure(
+        get_log_level_arg() or settings.model.log_level,
+        settings.model.log_categories,
+    )
+    if settings.model.log_to_file:
+        log.set_file(os.path.join(get_data_dir(), LOG_FILENAME))
     
-    # Create tray manager
-    tray = TrayManager(overlay, settings, hotkey_manager)
+    # Optional stall watchdog: logs what blocked the GUI thread
+    watchdog = None
+    if WATCHDOG_FLAG in sys.argv or settings.model.watchdog_enabled:
+        from watchdog import StallWatchdog
+        watchdog = StallWatchdog(
+            settings.model.watchdog_threshold_ms,
+            os.path.join(get_data_dir(), WATCHDOG_LOG_FILENAME),
+        )
+        watchdog.start()
     
-    # Register hotkeys with their signals
-    hotkey_manager.register_hotkey('toggle', hotkey_toggle, hotkey_bridge.toggle_pressed)
-    hotkey_manager.register_hotkey('panel', hotkey_panel, hotkey_bridge.panel_pressed)
+    # Login launches bring up the tray icon and hotkeys first and build
+    # everything else later, unless the light has to come on right away
+    background = BACKGROUND_FLAG in sys.argv
+    core = EdgeLightCore(settings, background=background)
+    core.quitRequested.connect(app.quit)
+    core.start()
     
-    # Connect hotkey signals to tray actions
-    hotkey_bridge.toggle_pressed.connect(tray.toggle)
-    hotkey_bridge.panel_pressed.connect(tray.open_panel)
+    # Optional interaction recording, for replay benchmarks
+    recorder = None
+    record_path = get_record_path_arg()
+    if record_path:
+        from recorder import InteractionRecorder
+        screen = app.primaryScreen()
+        recorder = InteractionRecorder(
+            record_path, settings.layers(), (screen.size().width(), screen.size().height())
+        )
+        core.tray.set_recorder(recorder)
+        core.hotkey_bridge.toggle_pressed.connect(lambda: recorder.record('hotkey', 'toggle'))
+        core.hotkey_bridge.panel_pressed.connect(lambda: recorder.record('hotkey', 'panel'))
+        screen.geometryChanged.connect(
+            lambda rect: recorder.record('screen', [rect.width(), rect.height()])
+        )
     
-    # Start hotkey listener
-    hotkey_manager.start()
+    # Show startup notification (not when starting silently at login)
+    if not background:
+        toggle_display = hotkey_to_display_string(settings.model.hotkey_toggle)
+        panel_display = hotkey_to_display_string(settings.model.hotkey_panel)
+        core.tray.show_notification(
+            f"{APP_NAME} Started",
+            f"Toggle: {toggle_display} | Panel: {panel_display}"
+        )
     
-    # Show startup notification
-    toggle_display = hotkey_to_display_string(hotkey_toggle)
-    panel_display = hotkey_to_display_string(hotkey_panel)
-    tray.show_notification(
-        f"{APP_NAME} Started",
-        f"Toggle: {toggle_display} | Panel: {panel_display}"
-    )
+    def startup_finished():
+        profiler.mark('event_loop_running')
+        profiler.print_report()
+    QTimer.singleShot(0, startup_finished)
     
     # Run application
     exit_code = app.exec_()
     
     # Cleanup
-    hotkey_manager.stop()
-    settings.save()
+    if recorder is not None:
+        recorder.close()
+    if watchdog is not None:
+        watchdog.stop()
+    core.stop()
+    log.shutdown()
     
     return exit_code
 
@@ -0,0 +1,86 @@
+# Edge Light - Memory Helpers
+# Heap trimming and resident-set measurement for low-memory mode
+
+import ctypes
+import ctypes.util
+import gc
+import os
+import sys
+from typing import Optional
+
+from log import get_logger
+from metrics import get_metrics
+
+_log = get_logger('memory')
+_trim_count = get_metrics().counter('memory.trims')
+_trim_time = get_metrics().histogram('memory.trim')
+
+_libc = None
+
+
+def _get_libc():
+    """glibc handle for malloc_trim, or False where it isn't available."""
+    global _libc
+    if _libc is None:
+        _libc = False
+        if sys.platform.startswith('linux'):
+            try:
+                libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6')
+                libc.malloc_trim  # musl has no malloc_trim
+                _libc = libc
+            except (OSError, AttributeError):
+                pass
+    return _libc
+
+
+def trim_heap() -> None:
+    """
+    Collect garbage, then hand freed memory back to the OS: malloc_trim on
+    glibc, EmptyWorkingSet on Windows (pages come back on demand).
+    """
+    with _trim_time.time():
+        gc.collect()
+        try:
+            if sys.platform == 'win32':
+                kernel32 = ctypes.windll.kernel32
+                ctypes.windll.psapi.EmptyWorkingSet(kernel32.GetCurrentProcess())
+            else:
+                libc = _get_libc()
+                if libc:
+                    libc.malloc_trim(0)
+        except (OSError, AttributeError) as e:
+            _log.debug("Heap trim failed: %s", e)
+    _trim_count.inc()
+
+
+class _ProcessMemoryCounters(ctypes.Structure):
+    _fields_ = [
+        ('cb', ctypes.c_ulong),
+        ('PageFaultCount', ctypes.c_ulong),
+        ('PeakWorkingSetSize', ctypes.c_size_t),
+        ('WorkingSetSize', ctypes.c_size_t),
+        ('QuotaPeakPagedPoolUsage', ctypes.c_size_t),
+        ('QuotaPagedPoolUsage', ctypes.c_size_t),
+        ('QuotaPeakNonPagedPoolUsage', ctypes.c_size_t),
+        ('QuotaNonPagedPoolUsage', ctypes.c_size_t),
+        ('PagefileUsage', ctypes.c_size_t),
+        ('PeakPagefileUsage', ctypes.c_size_t),
+    ]
+
+
+def get_rss_bytes() -> Optional[int]:
+    """Current resident set size (working set on Windows), or None if unknown."""
+    if sys.platform == 'win32':
+        counters = _ProcessMemoryCounters()
+        counters.cb = ctypes.sizeof(counters)
+        kernel32 = ctypes.windll.kernel32
+        if ctypes.windll.psapi.GetProcessMemoryInfo(
+                kernel32.GetCurrentProcess(), ctypes.byref(counters), counters.cb):
+            return counters.WorkingSetSize
+        return None
+    try:
+        with open('/proc/self/statm', 'r') as f:
+            resident_pages = int(f.read().split()[1])
+        return resident_pages * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        return None
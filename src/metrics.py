@@ -0,0 +1,174 @@
+# Edge Light - Runtime Metrics
+# Low-overhead counters and timing histograms for the hot paths
+
+import bisect
+import json
+import time
+from contextlib import contextmanager
+from typing import Dict, Tuple
+
+from log import get_logger
+from profiler import get_startup_profiler
+
+_log = get_logger('metrics')
+
+# Histogram bucket upper bounds in milliseconds (last bucket is open)
+DEFAULT_BUCKETS_MS = (0.25, 0.5, 1, 2, 4, 8, 16, 33, 66, 133, 250, 500, 1000)
+
+
+class Counter:
+    """A monotonically increasing count."""
+
+    __slots__ = ('name', 'value')
+
+    def __init__(self, name: str):
+        self.name = name
+        self.value = 0
+
+    def inc(self, amount: int = 1) -> None:
+        self.value += amount
+
+    def snapshot(self) -> int:
+        return self.value
+
+
+class Histogram:
+    """
+    Fixed-bucket duration histogram. Observing is a bisect and three
+    additions, cheap enough for paint and hook paths.
+    """
+
+    __slots__ = ('name', 'bounds', 'counts', 'count', 'total', 'max')
+
+    def __init__(self, name: str, bounds: Tuple[float, ...] = DEFAULT_BUCKETS_MS):
+        self.name = name
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds: float) -> None:
+        """Record a duration in seconds."""
+        ms = seconds * 1000.0
+        self.counts[bisect.bisect_left(self.bounds, ms)] += 1
+        self.count += 1
+        self.total += ms
+        if ms > self.max:
+            self.max = ms
+
+    @contextmanager
+    def time(self):
+        """Time a block of code."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start)
+
+    def percentile(self, fraction: float) -> float:
+        """Approximate percentile (upper bound of the bucket it falls in), in ms."""
+        if not self.count:
+            return 0.0
+        target = fraction * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= target:
+                return min(self.bounds[i], self.max) if i < len(self.bounds) else self.max
+        return self.max
+
+    def snapshot(self) -> dict:
+        buckets = {f"<={bound}": n for bound, n in zip(self.bounds, self.counts)}
+        buckets[f">{self.bounds[-1]}"] = self.counts[-1]
+        return {
+            'count': self.count,
+            'mean_ms': self.total / self.count if self.count else 0.0,
+            'p50_ms': self.percentile(0.5),
+            'p95_ms': self.percentile(0.95),
+            'max_ms': self.max,
+            'buckets_ms': buckets,
+        }
+
+
+class MetricsRegistry:
+    """Named counters and histograms. Instruments are created once and reused."""
+
+    def __init__(self):
+        self._counters: Dict[str, Counter] = {}
+        self._histograms: Dict[str, Histogram] = {}
+        self._created = time.time()
+
+    def counter(self, name: str) -> Counter:
+        """Get or create a counter."""
+        counter = self._counters.get(name)
+        if counter is None:
+            counter = self._counters[name] = Counter(name)
+        return counter
+
+    def histogram(self, name: str, bounds: Tuple[float, ...] = DEFAULT_BUCKETS_MS) -> Histogram:
+        """Get or create a histogram."""
+        histogram = self._histograms.get(name)
+        if histogram is None:
+            histogram = self._histograms[name] = Histogram(name, bounds)
+        return histogram
+
+    def reset(self) -> None:
+        """Zero all instruments (keeps the objects, so cached references stay valid)."""
+        for counter in self._counters.values():
+            counter.value = 0
+        for histogram in self._histograms.values():
+            histogram.counts = [0] * (len(histogram.bounds) + 1)
+            histogram.count = 0
+            histogram.total = 0.0
+            histogram.max = 0.0
+
+    def snapshot(self) -> dict:
+        """All metrics as plain data."""
+        return {
+            'uptime_s': time.time() - self._created,
+            'counters': {name: c.snapshot() for name, c in sorted(self._counters.items())},
+            'histograms': {name: h.snapshot() for name, h in sorted(self._histograms.items())},
+            'startup': get_startup_profiler().snapshot(),
+        }
+
+    def export_json(self, path: str) -> bool:
+        """Write a JSON snapshot. Returns True on success."""
+        try:
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(self.snapshot(), f, indent=2)
+            return True
+        except (IOError, OSError) as e:
+            _log.error("Could not export metrics: %s", e)
+            return False
+
+    def format_report(self) -> str:
+        """Human-readable summary for the diagnostics view."""
+        snapshot = self.snapshot()
+        lines = [f"Uptime: {snapshot['uptime_s'] / 60:.1f} min", "", "Counters:"]
+        for name, value in snapshot['counters'].items():
+            lines.append(f"  {name:<32} {value:>10}")
+        lines += ["", "Timings (ms):          count    mean     p50     p95     max"]
+        for name, h in snapshot['histograms'].items():
+            lines.append(
+                f"  {name:<20} {h['count']:>7} {h['mean_ms']:>7.2f} {h['p50_ms']:>7.2f} "
+                f"{h['p95_ms']:>7.2f} {h['max_ms']:>7.2f}"
+            )
+        latencies = snapshot['startup']['latencies_ms']
+        if latencies:
+            lines += ["", "Startup:"]
+            for name, ms in latencies.items():
+                lines.append(f"  {name:<32} {ms:>8.1f} ms")
+        return "\n".join(lines)
+
+
+# Global metrics registry instance
+_metrics = None
+
+
+def get_metrics() -> MetricsRegistry:
+    """Get the global metrics registry."""
+    global _metrics
+    if _metrics is None:
+        _metrics = MetricsRegistry()
+    return _metrics
@@ -1,49 +1,42 @@
 # Edge Light - Overlay Window
 # Creates a solid ring light around screen edges
 
-from PyQt5.QtWidgets import QWidget, QApplication, QDesktopWidget
-from PyQt5.QtCore import Qt
-from PyQt5.QtGui import QPainter, QColor, QBrush
+import time
+from functools import partial
+
+from PyQt5.QtWidgets import QWidget, QApplication
+from PyQt5.QtCore import Qt, QTimer, QRect, pyqtSignal
+from PyQt5.QtGui import QPainter, QColor, QRegion, QImage
 
 from constants import (
-    COLOR_TEMP_MIN, COLOR_TEMP_MAX, COLOR_TEMP_MAP,
+    COLOR_TEMP_MIN, COLOR_TEMP_MAX,
     BRIGHTNESS_MIN, BRIGHTNESS_MAX,
-    GLOW_WIDTH_MIN, GLOW_WIDTH_MAX,
-    EDGE_ALL, EDGE_TOP_ONLY, EDGE_TOP_SIDES, EDGE_SIDES_ONLY
+    GLOW_WIDTH_MIN, GLOW_WIDTH_MAX, BREATHING_PERIOD_MIN_MS,
+    ANIMATION_MAX_FPS, EDGE_ALL,
+    DEFAULT_SETTINGS,
+)
+from animation import Animator, ease_in_cubic, ease_out_cubic
+from render_plan import (
+    EDGES, EdgeSpec, parse_edge_specs, parse_exclusion_zones, compile_render_plan,
+    scale_edge_specs, scale_rect, unscale_rect, to_device_pixels, brightness_to_alpha,
+    interpolate_color_temperature,  # Re-exported, used to live here
 )
+from render_worker import BackgroundRenderer
+from renderers import RingGeometry, RenderBudget, execute_commands, render_ring_image
+from profiler import get_startup_profiler
+from metrics import get_metrics
+from memory import trim_heap
+from log import get_logger
 
+# Platforms where a mapped window at zero opacity is really invisible
+OPACITY_CAPABLE_PLATFORMS = ('windows', 'cocoa')
 
-def interpolate_color_temperature(temp: int) -> tuple:
-    """
-    Interpolate RGB values for a given color temperature.
-    Uses linear interpolation between known temperature points.
-    """
-    temps = sorted(COLOR_TEMP_MAP.keys())
-    
-    temp = max(COLOR_TEMP_MIN, min(COLOR_TEMP_MAX, temp))
-    
-    lower_temp = temps[0]
-    upper_temp = temps[-1]
-    
-    for i, t in enumerate(temps):
-        if t <= temp:
-            lower_temp = t
-        if t >= temp:
-            upper_temp = t
-            break
-    
-    if lower_temp == upper_temp:
-        return COLOR_TEMP_MAP[lower_temp]
-    
-    ratio = (temp - lower_temp) / (upper_temp - lower_temp)
-    lower_rgb = COLOR_TEMP_MAP[lower_temp]
-    upper_rgb = COLOR_TEMP_MAP[upper_temp]
-    
-    r = int(lower_rgb[0] + ratio * (upper_rgb[0] - lower_rgb[0]))
-    g = int(lower_rgb[1] + ratio * (upper_rgb[1] - lower_rgb[1]))
-    b = int(lower_rgb[2] + ratio * (upper_rgb[2] - lower_rgb[2]))
-    
-    return (r, g, b)
+_log = get_logger('render')
+
+_paint_count = get_metrics().counter('overlay.paints')
+_paint_time = get_metrics().histogram('overlay.paint')
+_renderer_time = get_metrics().histogram('overlay.renderer')
+_renderer_fallbacks = get_metrics().counter('overlay.renderer_fallbacks')
 
 
 class GlowOverlay(QWidget):
@@ -52,14 +45,75 @@ class GlowOverlay(QWidget):
     around selected screen edges - the ring light effect.
     """
     
-    def __init__(self):
+    # A plugin renderer failed or went over its budget: (name, reason)
+    rendererFallback = pyqtSignal(str, str)
+    
+    def __init__(self, screen=None):
+        """screen is the QScreen the ring surrounds (default: the primary screen)."""
         super().__init__()
         
+        self._screen = screen or QApplication.primaryScreen()
         self._brightness = 60
         self._color_temp = 4500
         self._glow_width = 175
         self._enabled = False
         self._edge_selection = EDGE_ALL
+        self._edge_specs = {edge: EdgeSpec() for edge in EDGES}
+        
+        # Compiled (QRect, QColor) lists in device pixels, one per device
+        # pixel ratio the ring has been painted at; dropped after any change
+        self._plans = {}
+        
+        # Ring minus exclusion zones, in device pixels (the clip) and
+        # logical pixels (the window mask). Only rebuilt when the ring
+        # geometry, the ratio or the zones change.
+        self._exclusion_zones = []
+        self._avoid_taskbar = False
+        self._region = None
+        self._region_geometry = None
+        self._mask = None
+        self._mask_dirty = False
+        
+        # Static plugin renderers run on a worker thread; the last
+        # finished frame stays on screen until the next is ready
+        self._background_rendering = DEFAULT_SETTINGS['background_rendering']
+        self._background = None
+        self._frame = None           # Displayed frame, with the region and mask it was made for
+        self._frame_region = None
+        self._frame_mask = None
+        self._request = None         # (plan, region) of the newest request
+        
+        # Plugin renderer (None = the built-in solid ring), timed per frame
+        self._renderer = None
+        self._renderer_budget = None
+        self._renderer_cache = None  # (plan, region, result) of a static renderer
+        self._renderer_timer = QTimer(self)
+        self._renderer_timer.setSingleShot(True)
+        self._renderer_timer.setInterval(1000 // ANIMATION_MAX_FPS)
+        self._renderer_timer.timeout.connect(self.update)
+        
+        self._fade_duration = DEFAULT_SETTINGS['fade_duration_ms']
+        self._transition_duration = DEFAULT_SETTINGS['transition_duration_ms']
+        self._breathing = False
+        self._breathing_period = DEFAULT_SETTINGS['breathing_period_ms']
+        self._breathing_depth = DEFAULT_SETTINGS['breathing_depth']
+        
+        self._animator = Animator(parent=self)
+        
+        # Pre-warmed windows stay mapped at zero opacity while off
+        self._keep_mapped = False
+        self._first_toggle_start = None
+        self._toggled_once = False
+        
+        # Low-memory mode drops the caches whenever the light goes off
+        self._low_memory = False
+        
+        # Power saving caps the brightness and skips transitions and breathing
+        self._power_saving = False
+        self._brightness_cap = None
+        
+        # Hard limit set by machine policy
+        self._brightness_limit = None
         
         self._setup_window()
     
@@ -75,108 +129,628 @@ class GlowOverlay(QWidget):
         self.setAttribute(Qt.WA_TranslucentBackground, True)
         self.setAttribute(Qt.WA_TransparentForMouseEvents, True)
         
+        screen = self._screen
+        screen.geometryChanged.connect(self._on_screen_changed)
+        screen.availableGeometryChanged.connect(self._on_screen_changed)
+        screen.logicalDotsPerInchChanged.connect(self._on_dpi_changed)
+        
         self._update_geometry()
     
+    def _on_screen_changed(self, *args):
+        """Screen resized or the taskbar moved."""
+        self._invalidate_region()
+        if self.isVisible():
+            self._update_geometry()
+    
+    def _on_dpi_changed(self, *args):
+        """Display scaling changed: plans for the old ratio are no longer used."""
+        self._plans.clear()
+        self._on_screen_changed()
+    
     def _update_geometry(self):
         """Update overlay to cover the entire screen."""
-        desktop = QDesktopWidget()
-        screen_rect = desktop.screenGeometry(desktop.primaryScreen())
-        self.setGeometry(screen_rect)
+        screen_rect = self._screen.geometry()
+        if screen_rect != self.geometry():
+            self.setGeometry(screen_rect)
+    
+    def prewarm(self):
+        """
+        Create and map the native window ahead of time, fully transparent,
+        so the first toggle only has to change the opacity.
+        """
+        if self._keep_mapped or self.isVisible() or self._low_memory:
+            return
+        if QApplication.platformName() not in OPACITY_CAPABLE_PLATFORMS:
+            return  # Zero opacity isn't honoured, the ring would show
+        
+        self._keep_mapped = True
+        self._update_geometry()
+        self.setWindowOpacity(0.0)
+        self.winId()
+        self.show()
+        self.repaint()
+    
+    def is_prewarmed(self) -> bool:
+        """Check if the native window is kept mapped while off."""
+        return self._keep_mapped
+    
+    def set_low_memory(self, enabled: bool):
+        """Release render caches (and trim the heap) each time the light goes off."""
+        self._low_memory = enabled
+        if enabled and not self.isVisible():
+            self.release_resources()
+    
+    def release_resources(self):
+        """Drop the render plan, ring region and window mask; the next paint rebuilds them."""
+        self._drop_frame()
+        self._release_renderer_cache()
+        if not self._plans and self._region is None:
+            return
+        self._plans.clear()
+        self._region = None
+        self._region_geometry = None
+        self._mask = None
+        self.clearMask()
+        trim_heap()
     
     def set_brightness(self, brightness: int):
         """Set brightness level (0-100)."""
+        self._animator.cancel('brightness')
         self._brightness = max(BRIGHTNESS_MIN, min(BRIGHTNESS_MAX, brightness))
-        if self._enabled:
-            self.update()
+        self._invalidate_plan()
     
     def set_color_temperature(self, temp: int):
         """Set color temperature (2700K-6500K)."""
+        self._animator.cancel('color_temperature')
         self._color_temp = max(COLOR_TEMP_MIN, min(COLOR_TEMP_MAX, temp))
-        if self._enabled:
-            self.update()
+        self._invalidate_plan()
     
     def set_glow_width(self, width: int):
         """Set glow width in pixels (solid ring thickness)."""
+        self._animator.cancel('glow_width')
         self._glow_width = max(GLOW_WIDTH_MIN, min(GLOW_WIDTH_MAX, width))
+        self._invalidate_plan()
+    
+    def animate_to(self, brightness: int = None, temperature: int = None,
+                   width: int = None, duration_ms: int = None):
+        """Smoothly move to new values instead of jumping."""
+        if duration_ms is None:
+            duration_ms = self._transition_duration
+        if not self._enabled or self._power_saving:
+            duration_ms = 0
+        
+        if brightness is not None:
+            target = max(BRIGHTNESS_MIN, min(BRIGHTNESS_MAX, brightness))
+            self._animator.animate('brightness', self._brightness, target,
+                                   duration_ms, self._step_brightness)
+        if temperature is not None:
+            target = max(COLOR_TEMP_MIN, min(COLOR_TEMP_MAX, temperature))
+            self._animator.animate('color_temperature', self._color_temp, target,
+                                   duration_ms, self._step_color_temperature)
+        if width is not None:
+            target = max(GLOW_WIDTH_MIN, min(GLOW_WIDTH_MAX, width))
+            self._animator.animate('glow_width', self._glow_width, target,
+                                   duration_ms, self._step_glow_width)
+    
+    def _step_brightness(self, value: float):
+        self._brightness = value
+        self._invalidate_plan()
+    
+    def _step_color_temperature(self, value: float):
+        self._color_temp = value
+        self._invalidate_plan()
+    
+    def _step_glow_width(self, value: float):
+        self._glow_width = int(round(value))
+        self._invalidate_plan()
+    
+    def set_fade_duration(self, duration_ms: int):
+        """Set the fade-in/out duration used when toggling (0 = instant)."""
+        self._fade_duration = max(0, int(duration_ms))
+    
+    def set_transition_duration(self, duration_ms: int):
+        """Set the duration used by animate_to."""
+        self._transition_duration = max(0, int(duration_ms))
+    
+    def set_power_saving(self, enabled: bool, max_brightness: int = None):
+        """
+        Cap the brightness (None = no cap) and turn off the animations
+        that keep redrawing, e.g. while on battery.
+        """
+        self._power_saving = enabled
+        self._brightness_cap = max_brightness if enabled else None
+        if enabled:
+            self._animator.cancel('breathing')
+            if self._enabled and not self._animator.is_animating('opacity'):
+                self.setWindowOpacity(1.0)
+        elif not self._animator.is_animating('opacity'):
+            self._start_breathing()
+        self._invalidate_plan()
+    
+    def is_power_saving(self) -> bool:
+        return self._power_saving
+    
+    def set_brightness_limit(self, max_brightness: int = None):
+        """Never render brighter than this (None = no limit), whatever asks for more."""
+        self._brightness_limit = max_brightness
+        self._invalidate_plan()
+    
+    def _max_brightness(self):
+        caps = [c for c in (self._brightness_limit, self._brightness_cap) if c is not None]
+        return min(caps) if caps else None
+    
+    def set_breathing(self, enabled: bool, period_ms: int = None, depth: int = None):
+        """
+        Enable the breathing effect (a slow pulse of the window opacity).
+        Depth is how far the opacity dips, in percent.
+        """
+        self._breathing = enabled
+        if period_ms is not None:
+            self._breathing_period = max(BREATHING_PERIOD_MIN_MS, int(period_ms))
+        if depth is not None:
+            self._breathing_depth = max(0, min(100, int(depth)))
+        
+        if self._animator.is_animating('opacity'):
+            return  # Picked up when the fade finishes
+        
+        self._animator.cancel('breathing')
         if self._enabled:
-            self.update()
+            self.setWindowOpacity(1.0)
+            self._start_breathing()
     
     def set_edge_selection(self, selection: str):
         """Set which edges to display."""
         self._edge_selection = selection
-        if self._enabled:
-            self.update()
+        self._invalidate_plan()
     
     def get_edge_selection(self) -> str:
         """Get current edge selection."""
         return self._edge_selection
     
+    def set_edge_specs(self, specs):
+        """
+        Set per-edge configuration, either EdgeSpec objects or the
+        'edge_specs' settings dict. Missing edges follow the globals.
+        """
+        if not all(isinstance(spec, EdgeSpec) for spec in (specs or {}).values()):
+            specs = parse_edge_specs(specs)
+        new_specs = {edge: specs.get(edge) or EdgeSpec() for edge in EDGES}
+        if new_specs != self._edge_specs:
+            self._edge_specs = new_specs
+            self._invalidate_plan()
+    
+    def set_edge_spec(self, edge: str, spec: EdgeSpec):
+        """Set the configuration of a single edge."""
+        if self._edge_specs.get(edge) != spec:
+            self._edge_specs[edge] = spec
+            self._invalidate_plan()
+    
+    def get_edge_specs(self) -> dict:
+        """Get the per-edge configuration."""
+        return dict(self._edge_specs)
+    
+    def set_exclusion_zones(self, zones):
+        """
+        Set rectangles (screen coordinates) the ring must leave uncovered,
+        as QRects or the 'exclusion_zones' settings list.
+        """
+        rects = []
+        for zone in zones or []:
+            if not isinstance(zone, QRect):
+                zone = parse_exclusion_zones([zone])
+                if not zone:
+                    continue
+                zone = QRect(*zone[0])
+            rects.append(zone)
+        if rects != self._exclusion_zones:
+            self._exclusion_zones = rects
+            self._invalidate_region()
+    
+    def get_exclusion_zones(self) -> list:
+        """Get the exclusion rectangles."""
+        return list(self._exclusion_zones)
+    
+    def set_avoid_taskbar(self, avoid: bool):
+        """Keep the ring off the taskbar (anything outside the available geometry)."""
+        if avoid != self._avoid_taskbar:
+            self._avoid_taskbar = avoid
+            self._invalidate_region()
+    
+    def _invalidate_region(self):
+        self._region = None
+        if self.isVisible():
+            self.update()
+    
+    def _get_ring_region(self, plan, ratio: float) -> QRegion:
+        """Get the ring region, rebuilding it only if the geometry changed."""
+        geometry = (ratio, tuple(rect.getRect() for rect, _ in plan))
+        if self._region is not None and geometry == self._region_geometry:
+            return self._region
+        
+        self._region = self._build_ring_region(plan, ratio)
+        self._region_geometry = geometry
+        self._mask = self._region if ratio == 1 else QRegion()
+        if ratio != 1:
+            for rect in self._region.rects():
+                self._mask = self._mask.united(QRegion(*unscale_rect(rect.getRect(), ratio)))
+        self._mask_dirty = True
+        return self._region
+    
+    def _build_ring_region(self, plan, ratio: float = 1.0) -> QRegion:
+        """
+        The plan's rects minus exclusion zones (and the taskbar, if
+        avoided), in device pixels.
+        """
+        region = QRegion()
+        for rect, _ in plan:
+            region = region.united(QRegion(rect))
+        for rect in self._cutouts(ratio):
+            region = region.subtracted(QRegion(*rect))
+        return region
+    
+    def _cutouts(self, ratio: float) -> list:
+        """Exclusion zones, and the taskbar if avoided, in device pixels."""
+        cutouts = [scale_rect(zone.getRect(), ratio) for zone in self._exclusion_zones]
+        if self._avoid_taskbar:
+            screen = self._screen
+            full = screen.geometry()
+            reserved = QRegion(full).subtracted(QRegion(screen.availableGeometry()))
+            for rect in reserved.translated(-full.x(), -full.y()).rects():
+                cutouts.append(scale_rect(rect.getRect(), ratio))
+        return cutouts
+    
+    def _invalidate_plan(self):
+        """Drop the compiled render plans and schedule a repaint."""
+        self._plans.clear()
+        if self.isVisible() and (self._frame is None or not self._refresh_frame()):
+            self.update()
+    
+    def _get_render_plan(self, ratio: float) -> list:
+        """Get the compiled plan for a device pixel ratio, compiling it if needed."""
+        plan = self._plans.get(ratio)
+        if plan is None:
+            plan = self._compile_plan(self.width(), self.height(), ratio)
+            self._plans[ratio] = plan
+        return plan
+    
+    def _compile_plan(self, width: int, height: int, ratio: float) -> list:
+        """
+        Compile the ring for a logical width x height screen into device
+        pixels. Widths and insets are logical, so the ring is the same
+        physical size at any scale; rounding them to whole device pixels
+        keeps the edges sharp at fractional ratios.
+        """
+        rects = compile_render_plan(
+            scale_edge_specs(self._edge_specs, ratio),
+            to_device_pixels(width, ratio), to_device_pixels(height, ratio),
+            self._edge_selection, to_device_pixels(self._glow_width, ratio),
+            self._brightness, self._color_temp,
+            max_brightness=self._max_brightness(),
+        )
+        return [(QRect(x, y, w, h), QColor(*rgba)) for x, y, w, h, rgba in rects]
+    
+    def resizeEvent(self, event):
+        """Geometry changed - the plan depends on the screen size."""
+        self._plans.clear()
+        super().resizeEvent(event)
+    
     def set_enabled(self, enabled: bool):
-        """Enable or disable the overlay."""
+        """Enable or disable the overlay, fading in or out."""
+        if enabled and not self._toggled_once:
+            self._toggled_once = True
+            self._first_toggle_start = time.perf_counter()
+            # Runs after the first frame if a paint was needed
+            QTimer.singleShot(0, self._finish_first_toggle)
+        
         self._enabled = enabled
+        self._animator.cancel('breathing')
+        
         if enabled:
             self._update_geometry()
-            self.show()
-            self.update()
+            if not self.isVisible():
+                self.setWindowOpacity(0.0)
+                self.show()
+            self._animator.animate('opacity', self.windowOpacity(), 1.0,
+                                   self._fade_duration, self.setWindowOpacity,
+                                   ease_out_cubic, self._start_breathing)
+        elif self.isVisible():
+            self._animator.animate('opacity', self.windowOpacity(), 0.0,
+                                   self._fade_duration, self.setWindowOpacity,
+                                   ease_in_cubic, self._on_faded_out)
         else:
+            self._animator.cancel('opacity')
+    
+    def _on_faded_out(self):
+        if not self._enabled and not self._keep_mapped:
             self.hide()
+            if self._low_memory:
+                self.release_resources()
+    
+    def _finish_first_toggle(self):
+        if self._first_toggle_start is not None:
+            latency = time.perf_counter() - self._first_toggle_start
+            self._first_toggle_start = None
+            get_startup_profiler().record('first_toggle', latency)
+    
+    def _start_breathing(self):
+        if (self._enabled and self._breathing and self._breathing_depth
+                and not self._power_saving):
+            low = 1.0 - self._breathing_depth / 100
+            self._animator.oscillate('breathing', low, 1.0,
+                                     self._breathing_period, self.setWindowOpacity)
     
     def is_enabled(self) -> bool:
         """Check if overlay is enabled."""
         return self._enabled
     
+    def usage_state(self) -> tuple:
+        """
+        (on, brightness after caps, colour temperature, width, fraction of
+        the screen covered) for the usage log. Exclusion zones are ignored.
+        """
+        brightness = self._brightness
+        cap = self._max_brightness()
+        if cap is not None:
+            brightness = min(brightness, cap)
+        coverage = 0.0
+        if self._enabled and self.width() and self.height():
+            plan = self._compile_plan(self.width(), self.height(), 1.0)
+            coverage = sum(rect.width() * rect.height() for rect, _ in plan) / (self.width() * self.height())
+        return self._enabled, brightness, self._color_temp, self._glow_width, coverage
+    
     def toggle(self):
         """Toggle overlay on/off."""
         self.set_enabled(not self._enabled)
     
     def paintEvent(self, event):
         """Render the ring light effect."""
-        if not self._enabled:
+        if not (self._enabled or self._keep_mapped
+                or self._animator.is_animating('opacity')):
             return
         
-        painter = QPainter(self)
-        painter.setRenderHint(QPainter.Antialiasing, True)
-        
-        r, g, b = interpolate_color_temperature(self._color_temp)
-        solid_alpha = int(55 + (self._brightness / 100) * 200)
+        started = time.perf_counter()
         
-        width = self.width()
-        height = self.height()
-        ring_width = self._glow_width
+        ratio = self.devicePixelRatioF()
+        plan = self._get_render_plan(ratio)
+        region = self._get_ring_region(plan, ratio)
         
-        self._draw_selected_edges(painter, r, g, b, solid_alpha, width, height, ring_width)
+        frame = None
+        if self._uses_background():
+            frame = self._background_frame(plan, region, ratio)
+        elif self._frame is not None or self._request is not None:
+            self._drop_frame()
         
+        painter = QPainter(self)
+        if ratio != 1:
+            painter.scale(1 / ratio, 1 / ratio)   # Paint in device pixels
+        if frame is not None:
+            self._paint_frame(painter, frame)
+        elif self._renderer is None or not self._paint_renderer(painter, plan, region, ratio):
+            # The rects never overlap and the backing store starts out
+            # transparent, so plain copies give the same pixels as blending
+            painter.setCompositionMode(QPainter.CompositionMode_Source)
+            painter.setClipRegion(region)
+            self._draw_plan(painter, plan)
         painter.end()
-    
-    def _draw_selected_edges(self, painter, r, g, b, alpha, width, height, ring_width):
-        """Draw only the selected edges."""
         
-        color = QColor(r, g, b, alpha)
-        painter.setPen(Qt.NoPen)
-        painter.setBrush(QBrush(color))
+        if self._mask_dirty and frame is None:
+            self._mask_dirty = False
+            self.setMask(self._mask)
         
-        selection = self._edge_selection
+        _paint_count.inc()
+        _paint_time.observe(time.perf_counter() - started)
         
-        # Determine which edges to draw
-        draw_top = selection in (EDGE_ALL, EDGE_TOP_ONLY, EDGE_TOP_SIDES)
-        draw_bottom = selection == EDGE_ALL
-        draw_left = selection in (EDGE_ALL, EDGE_TOP_SIDES, EDGE_SIDES_ONLY)
-        draw_right = selection in (EDGE_ALL, EDGE_TOP_SIDES, EDGE_SIDES_ONLY)
-        
-        # Calculate vertical bar positions based on what's drawn
-        side_top = ring_width if draw_top else 0
-        side_bottom = height - ring_width if draw_bottom else height
-        side_height = side_bottom - side_top
+        if self._first_toggle_start is not None and self._enabled:
+            self._finish_first_toggle()
+    
+    def set_renderer(self, renderer, budget_ms: int = DEFAULT_SETTINGS['renderer_budget_ms']):
+        """
+        Paint the ring with a plugin renderer (None = the built-in solid
+        ring). A renderer that raises, or takes longer than budget_ms for
+        several frames in a row, is dropped for the built-in ring and
+        reported through rendererFallback.
+        """
+        if self._renderer is not None and renderer is not self._renderer:
+            self._release_renderer_cache()
+        self._renderer = renderer
+        self._renderer_budget = RenderBudget(budget_ms) if renderer is not None else None
+        self._renderer_timer.stop()   # Restarted by the next paint if animated
+        self.update()
+    
+    def get_renderer(self):
+        return self._renderer
+    
+    def _paint_renderer(self, painter, plan, region, ratio: float) -> bool:
+        """Paint with the plugin renderer. False if it was dropped for the built-in ring."""
+        renderer = self._renderer
+        started = time.perf_counter()
+        painter.save()
+        painter.setClipRegion(region)
+        painter.setRenderHint(QPainter.Antialiasing)
+        try:
+            cache = self._renderer_cache
+            if not renderer.animated and cache is not None and cache[0] is plan and cache[1] is region:
+                result = cache[2]
+            else:
+                result = renderer.render(self._ring_geometry(plan, region, ratio), time.monotonic())
+                if not renderer.animated:
+                    self._renderer_cache = (plan, region, result)
+            if isinstance(result, QImage):
+                painter.drawImage(0, 0, result)
+            else:
+                execute_commands(painter, result)
+        except Exception as e:
+            self._fall_back(f"failed: {e}")
+            return False
+        finally:
+            painter.restore()
         
-        # Draw edges
-        if draw_top:
-            painter.drawRect(0, 0, width, ring_width)
+        if not self._record_renderer_time(time.perf_counter() - started):
+            return True   # This frame is complete; the next one is built in
         
-        if draw_bottom:
-            painter.drawRect(0, height - ring_width, width, ring_width)
+        if renderer.animated and self._enabled and not self._power_saving:
+            self._renderer_timer.start()
+        return True
+    
+    def _record_renderer_time(self, elapsed: float) -> bool:
+        """Count GUI-thread renderer time against the budget. False if that dropped it."""
+        _renderer_time.observe(elapsed)
+        if self._renderer_budget.record(elapsed):
+            self._fall_back(f"over its {self._renderer_budget.budget * 1000:.0f} ms budget "
+                            f"({elapsed * 1000:.1f} ms)")
+            return False
+        return True
+    
+    def _ring_geometry(self, plan, region, ratio: float) -> RingGeometry:
+        brightness = self._brightness
+        cap = self._max_brightness()
+        if cap is not None:
+            brightness = min(brightness, cap)
+        color = QColor(*interpolate_color_temperature(self._color_temp))
+        color.setAlpha(brightness_to_alpha(brightness))
+        return RingGeometry(
+            width=to_device_pixels(self.width(), ratio),
+            height=to_device_pixels(self.height(), ratio),
+            ratio=ratio,
+            plan=tuple(plan),
+            region=region,
+            glow_width=to_device_pixels(self._glow_width, ratio),
+            brightness=brightness,
+            color_temperature=self._color_temp,
+            color=color,
+        )
+    
+    def _fall_back(self, reason: str):
+        """Drop the plugin renderer for the built-in ring."""
+        name = self._renderer.name
+        _log.warning("Renderer %r %s; using the solid ring", name, reason)
+        _renderer_fallbacks.inc()
+        self.set_renderer(None)
+        self.rendererFallback.emit(name, reason)
+    
+    def _release_renderer_cache(self):
+        self._renderer_cache = None
+        self._drop_frame()
+        if self._background is not None:
+            self._background.wait()   # release() never runs during a render
+        if self._renderer is not None:
+            try:
+                self._renderer.release()
+            except Exception as e:
+                _log.warning("Renderer %r failed to release: %s", self._renderer.name, e)
+    
+    def set_background_rendering(self, enabled: bool):
+        """Run static plugin renderers on a worker thread."""
+        self._background_rendering = enabled
+        if not enabled:
+            self._drop_frame()
+            self.update()
+    
+    def _uses_background(self) -> bool:
+        """
+        Whether frames come from the worker. Only static plugin renderers
+        qualify: copying a finished frame costs as much as filling the
+        built-in ring's rects, and animated renderers draw every frame.
+        """
+        return (self._background_rendering and self._renderer is not None
+                and not self._renderer.animated)
+    
+    def _background_frame(self, plan, region, ratio: float):
+        """
+        The frame to show, after asking for one of the current plan if
+        that hasn't been done yet. It may be a few requests behind while a
+        slider is dragged. The first frame is rendered right away, so the
+        ring never shows without its renderer; None if that failed.
+        """
+        request = self._request
+        if request is not None and request[0] is plan and request[1] is region:
+            return self._frame
+        if self._background is None:
+            self._background = BackgroundRenderer(self)
+            self._background.imageReady.connect(self._on_frame_ready)
+            self._background.failed.connect(lambda error: self._fall_back(f"failed: {error}"))
         
-        if draw_left:
-            painter.drawRect(0, side_top, ring_width, side_height)
+        job = partial(render_ring_image, self._renderer,
+                      self._ring_geometry(plan, region, ratio), time.monotonic())
+        self._request = (plan, region)
+        if self._frame is None and not self._background.is_busy():
+            try:
+                self._set_frame(job(), region, self._mask)
+            except Exception as e:
+                self._fall_back(f"failed: {e}")
+                return None
+        else:
+            self._background.request(job, (region, self._mask))
+        return self._frame
+    
+    def _paint_frame(self, painter, frame: QImage):
+        """Copy the frame's ring onto the window, rect by rect (never the whole screen)."""
+        started = time.perf_counter()
+        painter.setCompositionMode(QPainter.CompositionMode_Source)
+        for rect in self._frame_region.rects():
+            painter.drawImage(rect, frame, rect)
+        self._record_renderer_time(time.perf_counter() - started)
+    
+    def _refresh_frame(self) -> bool:
+        """
+        With a background frame on screen, ask for the next one instead
+        of repainting (which would only show the same frame again); it
+        repaints when the frame arrives. False if the ring has to be
+        painted now.
+        """
+        if not self._uses_background():
+            return False
+        ratio = self.devicePixelRatioF()
+        plan = self._get_render_plan(ratio)
+        self._background_frame(plan, self._get_ring_region(plan, ratio), ratio)
+        return True
+    
+    def _on_frame_ready(self, image: QImage, context):
+        """Swap in a finished frame and show it."""
+        if self._request is None:
+            return
+        self._set_frame(image, *context)
+        self.update()
+    
+    def _set_frame(self, image: QImage, region, mask):
+        """Make an image the displayed frame, with the region and mask it was made for."""
+        self._frame = image
+        self._frame_region = region
+        if mask is not self._frame_mask:
+            self._frame_mask = mask
+            self.setMask(mask)
+            self._mask_dirty = mask is not self._mask
+    
+    def _drop_frame(self):
+        """Forget the background frame and any request in flight."""
+        if self._background is not None:
+            self._background.cancel()
+        self._frame = None
+        self._frame_region = None
+        self._frame_mask = None
+        self._request = None
+        self._mask_dirty = self._mask is not None
+    
+    def render_to_image(self, width: int, height: int, ratio: float = 1.0) -> QImage:
+        """
+        Paint the ring for a logical width x height screen at a device
+        pixel ratio into a transparent ARGB32 image, the way paintEvent
+        does, without touching the window or its caches. Used for
+        golden-image comparisons.
+        """
+        plan = self._compile_plan(width, height, ratio)
         
-        if draw_right:
-            painter.drawRect(width - ring_width, side_top, ring_width, side_height)
+        image = QImage(to_device_pixels(width, ratio), to_device_pixels(height, ratio),
+                       QImage.Format_ARGB32)
+        image.fill(Qt.transparent)
+        painter = QPainter(image)
+        painter.setClipRegion(self._build_ring_region(plan, ratio))
+        self._draw_plan(painter, plan)
+        painter.end()
+        image.setDevicePixelRatio(ratio)
+        return image
+    
+    def _draw_plan(self, painter, plan):
+        """Fill the compiled rects; they never overlap."""
+        for rect, color in plan:
+            painter.fillRect(rect, color)
@@ -0,0 +1,255 @@
+# Edge Light - Power Policy
+# Caps brightness and drops animations while running on battery
+
+import os
+import sys
+from typing import Callable, Optional
+
+from PyQt5.QtCore import QObject, QTimer, QAbstractNativeEventFilter, QCoreApplication, pyqtSignal
+
+from constants import POWER_POLL_INTERVAL_MS
+from log import get_logger
+
+_log = get_logger('power')
+
+WM_POWERBROADCAST = 0x0218
+PBT_APMPOWERSTATUSCHANGE = 0x000A
+
+
+class PowerState:
+    """Whether the machine runs from battery, and the charge left (None if unknown)."""
+
+    __slots__ = ('on_battery', 'percent')
+
+    def __init__(self, on_battery: bool, percent: Optional[int] = None):
+        self.on_battery = on_battery
+        self.percent = percent
+
+    def __eq__(self, other):
+        return (isinstance(other, PowerState) and self.on_battery == other.on_battery
+                and self.percent == other.percent)
+
+    def __repr__(self):
+        return f"PowerState(on_battery={self.on_battery}, percent={self.percent})"
+
+
+class PowerBackend:
+    """
+    Interface for reading the power source.
+    The base class is the 'unsupported platform' backend.
+    """
+
+    name = "none"
+
+    def is_supported(self) -> bool:
+        return False
+
+    def read(self) -> Optional[PowerState]:
+        """Get the current power state, or None if it can't be read."""
+        return None
+
+
+class SysfsPowerBackend(PowerBackend):
+    """
+    Linux /sys/class/power_supply. Pass root to read a fake tree, e.g. in
+    tests (<root>/<supply>/type, online, capacity, status, scope).
+    """
+
+    name = "sysfs"
+
+    def __init__(self, root: str = "/sys/class/power_supply"):
+        self._root = root
+
+    def is_supported(self) -> bool:
+        return os.path.isdir(self._root)
+
+    def _read_attr(self, supply: str, attr: str) -> Optional[str]:
+        try:
+            with open(os.path.join(self._root, supply, attr), 'r') as f:
+                return f.read().strip()
+        except OSError:
+            return None
+
+    def read(self) -> Optional[PowerState]:
+        try:
+            supplies = sorted(os.listdir(self._root))
+        except OSError:
+            return None
+
+        mains_seen = False
+        mains_online = False
+        discharging = False
+        capacities = []
+        for supply in supplies:
+            kind = self._read_attr(supply, 'type')
+            if kind in ('Mains', 'USB'):
+                mains_seen = True
+                mains_online = mains_online or self._read_attr(supply, 'online') == '1'
+            elif kind == 'Battery':
+                if self._read_attr(supply, 'scope') == 'Device':
+                    continue  # A mouse or headset battery, not the system's
+                status = self._read_attr(supply, 'status')
+                discharging = discharging or status == 'Discharging'
+                capacity = self._read_attr(supply, 'capacity')
+                if capacity and capacity.isdigit():
+                    capacities.append(int(capacity))
+
+        if not capacities and not discharging:
+            return PowerState(False)   # Desktop: no system battery
+        on_battery = not mains_online if mains_seen else discharging
+        percent = sum(capacities) // len(capacities) if capacities else None
+        return PowerState(on_battery, percent)
+
+
+class WindowsPowerBackend(PowerBackend):
+    """GetSystemPowerStatus."""
+
+    name = "windows"
+
+    def __init__(self):
+        import ctypes
+        from ctypes import wintypes
+
+        class SYSTEM_POWER_STATUS(ctypes.Structure):
+            _fields_ = [
+                ('ACLineStatus', wintypes.BYTE),
+                ('BatteryFlag', wintypes.BYTE),
+                ('BatteryLifePercent', wintypes.BYTE),
+                ('SystemStatusFlag', wintypes.BYTE),
+                ('BatteryLifeTime', wintypes.DWORD),
+                ('BatteryFullLifeTime', wintypes.DWORD),
+            ]
+
+        self._ctypes = ctypes
+        self._status_type = SYSTEM_POWER_STATUS
+        self._kernel32 = ctypes.windll.kernel32
+
+    def is_supported(self) -> bool:
+        return True
+
+    def read(self) -> Optional[PowerState]:
+        status = self._status_type()
+        if not self._kernel32.GetSystemPowerStatus(self._ctypes.byref(status)):
+            return None
+        ac_line = status.ACLineStatus & 0xFF
+        flags = status.BatteryFlag & 0xFF
+        percent = status.BatteryLifePercent & 0xFF
+        if flags == 128:                  # No system battery
+            return PowerState(False)
+        return PowerState(ac_line == 0, None if percent == 255 else percent)
+
+
+def get_power_backend() -> PowerBackend:
+    """Get the backend for the current platform."""
+    if sys.platform == 'win32':
+        return WindowsPowerBackend()
+    if sys.platform.startswith('linux'):
+        return SysfsPowerBackend()
+    return PowerBackend()
+
+
+class _PowerBroadcastFilter(QAbstractNativeEventFilter):
+    """Calls back on WM_POWERBROADCAST / PBT_APMPOWERSTATUSCHANGE (Windows)."""
+
+    def __init__(self, callback: Callable[[], None]):
+        super().__init__()
+        from ctypes import wintypes
+        self._msg_type = wintypes.MSG
+        self._callback = callback
+
+    def nativeEventFilter(self, event_type, message):
+        if event_type == b"windows_generic_MSG":
+            msg = self._msg_type.from_address(int(message))
+            if msg.message == WM_POWERBROADCAST and msg.wParam == PBT_APMPOWERSTATUSCHANGE:
+                # Re-read after the message is handled, not inside the filter
+                QTimer.singleShot(0, self._callback)
+        return False, 0
+
+
+class PowerPolicy(QObject):
+    """
+    Decides when to save power: on battery at or below the threshold
+    (100 = whenever on battery). Re-evaluates on Windows power broadcasts
+    and on a slow timer; nothing else polls.
+    """
+
+    savingChanged = pyqtSignal(bool)
+
+    def __init__(self, backend: Optional[PowerBackend] = None,
+                 poll_ms: int = POWER_POLL_INTERVAL_MS, parent=None):
+        super().__init__(parent)
+
+        self._backend = backend
+        self._threshold = 100
+        self._state: Optional[PowerState] = None
+        self._saving = False
+        self._filter = None
+
+        self._timer = QTimer(self)
+        self._timer.setInterval(poll_ms)
+        self._timer.timeout.connect(self.evaluate)
+
+    def set_threshold(self, percent: int) -> None:
+        """Save power on battery at or below this charge."""
+        self._threshold = max(0, min(100, int(percent)))
+        if self._timer.isActive():
+            self.evaluate()
+
+    def set_active(self, active: bool) -> None:
+        """Start or stop following the power source."""
+        if active == self._timer.isActive():
+            return
+        if active:
+            if not self._get_backend().is_supported():
+                _log.info("Power source can't be read on this platform")
+                return
+            self._timer.start()
+            self._install_filter()
+            self.evaluate()
+        else:
+            self._timer.stop()
+            self._remove_filter()
+            self._set_saving(False)
+
+    def is_saving(self) -> bool:
+        return self._saving
+
+    def state(self) -> Optional[PowerState]:
+        """Power state from the last evaluation."""
+        return self._state
+
+    def evaluate(self) -> None:
+        """Re-read the power source and update the saving state."""
+        state = self._get_backend().read()
+        if state is None:
+            return
+        if state != self._state:
+            _log.debug("Power state: %r", state)
+            self._state = state
+        saving = state.on_battery and (
+            self._threshold >= 100 or state.percent is None or state.percent <= self._threshold
+        )
+        self._set_saving(saving)
+
+    def _set_saving(self, saving: bool) -> None:
+        if saving != self._saving:
+            self._saving = saving
+            _log.info("Power saving %s", "on" if saving else "off")
+            self.savingChanged.emit(saving)
+
+    def _install_filter(self) -> None:
+        app = QCoreApplication.instance()
+        if sys.platform == 'win32' and app is not None and self._filter is None:
+            self._filter = _PowerBroadcastFilter(self.evaluate)
+            app.installNativeEventFilter(self._filter)
+
+    def _remove_filter(self) -> None:
+        app = QCoreApplication.instance()
+        if self._filter is not None and app is not None:
+            app.removeNativeEventFilter(self._filter)
+        self._filter = None
+
+    def _get_backend(self) -> PowerBackend:
+        if self._backend is None:
+            self._backend = get_power_backend()
+        return self._backend
@@ -0,0 +1,242 @@
+# Edge Light - Process Watcher
+# Turns the light on while a video-call app (Zoom, Teams, OBS...) is running
+
+import os
+import sys
+from typing import Dict, Iterable, Optional, Set
+
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal
+
+from constants import PROCESS_WATCH_INTERVAL_MS
+from log import get_logger
+from metrics import get_metrics
+
+_log = get_logger('process')
+_scan_time = get_metrics().histogram('process_watch.scan')
+
+
+def normalize_process_name(name: str) -> str:
+    """'C:\\...\\Zoom.exe' / 'zoom' -> 'zoom', so configured names match on any platform."""
+    name = os.path.basename(name.replace('\\', '/')).strip().lower()
+    if name.endswith('.exe'):
+        name = name[:-4]
+    return name
+
+
+class ProcessSource:
+    """
+    Where process IDs and names come from.
+    The base class is the 'unsupported platform' source: no processes.
+    """
+
+    name = "none"
+
+    def is_supported(self) -> bool:
+        return False
+
+    def list_pids(self) -> Set[int]:
+        """Get the PIDs running right now."""
+        return set()
+
+    def resolve_name(self, pid: int) -> Optional[str]:
+        """Get the executable name of a PID, or None if it's gone or hidden."""
+        return None
+
+
+class ProcfsSource(ProcessSource):
+    """
+    Linux /proc. Pass proc_root to read a fake tree, e.g. in tests
+    (<root>/<pid>/comm, optionally <root>/<pid>/exe).
+    """
+
+    name = "procfs"
+
+    def __init__(self, proc_root: str = "/proc"):
+        self._root = proc_root
+
+    def is_supported(self) -> bool:
+        return os.path.isdir(self._root)
+
+    def list_pids(self) -> Set[int]:
+        try:
+            return {int(entry) for entry in os.listdir(self._root) if entry.isdigit()}
+        except OSError:
+            return set()
+
+    def resolve_name(self, pid: int) -> Optional[str]:
+        base = os.path.join(self._root, str(pid))
+        # exe has the full name; comm is truncated to 15 chars but always readable
+        try:
+            return os.path.basename(os.readlink(os.path.join(base, 'exe')))
+        except OSError:
+            pass
+        try:
+            with open(os.path.join(base, 'comm'), 'r', encoding='utf-8', errors='replace') as f:
+                return f.read().strip() or None
+        except OSError:
+            return None
+
+
+class ToolhelpSource(ProcessSource):
+    """
+    Windows Toolhelp snapshot. One snapshot yields PIDs and executable
+    names together, so resolve_name is answered from the last listing.
+    """
+
+    name = "toolhelp"
+
+    TH32CS_SNAPPROCESS = 0x00000002
+    INVALID_HANDLE_VALUE = -1
+
+    def __init__(self):
+        import ctypes
+        from ctypes import wintypes
+
+        class PROCESSENTRY32W(ctypes.Structure):
+            _fields_ = [
+                ('dwSize', wintypes.DWORD),
+                ('cntUsage', wintypes.DWORD),
+                ('th32ProcessID', wintypes.DWORD),
+                ('th32DefaultHeapID', ctypes.c_void_p),
+                ('th32ModuleID', wintypes.DWORD),
+                ('cntThreads', wintypes.DWORD),
+                ('th32ParentProcessID', wintypes.DWORD),
+                ('pcPriClassBase', wintypes.LONG),
+                ('dwFlags', wintypes.DWORD),
+                ('szExeFile', wintypes.WCHAR * 260),
+            ]
+
+        self._ctypes = ctypes
+        self._entry_type = PROCESSENTRY32W
+        self._kernel32 = ctypes.windll.kernel32
+        self._kernel32.CreateToolhelp32Snapshot.restype = wintypes.HANDLE
+        self._names: Dict[int, str] = {}
+
+    def is_supported(self) -> bool:
+        return True
+
+    def list_pids(self) -> Set[int]:
+        ctypes = self._ctypes
+        kernel32 = self._kernel32
+        snapshot = kernel32.CreateToolhelp32Snapshot(self.TH32CS_SNAPPROCESS, 0)
+        if not snapshot or snapshot == ctypes.c_void_p(self.INVALID_HANDLE_VALUE).value:
+            return set(self._names)
+
+        names = {}
+        try:
+            entry = self._entry_type()
+            entry.dwSize = ctypes.sizeof(entry)
+            ok = kernel32.Process32FirstW(snapshot, ctypes.byref(entry))
+            while ok:
+                names[entry.th32ProcessID] = entry.szExeFile
+                ok = kernel32.Process32NextW(snapshot, ctypes.byref(entry))
+        finally:
+            kernel32.CloseHandle(snapshot)
+
+        self._names = names
+        return set(names)
+
+    def resolve_name(self, pid: int) -> Optional[str]:
+        return self._names.get(pid)
+
+
+def get_process_source() -> ProcessSource:
+    """Get the source for the current platform."""
+    if sys.platform == 'win32':
+        return ToolhelpSource()
+    if sys.platform.startswith('linux'):
+        return ProcfsSource()
+    return ProcessSource()
+
+
+class ProcessWatcher(QObject):
+    """
+    Polls the process list at a low fixed cadence and reports whether any
+    target process is running. Scans are incremental: only PIDs that
+    appeared since the last scan get their names resolved, and names are
+    cached until the PID goes away.
+    """
+
+    runningChanged = pyqtSignal(bool)   # A target process started / all exited
+
+    def __init__(self, source: Optional[ProcessSource] = None,
+                 interval_ms: int = PROCESS_WATCH_INTERVAL_MS, parent=None):
+        super().__init__(parent)
+
+        self._source = source
+        self._targets: Set[str] = set()
+        self._names: Dict[int, str] = {}     # PID -> normalized name, for live PIDs
+        self._matched: Set[int] = set()
+        self._running = False
+
+        self._timer = QTimer(self)
+        self._timer.setInterval(interval_ms)
+        self._timer.timeout.connect(self.scan)
+
+    def set_targets(self, names: Iterable[str]) -> None:
+        """Set the process names to watch for (case-insensitive, '.exe' optional)."""
+        self._targets = {normalize_process_name(n) for n in names if n and n.strip()}
+        self._matched = {pid for pid, name in self._names.items() if name in self._targets}
+        if self._timer.isActive():
+            self._update_running()
+
+    def set_active(self, active: bool) -> None:
+        """Start or stop watching. Stopping forgets everything it saw."""
+        if active == self._timer.isActive():
+            return
+        if active:
+            if not self._get_source().is_supported():
+                _log.warning("Process watching is not supported on this platform")
+                return
+            self.scan()
+            self._timer.start()
+        else:
+            self._timer.stop()
+            self._names.clear()
+            self._matched.clear()
+            self._running = False
+
+    def is_active(self) -> bool:
+        return self._timer.isActive()
+
+    def is_running(self) -> bool:
+        """Whether a target process was running at the last scan."""
+        return self._running
+
+    def running_names(self) -> Set[str]:
+        """Names of the target processes seen at the last scan."""
+        return {self._names[pid] for pid in self._matched}
+
+    def scan(self) -> None:
+        """Diff the PID set against the last scan and update the match state."""
+        with _scan_time.time():
+            source = self._get_source()
+            pids = source.list_pids()
+
+            for pid in self._names.keys() - pids:
+                del self._names[pid]
+                self._matched.discard(pid)
+
+            for pid in pids - self._names.keys():
+                raw = source.resolve_name(pid)
+                name = normalize_process_name(raw) if raw else ""
+                self._names[pid] = name
+                if name in self._targets:
+                    self._matched.add(pid)
+
+        self._update_running()
+
+    def _update_running(self) -> None:
+        running = bool(self._matched)
+        if running != self._running:
+            self._running = running
+            if running:
+                _log.info("Call app started: %s", ", ".join(sorted(self.running_names())))
+            else:
+                _log.info("Call apps exited")
+            self.runningChanged.emit(running)
+
+    def _get_source(self) -> ProcessSource:
+        if self._source is None:
+            self._source = get_process_source()
+        return self._source
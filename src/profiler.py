@@ -0,0 +1,99 @@
+# Edge Light - Startup Profiler
+# Records how long each startup phase takes
+
+import os
+import sys
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Tuple
+
+from log import get_logger
+
+PROFILE_FLAG = "--profile-startup"
+PROFILE_ENV = "EDGELIGHT_PROFILE"
+
+_log = get_logger('profile')
+
+
+class StartupProfiler:
+    """
+    Collects phase durations and one-off latencies measured from process start.
+    Recording is always on (it's a handful of perf_counter calls); printing
+    the report is opt-in.
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.perf_counter):
+        self._clock = clock
+        self._origin = clock()
+        self._phases: List[Tuple[str, float, float]] = []   # name, start offset, duration
+        self._latencies: Dict[str, float] = {}
+        self.verbose = PROFILE_FLAG in sys.argv or bool(os.environ.get(PROFILE_ENV))
+
+    def elapsed(self) -> float:
+        """Seconds since the profiler was created."""
+        return self._clock() - self._origin
+
+    @contextmanager
+    def phase(self, name: str):
+        """Time a block of startup work."""
+        start = self._clock()
+        try:
+            yield
+        finally:
+            end = self._clock()
+            self._phases.append((name, start - self._origin, end - start))
+
+    def mark(self, name: str) -> None:
+        """Record a zero-length milestone (e.g. 'event loop running')."""
+        self._phases.append((name, self.elapsed(), 0.0))
+
+    def record(self, name: str, seconds: float) -> None:
+        """Record a one-off latency such as the first toggle."""
+        self._latencies[name] = seconds
+        if self.verbose:
+            _log.info("%s: %.1f ms", name, seconds * 1000)
+
+    def get(self, name: str):
+        """Get a recorded latency (seconds) or phase duration, or None."""
+        if name in self._latencies:
+            return self._latencies[name]
+        for phase_name, _, duration in self._phases:
+            if phase_name == name:
+                return duration
+        return None
+
+    def snapshot(self) -> dict:
+        """Get all measurements in milliseconds."""
+        return {
+            'phases': [
+                {'name': name, 'start_ms': start * 1000, 'duration_ms': duration * 1000}
+                for name, start, duration in self._phases
+            ],
+            'latencies_ms': {name: s * 1000 for name, s in self._latencies.items()},
+        }
+
+    def report(self) -> str:
+        """Format the measurements as a small table."""
+        lines = ["Startup profile:"]
+        for name, start, duration in self._phases:
+            lines.append(f"  {start * 1000:8.1f} ms  {name:<24} {duration * 1000:8.1f} ms")
+        for name, seconds in self._latencies.items():
+            lines.append(f"  {'':8}     {name:<24} {seconds * 1000:8.1f} ms")
+        return "\n".join(lines)
+
+    def print_report(self) -> None:
+        """Log the report if profiling output was requested."""
+        if self.verbose:
+            _log.info("%s", self.report())
+
+
+# Global profiler instance
+_startup_profiler = None
+
+
+def get_startup_profiler() -> StartupProfiler:
+    """Get the global startup profiler instance."""
+    global _startup_profiler
+    if _startup_profiler is None:
+        _startup_profiler = StartupProfiler()
+    return _startup_profiler
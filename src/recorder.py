@@ -0,0 +1,102 @@
+# Edge Light - Interaction Recorder
+# Logs timestamped high-level input events for later replay (--record)
+
+import json
+import time
+from typing import Any, Dict, Iterator, List, Tuple
+
+from PyQt5.QtCore import QObject, QTimer
+
+from constants import APP_VERSION, RECORDING_FORMAT, RECORDING_FLUSH_MS
+from log import get_logger
+
+_log = get_logger('recorder')
+
+# (milliseconds since start, event name, value)
+RecordedEvent = Tuple[int, str, Any]
+
+
+class InteractionRecorder(QObject):
+    """
+    Writes one compact JSON array per event: [t_ms, "event", value].
+    The first line is a header with the starting settings layers (policy
+    and user, as SettingsManager.layers() gives them) and screen size, so
+    a replay can begin from the same state. Lines are buffered and
+    flushed on a timer to keep file I/O off the event path.
+    """
+
+    def __init__(self, path: str, layers: Dict[str, Dict[str, Any]], screen_size: Tuple[int, int],
+                 clock=time.perf_counter, parent=None):
+        super().__init__(parent)
+
+        self.path = path
+        self._clock = clock
+        self._origin = clock()
+        self._pending: List[str] = []
+        self._file = open(path, 'w', encoding='utf-8')
+        self._write_line({
+            'format': RECORDING_FORMAT,
+            'app_version': APP_VERSION,
+            'recorded_at': time.strftime("%Y-%m-%dT%H:%M:%S"),
+            'screen': list(screen_size),
+            'policy': layers.get('policy', {}),
+            'settings': layers.get('user', {}),
+        })
+
+        self._flush_timer = QTimer(self)
+        self._flush_timer.setInterval(RECORDING_FLUSH_MS)
+        self._flush_timer.timeout.connect(self.flush)
+        self._flush_timer.start()
+        _log.info("Recording interactions to %s", path)
+
+    def record(self, event: str, value: Any = None) -> None:
+        """Log an event at the current time."""
+        if self._file is None:
+            return
+        t_ms = int((self._clock() - self._origin) * 1000)
+        self._write_line([t_ms, event, value])
+
+    def flush(self) -> None:
+        if self._file is None or not self._pending:
+            return
+        try:
+            self._file.write("".join(self._pending))
+            self._file.flush()
+        except (IOError, OSError) as e:
+            _log.error("Could not write recording: %s", e)
+        self._pending.clear()
+
+    def close(self) -> None:
+        """Flush and close the file."""
+        self._flush_timer.stop()
+        self.flush()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _write_line(self, item) -> None:
+        self._pending.append(json.dumps(item, separators=(',', ':')) + "\n")
+
+
+def load_recording(path: str) -> Tuple[dict, List[RecordedEvent]]:
+    """Read a recording: (header, events in time order)."""
+    with open(path, 'r', encoding='utf-8') as f:
+        lines = iter(f)
+        header = json.loads(next(lines, 'null'))
+        if not isinstance(header, dict) or header.get('format') != RECORDING_FORMAT:
+            raise ValueError(f"{path} is not an Edge Light recording (or is from an older version)")
+        events = list(_parse_events(lines))
+    events.sort(key=lambda e: e[0])
+    return header, events
+
+
+def _parse_events(lines) -> Iterator[RecordedEvent]:
+    for number, line in enumerate(lines, start=2):
+        if not line.strip():
+            continue
+        try:
+            t_ms, event, value = json.loads(line)
+            yield int(t_ms), str(event), value
+        except (ValueError, TypeError) as e:
+            # A session that crashed may end in a partial line
+            _log.warning("Skipping recording line %d: %s", number, e)
@@ -0,0 +1,132 @@
+# Edge Light - Reference Rasterizer
+# Pure-NumPy model of the ring's pixels, for golden-image comparisons
+#
+# Written straight from the rendering rules (edge priority, insets,
+# per-edge overrides, brightness caps, exclusion zones) rather than from
+# render_plan's rect compiler, so the two can check each other.
+# NumPy is optional: only benchmarks/render_compare.py needs this module.
+
+from typing import Dict, Iterable, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from constants import COLOR_TEMP_MIN, COLOR_TEMP_MAX, COLOR_TEMP_MAP
+from render_plan import (
+    EDGES, EDGE_TOP, EDGE_BOTTOM, EDGE_LEFT,
+    EdgeSpec, edges_for_selection,
+)
+
+_TEMPS = np.array(sorted(COLOR_TEMP_MAP), dtype=np.float64)
+_CHANNELS = np.array([COLOR_TEMP_MAP[t] for t in sorted(COLOR_TEMP_MAP)], dtype=np.float64)
+
+
+def reference_color(temperature: float, brightness: float) -> Tuple[int, int, int, int]:
+    """RGBA for a colour temperature (piecewise linear, truncated) and brightness."""
+    temperature = min(max(temperature, COLOR_TEMP_MIN), COLOR_TEMP_MAX)
+    rgb = [int(np.interp(temperature, _TEMPS, _CHANNELS[:, c])) for c in range(3)]
+    alpha = int(55 + (brightness / 100) * 200)
+    return rgb[0], rgb[1], rgb[2], alpha
+
+
+def premultiply_color(rgba: Tuple[int, int, int, int]) -> Tuple[int, int, int, int]:
+    """Premultiplied RGBA, rounded the way Qt does."""
+    alpha = rgba[3]
+    products = [c * alpha + 128 for c in rgba[:3]]
+    return tuple((p + (p >> 8)) >> 8 for p in products) + (alpha,)
+
+
+def _pack(rgba: Tuple[int, int, int, int]) -> int:
+    """RGBA bytes as one native-endian uint32, for whole-pixel fills."""
+    return int(np.frombuffer(bytes(rgba), dtype=np.uint32)[0])
+
+
+def _edge_slices(edge: str, thickness: int, inset: int, width: int, height: int):
+    """(rows, cols) slices of an edge's bar, clipped to the screen."""
+    if edge == EDGE_TOP:
+        start, stop = inset, inset + thickness
+        return slice(max(0, start), max(0, min(height, stop))), slice(0, width)
+    if edge == EDGE_BOTTOM:
+        start, stop = height - inset - thickness, height - inset
+        return slice(max(0, start), max(0, min(height, stop))), slice(0, width)
+    if edge == EDGE_LEFT:
+        start, stop = inset, inset + thickness
+        return slice(0, height), slice(max(0, start), max(0, min(width, stop)))
+    start, stop = width - inset - thickness, width - inset
+    return slice(0, height), slice(max(0, start), max(0, min(width, stop)))
+
+
+def rasterize_ring(specs: Dict[str, EdgeSpec], width: int, height: int,
+                   selection: str, glow_width: int, brightness: float,
+                   color_temperature: float, max_brightness: Optional[float] = None,
+                   exclusion_zones: Iterable[Tuple[int, int, int, int]] = (),
+                   premultiplied: bool = False) -> np.ndarray:
+    """
+    Expected framebuffer: a (height, width, 4) uint8 RGBA array,
+    transparent outside the ring. Same arguments as compile_render_plan,
+    plus the exclusion zones. Compare frames premultiplied: that is what
+    gets composited, and what Qt paints in.
+    """
+    pixels = np.zeros((height, width), dtype=np.uint32)
+    selected = edges_for_selection(selection)
+
+    # Lowest priority first, so earlier edges overwrite the corners they own
+    for edge in reversed(EDGES):
+        spec = specs.get(edge) or EdgeSpec()
+        enabled = edge in selected if spec.enabled is None else spec.enabled
+        if not enabled:
+            continue
+        thickness = glow_width if spec.thickness is None else spec.thickness
+        edge_brightness = brightness if spec.brightness is None else spec.brightness
+        if max_brightness is not None:
+            edge_brightness = min(edge_brightness, max_brightness)
+        edge_temp = color_temperature if spec.color_temperature is None else spec.color_temperature
+        color = reference_color(edge_temp, edge_brightness)
+        if premultiplied:
+            color = premultiply_color(color)
+        rows, cols = _edge_slices(edge, thickness, spec.inset, width, height)
+        pixels[rows, cols] = _pack(color)
+
+    for x, y, w, h in exclusion_zones:
+        pixels[max(0, y):max(0, y + h), max(0, x):max(0, x + w)] = 0
+
+    return pixels.view(np.uint8).reshape(height, width, 4)
+
+
+class FrameDiff(NamedTuple):
+    """Result of comparing two frames."""
+    max_error: int          # Largest per-channel difference
+    mismatched: int         # Pixels with a channel off by more than the tolerance
+    total: int              # Pixels compared
+
+    @property
+    def mismatch_ratio(self) -> float:
+        return self.mismatched / self.total if self.total else 0.0
+
+
+def diff_frames(expected: np.ndarray, actual: np.ndarray, tolerance: int = 1) -> FrameDiff:
+    """Compare two RGBA frames of the same size."""
+    if expected.shape != actual.shape:
+        raise ValueError(f"frame sizes differ: {expected.shape} vs {actual.shape}")
+    if np.array_equal(expected, actual):
+        return FrameDiff(0, 0, expected.shape[0] * expected.shape[1])
+    per_pixel = _channel_error(expected, actual)
+    return FrameDiff(
+        max_error=int(per_pixel.max(initial=0)),
+        mismatched=int(np.count_nonzero(per_pixel > tolerance)),
+        total=int(per_pixel.size),
+    )
+
+
+def diff_image(expected: np.ndarray, actual: np.ndarray, tolerance: int = 1) -> np.ndarray:
+    """RGBA visualisation of a diff: red where pixels differ, grey where they match."""
+    error = _channel_error(expected, actual)
+    image = np.zeros(expected.shape, dtype=np.uint8)
+    image[..., 3] = 255
+    image[..., :3] = (expected[..., 3:4] // 4)
+    image[error > tolerance] = (255, 0, 0, 255)
+    return image
+
+
+def _channel_error(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Largest per-channel difference of each pixel (uint8, no overflow)."""
+    return (np.maximum(a, b) - np.minimum(a, b)).max(axis=2)
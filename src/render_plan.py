@@ -0,0 +1,327 @@
+# Edge Light - Render Plan
+# Per-edge ring configuration compiled into a flat list of coloured rects
+
+import math
+from typing import Dict, List, Optional, Tuple
+
+from constants import (
+    COLOR_TEMP_MIN, COLOR_TEMP_MAX, COLOR_TEMP_MAP,
+    BRIGHTNESS_MIN, BRIGHTNESS_MAX,
+    GLOW_WIDTH_MIN, GLOW_WIDTH_MAX,
+    EDGE_ALL, EDGE_TOP_ONLY, EDGE_TOP_SIDES, EDGE_SIDES_ONLY,
+)
+from log import get_logger
+
+_log = get_logger('render')
+
+EDGE_TOP = "top"
+EDGE_BOTTOM = "bottom"
+EDGE_LEFT = "left"
+EDGE_RIGHT = "right"
+
+# Also the paint priority: earlier edges own the corners
+EDGES = (EDGE_TOP, EDGE_BOTTOM, EDGE_LEFT, EDGE_RIGHT)
+
+# (x, y, width, height, (r, g, b, a))
+PlanRect = Tuple[int, int, int, int, Tuple[int, int, int, int]]
+
+
+def interpolate_color_temperature(temp: int) -> tuple:
+    """
+    Interpolate RGB values for a given color temperature.
+    Uses linear interpolation between known temperature points.
+    """
+    temps = sorted(COLOR_TEMP_MAP.keys())
+
+    temp = max(COLOR_TEMP_MIN, min(COLOR_TEMP_MAX, temp))
+
+    lower_temp = temps[0]
+    upper_temp = temps[-1]
+
+    for i, t in enumerate(temps):
+        if t <= temp:
+            lower_temp = t
+        if t >= temp:
+            upper_temp = t
+            break
+
+    if lower_temp == upper_temp:
+        return COLOR_TEMP_MAP[lower_temp]
+
+    ratio = (temp - lower_temp) / (upper_temp - lower_temp)
+    lower_rgb = COLOR_TEMP_MAP[lower_temp]
+    upper_rgb = COLOR_TEMP_MAP[upper_temp]
+
+    r = int(lower_rgb[0] + ratio * (upper_rgb[0] - lower_rgb[0]))
+    g = int(lower_rgb[1] + ratio * (upper_rgb[1] - lower_rgb[1]))
+    b = int(lower_rgb[2] + ratio * (upper_rgb[2] - lower_rgb[2]))
+
+    return (r, g, b)
+
+
+def brightness_to_alpha(brightness: float) -> int:
+    """Map brightness (0-100) to ring alpha. Never fully transparent."""
+    return int(55 + (brightness / 100) * 200)
+
+
+def edges_for_selection(selection: str) -> set:
+    """Get the edges lit by one of the EDGE_OPTIONS presets."""
+    edges = set()
+    if selection in (EDGE_ALL, EDGE_TOP_ONLY, EDGE_TOP_SIDES):
+        edges.add(EDGE_TOP)
+    if selection == EDGE_ALL:
+        edges.add(EDGE_BOTTOM)
+    if selection in (EDGE_ALL, EDGE_TOP_SIDES, EDGE_SIDES_ONLY):
+        edges.add(EDGE_LEFT)
+        edges.add(EDGE_RIGHT)
+    return edges
+
+
+def _optional_int(value, low=None, high=None) -> Optional[int]:
+    if value is None:
+        return None
+    value = int(value)
+    if low is not None:
+        value = max(low, value)
+    if high is not None:
+        value = min(high, value)
+    return value
+
+
+class EdgeSpec:
+    """
+    Configuration for one edge of the ring.
+    Fields left as None follow the global setting (edge selection,
+    glow width, brightness, color temperature).
+    """
+
+    __slots__ = ('enabled', 'thickness', 'inset', 'brightness', 'color_temperature')
+
+    def __init__(self, enabled: Optional[bool] = None, thickness: Optional[int] = None,
+                 inset: int = 0, brightness: Optional[int] = None,
+                 color_temperature: Optional[int] = None):
+        self.enabled = enabled
+        self.thickness = thickness
+        self.inset = inset
+        self.brightness = brightness
+        self.color_temperature = color_temperature
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'EdgeSpec':
+        """Build a spec from its settings representation, clamping values."""
+        enabled = data.get('enabled')
+        return cls(
+            enabled=None if enabled is None else bool(enabled),
+            thickness=_optional_int(data.get('thickness'), GLOW_WIDTH_MIN, GLOW_WIDTH_MAX),
+            inset=_optional_int(data.get('inset', 0), 0) or 0,
+            brightness=_optional_int(data.get('brightness'), BRIGHTNESS_MIN, BRIGHTNESS_MAX),
+            color_temperature=_optional_int(
+                data.get('color_temperature'), COLOR_TEMP_MIN, COLOR_TEMP_MAX),
+        )
+
+    def to_dict(self) -> dict:
+        """Settings representation, omitting inherited fields."""
+        data = {}
+        for field in self.__slots__:
+            value = getattr(self, field)
+            if value is not None and not (field == 'inset' and value == 0):
+                data[field] = value
+        return data
+
+    def __eq__(self, other):
+        if not isinstance(other, EdgeSpec):
+            return NotImplemented
+        return all(getattr(self, f) == getattr(other, f) for f in self.__slots__)
+
+    def __repr__(self):
+        fields = ", ".join(f"{k}={v!r}" for k, v in self.to_dict().items())
+        return f"EdgeSpec({fields})"
+
+
+def parse_edge_specs(data) -> Dict[str, EdgeSpec]:
+    """Build specs for all four edges from the 'edge_specs' setting."""
+    specs = {}
+    for edge in EDGES:
+        entry = (data or {}).get(edge) or {}
+        try:
+            specs[edge] = EdgeSpec.from_dict(entry)
+        except (TypeError, ValueError) as e:
+            _log.warning("Ignoring invalid spec for %s edge: %s", edge, e)
+            specs[edge] = EdgeSpec()
+    return specs
+
+
+def parse_exclusion_zones(data) -> List[Tuple[int, int, int, int]]:
+    """
+    Read the 'exclusion_zones' setting: a list of {"x", "y", "width",
+    "height"} dicts or [x, y, width, height] lists. Invalid or empty
+    zones are skipped.
+    """
+    zones = []
+    for entry in data or []:
+        try:
+            if isinstance(entry, dict):
+                zone = (entry['x'], entry['y'], entry['width'], entry['height'])
+            else:
+                zone = tuple(entry)
+            x, y, w, h = (int(v) for v in zone)
+        except (KeyError, TypeError, ValueError) as e:
+            _log.warning("Ignoring exclusion zone %r: %s", entry, e)
+            continue
+        if w > 0 and h > 0:
+            zones.append((x, y, w, h))
+    return zones
+
+
+def to_device_pixels(value: float, ratio: float) -> int:
+    """A logical length or coordinate in whole device pixels."""
+    return int(round(value * ratio))
+
+
+def scale_rect(rect: Tuple[int, int, int, int], ratio: float) -> Tuple[int, int, int, int]:
+    """
+    Logical (x, y, w, h) to device pixels. Both corners are rounded, so
+    rects that touch in logical units still touch on the device.
+    """
+    x, y, w, h = rect
+    left, top = to_device_pixels(x, ratio), to_device_pixels(y, ratio)
+    right, bottom = to_device_pixels(x + w, ratio), to_device_pixels(y + h, ratio)
+    return (left, top, right - left, bottom - top)
+
+
+def unscale_rect(rect: Tuple[int, int, int, int], ratio: float) -> Tuple[int, int, int, int]:
+    """Device (x, y, w, h) to the smallest logical rect that covers it."""
+    x, y, w, h = rect
+    left, top = math.floor(x / ratio), math.floor(y / ratio)
+    right, bottom = math.ceil((x + w) / ratio), math.ceil((y + h) / ratio)
+    return (left, top, right - left, bottom - top)
+
+
+def scale_edge_specs(specs: Dict[str, EdgeSpec], ratio: float) -> Dict[str, EdgeSpec]:
+    """Edge specs with their thickness and inset in device pixels."""
+    if ratio == 1:
+        return specs
+    scaled = {}
+    for edge, spec in specs.items():
+        scaled[edge] = EdgeSpec(
+            enabled=spec.enabled,
+            thickness=None if spec.thickness is None else to_device_pixels(spec.thickness, ratio),
+            inset=to_device_pixels(spec.inset, ratio),
+            brightness=spec.brightness,
+            color_temperature=spec.color_temperature,
+        )
+    return scaled
+
+
+def _edge_rect(edge: str, thickness: int, inset: int, width: int, height: int):
+    if edge == EDGE_TOP:
+        return (0, inset, width, thickness)
+    if edge == EDGE_BOTTOM:
+        return (0, height - inset - thickness, width, thickness)
+    if edge == EDGE_LEFT:
+        return (inset, 0, thickness, height)
+    return (width - inset - thickness, 0, thickness, height)
+
+
+def _intersect(a, b):
+    x1 = max(a[0], b[0])
+    y1 = max(a[1], b[1])
+    x2 = min(a[0] + a[2], b[0] + b[2])
+    y2 = min(a[1] + a[3], b[1] + b[3])
+    if x2 <= x1 or y2 <= y1:
+        return None
+    return (x1, y1, x2 - x1, y2 - y1)
+
+
+def _subtract(rect, other) -> list:
+    """Parts of rect not covered by other (at most four rects)."""
+    overlap = _intersect(rect, other)
+    if overlap is None:
+        return [rect]
+
+    x, y, w, h = rect
+    ox, oy, ow, oh = overlap
+    pieces = []
+    if oy > y:                                   # above
+        pieces.append((x, y, w, oy - y))
+    if oy + oh < y + h:                          # below
+        pieces.append((x, oy + oh, w, y + h - oy - oh))
+    if ox > x:                                   # left of overlap
+        pieces.append((x, oy, ox - x, oh))
+    if ox + ow < x + w:                          # right of overlap
+        pieces.append((ox + ow, oy, x + w - ox - ow, oh))
+    return pieces
+
+
+def _merge(rects: List[PlanRect]) -> List[PlanRect]:
+    """Join same-coloured rects that share a full edge."""
+    merged = list(rects)
+    changed = True
+    while changed:
+        changed = False
+        for i in range(len(merged)):
+            for j in range(i + 1, len(merged)):
+                a, b = merged[i], merged[j]
+                if a[4] != b[4]:
+                    continue
+                joined = None
+                if a[1] == b[1] and a[3] == b[3]:
+                    if a[0] + a[2] == b[0]:
+                        joined = (a[0], a[1], a[2] + b[2], a[3], a[4])
+                    elif b[0] + b[2] == a[0]:
+                        joined = (b[0], a[1], a[2] + b[2], a[3], a[4])
+                elif a[0] == b[0] and a[2] == b[2]:
+                    if a[1] + a[3] == b[1]:
+                        joined = (a[0], a[1], a[2], a[3] + b[3], a[4])
+                    elif b[1] + b[3] == a[1]:
+                        joined = (a[0], b[1], a[2], a[3] + b[3], a[4])
+                if joined:
+                    merged[i] = joined
+                    del merged[j]
+                    changed = True
+                    break
+            if changed:
+                break
+    return merged
+
+
+def compile_render_plan(specs: Dict[str, EdgeSpec], width: int, height: int,
+                        selection: str, glow_width: int, brightness: float,
+                        color_temperature: float,
+                        max_brightness: Optional[float] = None) -> List[PlanRect]:
+    """
+    Resolve the edge specs against the global settings and turn them
+    into a minimal list of non-overlapping rects with final colours.
+    Earlier edges in EDGES win where bars overlap. max_brightness caps
+    every edge, per-edge overrides included.
+    """
+    selected = edges_for_selection(selection)
+    screen = (0, 0, width, height)
+    plan: List[PlanRect] = []
+    covered = []
+
+    for edge in EDGES:
+        spec = specs.get(edge) or EdgeSpec()
+        enabled = edge in selected if spec.enabled is None else spec.enabled
+        if not enabled:
+            continue
+
+        thickness = glow_width if spec.thickness is None else spec.thickness
+        rect = _intersect(_edge_rect(edge, thickness, spec.inset, width, height), screen)
+        if rect is None:
+            continue
+
+        edge_brightness = brightness if spec.brightness is None else spec.brightness
+        if max_brightness is not None:
+            edge_brightness = min(edge_brightness, max_brightness)
+        edge_temp = color_temperature if spec.color_temperature is None else spec.color_temperature
+        color = interpolate_color_temperature(edge_temp) + (brightness_to_alpha(edge_brightness),)
+
+        pieces = [rect]
+        for other in covered:
+            pieces = [part for piece in pieces for part in _subtract(piece, other)]
+        covered.append(rect)
+
+        plan.extend(piece + (color,) for piece in pieces)
+
+    return _merge(plan)
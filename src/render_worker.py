@@ -0,0 +1,123 @@
+# Edge Light - Background Renderer
+# Runs static ring renderers on a worker thread, coalescing requests
+
+import time
+from typing import Any, Callable
+
+from PyQt5.QtCore import QCoreApplication, QElapsedTimer, QEvent, QObject, QRunnable, QThreadPool, Qt, pyqtSignal
+from PyQt5.QtGui import QImage
+
+from log import get_logger
+from metrics import get_metrics
+
+_log = get_logger('render')
+
+_render_count = get_metrics().counter('overlay.background_renders')
+_cancel_count = get_metrics().counter('overlay.background_cancelled')
+_coalesce_count = get_metrics().counter('overlay.background_coalesced')
+_render_time = get_metrics().histogram('overlay.background_render')
+
+# Builds one frame on the worker thread
+RenderJob = Callable[[], QImage]
+
+
+class _RenderTask(QRunnable):
+    """One request; skipped if the renderer was cancelled before it started."""
+
+    def __init__(self, owner: 'BackgroundRenderer', epoch: int, job: RenderJob, context: Any):
+        super().__init__()
+        self._owner = owner
+        self._epoch = epoch
+        self._job = job
+        self._context = context
+
+    def run(self):
+        owner = self._owner
+        image = QImage()
+        error = ""
+        if owner.epoch == self._epoch:
+            started = time.perf_counter()
+            try:
+                image = self._job()
+                _render_time.observe(time.perf_counter() - started)
+                _render_count.inc()
+            except Exception as e:
+                error = str(e) or type(e).__name__
+        # Queued to the GUI thread, which then starts the next request
+        owner.finished.emit(self._epoch, image, error, self._context)
+
+
+class BackgroundRenderer(QObject):
+    """
+    Runs render jobs one at a time on a one-thread pool. A render in
+    progress is never abandoned for a newer request: the newest request
+    waits for it and replaces any other waiting one. While a slider is
+    dragged, frames keep arriving at the rate the worker can build them,
+    each a little behind the slider, and the last one matches where it
+    stopped. Every finished image is emitted by imageReady with the
+    context it was requested with; a job that raises is reported by
+    failed. cancel() drops everything outstanding.
+    """
+
+    imageReady = pyqtSignal(QImage, object)             # image, request context
+    failed = pyqtSignal(str)                            # error message
+    finished = pyqtSignal(int, QImage, str, object)     # From the worker
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.epoch = 0          # Bumped by cancel(); results of older epochs are dropped
+        self._busy = False
+        self._pending = None
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(1)
+        self.finished.connect(self._on_finished, Qt.QueuedConnection)
+
+    def request(self, job: RenderJob, context: Any = None) -> None:
+        """Run a job after the one in progress, replacing any request still waiting."""
+        if self._pending is not None:
+            _coalesce_count.inc()
+        self._pending = (job, context)
+        if not self._busy:
+            self._start_pending()
+
+    def is_busy(self) -> bool:
+        """Whether a render is in progress or waiting."""
+        return self._busy or self._pending is not None
+
+    def cancel(self) -> None:
+        """Forget all outstanding requests (a render in progress still runs to the end)."""
+        self.epoch += 1
+        self._pending = None
+
+    def wait(self, msecs: int = -1) -> bool:
+        """Block until every request has been rendered and delivered (shutdown, benchmarks)."""
+        timer = QElapsedTimer()
+        timer.start()
+        while self.is_busy():
+            remaining = -1 if msecs < 0 else msecs - timer.elapsed()
+            if msecs >= 0 and remaining <= 0:
+                return False
+            if not self._pool.waitForDone(remaining):
+                return False
+            QCoreApplication.sendPostedEvents(None, QEvent.MetaCall)   # Runs _on_finished
+        return True
+
+    def _start_pending(self) -> None:
+        job, context = self._pending
+        self._pending = None
+        task = _RenderTask(self, self.epoch, job, context)
+        task.setAutoDelete(True)
+        self._busy = True
+        self._pool.start(task)
+
+    def _on_finished(self, epoch: int, image: QImage, error: str, context: Any) -> None:
+        self._busy = False
+        if epoch != self.epoch:
+            _cancel_count.inc()
+        elif error:
+            _log.error("Background render failed: %s", error)
+            self.failed.emit(error)
+        elif not image.isNull():
+            self.imageReady.emit(image, context)
+        if self._pending is not None:
+            self._start_pending()
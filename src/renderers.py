@@ -0,0 +1,226 @@
+# Edge Light - Ring Renderer Plugins
+# Renderer interface, draw commands, time budget and plugin discovery
+
+import importlib.util
+import os
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple, Type, Union
+
+from PyQt5.QtCore import QRect, Qt
+from PyQt5.QtGui import QColor, QImage, QPainter, QPainterPath, QRegion
+
+from constants import BUILTIN_RENDERER, PLUGINS_DIRNAME, RENDERER_OVERRUN_FRAMES
+from log import get_logger
+
+_log = get_logger('render')
+
+# Large fills are split into bands of about this many pixels. PyQt holds
+# the GIL for the whole of each Qt call, so a renderer on the worker
+# thread that filled a whole edge at once would stall the GUI thread.
+BAND_PIXELS = 1 << 16
+
+
+class RingGeometry(NamedTuple):
+    """
+    What a renderer draws from, precomputed by the overlay. Everything is
+    in device pixels; painting is already clipped to `region`.
+    """
+    width: int
+    height: int
+    ratio: float                        # Device pixels per logical pixel
+    plan: Tuple[Tuple[QRect, QColor], ...]   # The solid ring's rects, never overlapping
+    region: QRegion                     # Ring minus exclusion zones and taskbar
+    glow_width: int
+    brightness: float                   # After power-saving and policy caps
+    color_temperature: float
+    color: QColor                       # Ring colour at that brightness/temperature
+
+
+class FillRect(NamedTuple):
+    """Draw command: fill a rect."""
+    rect: QRect
+    color: QColor
+
+
+class FillPath(NamedTuple):
+    """Draw command: fill a path (antialiased)."""
+    path: QPainterPath
+    color: QColor
+
+
+DrawCommand = Union[FillRect, FillPath]
+RenderResult = Union[QImage, Sequence[DrawCommand]]
+
+
+def execute_commands(painter: QPainter, commands: Sequence[DrawCommand]) -> None:
+    """Run draw commands in order."""
+    for command in commands:
+        if isinstance(command, FillRect):
+            painter.fillRect(command.rect, command.color)
+        elif isinstance(command, FillPath):
+            painter.fillPath(command.path, command.color)
+        else:
+            raise TypeError(f"unknown draw command {command!r}")
+
+
+def fill_in_bands(painter: QPainter, rect: QRect, brush) -> None:
+    """painter.fillRect() in short calls. Gradients line up across the bands."""
+    if rect.width() >= rect.height():
+        step = max(1, BAND_PIXELS // max(1, rect.height()))
+        for left in range(rect.left(), rect.right() + 1, step):
+            painter.fillRect(QRect(left, rect.top(), min(step, rect.right() + 1 - left), rect.height()), brush)
+    else:
+        step = max(1, BAND_PIXELS // max(1, rect.width()))
+        for top in range(rect.top(), rect.bottom() + 1, step):
+            painter.fillRect(QRect(rect.left(), top, rect.width(), min(step, rect.bottom() + 1 - top)), brush)
+
+
+def render_ring_image(renderer: 'RingRenderer', geometry: RingGeometry, now: float) -> QImage:
+    """
+    A renderer's result as an image of the device size, with draw
+    commands painted the way the overlay paints them (antialiased,
+    clipped to the ring). Used for renders on the worker thread.
+    """
+    result = renderer.render(geometry, now)
+    if isinstance(result, QImage):
+        return result
+    # Only the ring is ever shown, so only the ring needs clearing
+    image = QImage(geometry.width, geometry.height, QImage.Format_ARGB32_Premultiplied)
+    painter = QPainter(image)
+    try:
+        painter.setCompositionMode(QPainter.CompositionMode_Source)
+        for rect in geometry.region.rects():
+            fill_in_bands(painter, rect, Qt.transparent)
+        painter.setCompositionMode(QPainter.CompositionMode_SourceOver)
+        painter.setClipRegion(geometry.region)
+        painter.setRenderHint(QPainter.Antialiasing)
+        execute_commands(painter, result)
+    finally:
+        painter.end()
+    return image
+
+
+class RingRenderer:
+    """
+    Interface for ring renderers. render() returns either draw commands
+    or an image (device size, drawn at the top left). Static renderers
+    are only called again when the geometry changes; the result is
+    reused in between. Animated renderers are called every frame.
+    
+    Only the ring region of the result is shown, so images need not be
+    cleared elsewhere.
+    
+    With background rendering on, static renderers are called on a
+    worker thread (one call at a time), so render() must only touch its
+    arguments and the renderer's own state; release() is only called
+    while no render is running. Split large fills with fill_in_bands().
+    """
+
+    name = BUILTIN_RENDERER     # Value of the "renderer" setting
+    animated = False
+
+    def render(self, geometry: RingGeometry, now: float) -> RenderResult:
+        """Draw the ring. `now` is a monotonic time in seconds."""
+        return [FillRect(rect, color) for rect, color in geometry.plan]
+
+    def release(self) -> None:
+        """Drop any cached images (the light went off, or the renderer was replaced)."""
+
+
+class RenderBudget:
+    """
+    Tracks a renderer's frame times against a budget. A renderer is over
+    it after RENDERER_OVERRUN_FRAMES slow frames in a row, so one-off
+    hitches (first-frame caching, a busy machine) don't count.
+    """
+
+    def __init__(self, budget_ms: int, overrun_frames: int = RENDERER_OVERRUN_FRAMES):
+        self.budget = budget_ms / 1000
+        self.overrun_frames = overrun_frames
+        self.overruns = 0
+
+    def record(self, seconds: float) -> bool:
+        """Record one frame. Returns True once the renderer is over budget."""
+        self.overruns = self.overruns + 1 if seconds > self.budget else 0
+        return self.overruns >= self.overrun_frames
+
+
+def get_plugins_dir() -> str:
+    """Directory searched for renderer plugins, next to the settings file."""
+    from settings_manager import get_data_dir
+    return os.path.join(get_data_dir(), PLUGINS_DIRNAME)
+
+
+class RendererRegistry:
+    """
+    Known renderers by name. Plugins are .py files in the plugins
+    directory with a module-level RENDERERS list of RingRenderer
+    subclasses; they're only imported when a renderer other than the
+    built-in one is asked for.
+    """
+
+    def __init__(self, directory: Optional[str] = None):
+        self._directory = directory
+        self._classes: Dict[str, Type[RingRenderer]] = {BUILTIN_RENDERER: RingRenderer}
+        self._discovered = False
+
+    def discover(self) -> None:
+        """Import the plugins (once). Broken plugins are logged and skipped."""
+        if self._discovered:
+            return
+        self._discovered = True
+        directory = self._directory or get_plugins_dir()
+        try:
+            files = sorted(f for f in os.listdir(directory)
+                           if f.endswith('.py') and not f.startswith('_'))
+        except OSError:
+            return
+        for filename in files:
+            self._load(os.path.join(directory, filename))
+
+    def _load(self, path: str) -> None:
+        stem = os.path.splitext(os.path.basename(path))[0]
+        try:
+            spec = importlib.util.spec_from_file_location(f"edgelight_plugin_{stem}", path)
+            module = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(module)
+        except Exception as e:
+            _log.warning("Can't load renderer plugin %s: %s", path, e)
+            return
+        for cls in getattr(module, 'RENDERERS', []):
+            if not (isinstance(cls, type) and issubclass(cls, RingRenderer)):
+                _log.warning("%s: %r is not a RingRenderer", path, cls)
+            elif cls.name in self._classes:
+                _log.warning("%s: renderer name %r is already taken", path, cls.name)
+            else:
+                self._classes[cls.name] = cls
+                _log.debug("Renderer %r from %s", cls.name, path)
+
+    def names(self) -> List[str]:
+        self.discover()
+        return sorted(self._classes)
+
+    def create(self, name: str) -> Optional[RingRenderer]:
+        """A new renderer, or None for the built-in ring (or an unusable name)."""
+        if name == BUILTIN_RENDERER:
+            return None
+        self.discover()
+        cls = self._classes.get(name)
+        if cls is None:
+            _log.warning("No renderer named %r; using the solid ring", name)
+            return None
+        try:
+            return cls()
+        except Exception as e:
+            _log.warning("Renderer %r failed to start: %s", name, e)
+            return None
+
+
+_registry = None
+
+
+def get_renderer_registry() -> RendererRegistry:
+    """Get the global renderer registry."""
+    global _registry
+    if _registry is None:
+        _registry = RendererRegistry()
+    return _registry
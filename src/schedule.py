@@ -0,0 +1,282 @@
+# Edge Light - Circadian Schedule Engine
+# Warms up and dims the ring through the day from a keyframe schedule
+
+from datetime import datetime, timedelta
+from typing import Callable, List, Optional
+
+from PyQt5.QtCore import Qt, QObject, QTimer, pyqtSignal
+
+from constants import (
+    COLOR_TEMP_MIN, COLOR_TEMP_MAX,
+    BRIGHTNESS_MIN, BRIGHTNESS_MAX,
+    SCHEDULE_MIN_STEP_SECONDS,
+)
+from log import get_logger
+from render_plan import interpolate_color_temperature, brightness_to_alpha
+
+MINUTES_PER_DAY = 24 * 60
+
+_log = get_logger('schedule')
+
+
+class ScheduleKeyframe:
+    """A point in the daily schedule (minute of day -> light state)."""
+
+    __slots__ = ('minute', 'color_temperature', 'brightness', 'enabled')
+
+    def __init__(self, minute: int, color_temperature: int, brightness: int,
+                 enabled: Optional[bool] = None):
+        self.minute = minute
+        self.color_temperature = color_temperature
+        self.brightness = brightness
+        self.enabled = enabled
+
+    def __repr__(self):
+        return (f"ScheduleKeyframe({self.minute // 60:02d}:{self.minute % 60:02d}, "
+                f"{self.color_temperature}K, {self.brightness}%, enabled={self.enabled})")
+
+
+def parse_time_of_day(value: str) -> int:
+    """Convert 'HH:MM' to minutes since midnight."""
+    hours, minutes = value.strip().split(':')
+    hours, minutes = int(hours), int(minutes)
+    if not (0 <= hours < 24 and 0 <= minutes < 60):
+        raise ValueError(f"Invalid time of day: {value}")
+    return hours * 60 + minutes
+
+
+def parse_schedule(entries) -> List[ScheduleKeyframe]:
+    """
+    Build a sorted keyframe list from the settings representation.
+    Invalid entries are skipped.
+    """
+    keyframes = {}
+    for entry in entries or []:
+        try:
+            minute = parse_time_of_day(entry['time'])
+            temp = int(entry['color_temperature'])
+            brightness = int(entry['brightness'])
+        except (KeyError, TypeError, ValueError) as e:
+            _log.warning("Ignoring schedule entry %r: %s", entry, e)
+            continue
+
+        enabled = entry.get('enabled')
+        keyframes[minute] = ScheduleKeyframe(
+            minute,
+            max(COLOR_TEMP_MIN, min(COLOR_TEMP_MAX, temp)),
+            max(BRIGHTNESS_MIN, min(BRIGHTNESS_MAX, brightness)),
+            None if enabled is None else bool(enabled),
+        )
+    return [keyframes[m] for m in sorted(keyframes)]
+
+
+def _segment_for(keyframes: List[ScheduleKeyframe], minute: float):
+    """
+    Find the keyframes surrounding a minute of day.
+    Returns (previous, next, minutes since previous, segment length).
+    The schedule wraps around midnight.
+    """
+    previous = keyframes[-1]
+    following = keyframes[0]
+    for i, kf in enumerate(keyframes):
+        if kf.minute <= minute:
+            previous = kf
+            following = keyframes[(i + 1) % len(keyframes)]
+
+    elapsed = (minute - previous.minute) % MINUTES_PER_DAY
+    length = (following.minute - previous.minute) % MINUTES_PER_DAY
+    if length == 0:
+        length = MINUTES_PER_DAY
+    return previous, following, elapsed, length
+
+
+def scheduled_enabled(keyframes: List[ScheduleKeyframe], minute: float) -> Optional[bool]:
+    """
+    On/off state in force at a minute of day: that of the latest keyframe
+    that sets one, looking back around midnight. None if no keyframe does.
+    """
+    previous = _segment_for(keyframes, minute)[0]
+    start = keyframes.index(previous)
+    for i in range(len(keyframes)):
+        enabled = keyframes[start - i].enabled
+        if enabled is not None:
+            return enabled
+    return None
+
+
+def sample_schedule(keyframes: List[ScheduleKeyframe], minute: float) -> tuple:
+    """Interpolate (color_temperature, brightness) at a minute of day."""
+    previous, following, elapsed, length = _segment_for(keyframes, minute)
+    ratio = elapsed / length
+
+    temp = previous.color_temperature + ratio * (
+        following.color_temperature - previous.color_temperature)
+    brightness = previous.brightness + ratio * (
+        following.brightness - previous.brightness)
+    return int(round(temp)), int(round(brightness))
+
+
+def _visible_steps(previous: ScheduleKeyframe, following: ScheduleKeyframe) -> int:
+    """
+    Number of distinguishable output levels between two keyframes.
+    Measured on the rendered RGB colour and ring alpha, so flat
+    stretches of the colour map don't cause needless updates.
+    """
+    lower = interpolate_color_temperature(previous.color_temperature)
+    upper = interpolate_color_temperature(following.color_temperature)
+    color_steps = max(abs(a - b) for a, b in zip(lower, upper))
+
+    alpha_steps = abs(brightness_to_alpha(following.brightness)
+                      - brightness_to_alpha(previous.brightness))
+
+    return max(color_steps, alpha_steps)
+
+
+def _minute_of_day(moment: datetime) -> float:
+    return moment.hour * 60 + moment.minute + moment.second / 60 + moment.microsecond / 60e6
+
+
+class CircadianScheduler(QObject):
+    """
+    Event-driven schedule engine.
+
+    Never polls: after every evaluation it works out the next moment
+    something visible changes (an interpolation step, a keyframe or
+    the auto-off deadline) and arms a single timer for exactly then.
+    """
+
+    stateChanged = pyqtSignal(int, int)    # color temperature, brightness
+    enabledChanged = pyqtSignal(bool)      # keyframe on/off or auto-off
+
+    def __init__(self, clock: Callable[[], datetime] = None, parent=None):
+        super().__init__(parent)
+
+        self._clock = clock or datetime.now
+        self._keyframes: List[ScheduleKeyframe] = []
+        self._active = False
+        self._auto_off_minutes = 0
+        self._auto_off_deadline: Optional[datetime] = None
+        self._next_keyframe_due: Optional[datetime] = None
+        self._last_state = None
+
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setTimerType(Qt.PreciseTimer)
+        self._timer.timeout.connect(self._on_timeout)
+
+    def set_keyframes(self, entries) -> None:
+        """Replace the schedule (settings representation)."""
+        self._keyframes = parse_schedule(entries)
+        self._last_state = None
+        self._next_keyframe_due = None
+        self._evaluate()
+
+    def get_keyframes(self) -> List[ScheduleKeyframe]:
+        """Get the parsed keyframes."""
+        return list(self._keyframes)
+
+    def set_active(self, active: bool) -> None:
+        """Start or stop following the schedule."""
+        self._active = active
+        self._last_state = None
+        self._next_keyframe_due = None
+        self._evaluate()
+
+    def is_active(self) -> bool:
+        """Check if the schedule is being followed."""
+        return self._active and bool(self._keyframes)
+
+    def set_auto_off_minutes(self, minutes: int) -> None:
+        """Turn the light off N minutes after it was switched on (0 = never)."""
+        self._auto_off_minutes = max(0, int(minutes))
+        if not self._auto_off_minutes:
+            self._auto_off_deadline = None
+        self._arm()
+
+    def notify_light_enabled(self, enabled: bool) -> None:
+        """Tell the engine the light was switched on or off."""
+        if enabled and self._auto_off_minutes:
+            self._auto_off_deadline = self._clock() + timedelta(minutes=self._auto_off_minutes)
+        else:
+            self._auto_off_deadline = None
+        self._arm()
+
+    def current_state(self) -> Optional[tuple]:
+        """Get the scheduled (color_temperature, brightness) for now."""
+        if not self.is_active():
+            return None
+        return sample_schedule(self._keyframes, _minute_of_day(self._clock()))
+
+    def next_event_delay(self) -> Optional[float]:
+        """Seconds until the next scheduled change, or None if idle."""
+        now = self._clock()
+        candidates = []
+
+        if self._auto_off_deadline is not None:
+            candidates.append((self._auto_off_deadline - now).total_seconds())
+
+        if self.is_active():
+            minute = _minute_of_day(now)
+            previous, following, elapsed, length = _segment_for(self._keyframes, minute)
+            to_keyframe = (length - elapsed) * 60
+            candidates.append(to_keyframe)
+
+            steps = _visible_steps(previous, following)
+            if steps:
+                step = max(SCHEDULE_MIN_STEP_SECONDS, length * 60 / steps)
+                into_step = (elapsed * 60) % step
+                candidates.append(step - into_step)
+
+        if not candidates:
+            return None
+        return max(0.0, min(candidates))
+
+    def _arm(self) -> None:
+        """Arm the timer for the next event, or stop it if there is none."""
+        delay = self.next_event_delay()
+        if delay is None:
+            self._timer.stop()
+            return
+        # Land just after the boundary so the evaluation sees it
+        self._timer.start(int(delay * 1000) + 1)
+
+    def _on_timeout(self) -> None:
+        now = self._clock()
+
+        if self._auto_off_deadline is not None and now >= self._auto_off_deadline:
+            self._auto_off_deadline = None
+            self.enabledChanged.emit(False)
+
+        self._evaluate()
+
+    def _evaluate(self) -> None:
+        """Apply the current scheduled state and re-arm."""
+        if self.is_active():
+            now = self._clock()
+            self._fire_keyframe_events(now)
+
+            state = sample_schedule(self._keyframes, _minute_of_day(now))
+            if state != self._last_state:
+                self._last_state = state
+                self.stateChanged.emit(*state)
+
+        self._arm()
+
+    def _fire_keyframe_events(self, now: datetime) -> None:
+        """
+        Emit on/off for the latest keyframe boundary crossed since last check.
+        When the schedule starts or changes, emit the on/off state in force.
+        """
+        minute = _minute_of_day(now)
+        previous, _, elapsed, length = _segment_for(self._keyframes, minute)
+        following_due = now + timedelta(minutes=length - elapsed)
+
+        if self._next_keyframe_due is None:
+            enabled = scheduled_enabled(self._keyframes, minute)
+            if enabled is not None:
+                self.enabledChanged.emit(enabled)
+        elif now >= self._next_keyframe_due:
+            if previous.enabled is not None:
+                self.enabledChanged.emit(previous.enabled)
+
+        self._next_keyframe_due = following_due
@@ -1,17 +1,31 @@
 # Edge Light - Settings Manager
 # Handles loading/saving user settings to JSON file
 
+import hashlib
 import json
 import os
 import sys
-from typing import Any, Dict
+from typing import Any, Dict, List, Optional
 
 from constants import DEFAULT_SETTINGS, SETTINGS_FILENAME
+from config import (
+    Policy, SettingsSnapshot, get_policy_path, file_signature,
+    parse_json_layer, read_json_layer, resolve_settings,
+)
+from settings_model import RejectedField, SettingsModel, validate_settings, validate_value
+from log import get_logger
+from metrics import get_metrics
 
+_log = get_logger('settings')
 
-def get_settings_path() -> str:
+_save_count = get_metrics().counter('settings.writes')
+_save_bytes = get_metrics().counter('settings.bytes_written')
+_save_time = get_metrics().histogram('settings.save')
+
+
+def get_data_dir() -> str:
     """
-    Get the path to the settings file.
+    Get the directory for settings and other app files.
     Uses the directory where the executable/script is located.
     """
     if getattr(sys, 'frozen', False):
@@ -22,30 +36,31 @@ def get_settings_path() -> str:
         base_dir = os.path.dirname(os.path.abspath(__file__))
         base_dir = os.path.dirname(base_dir)  # Go up one level from src/
     
-    return os.path.join(base_dir, SETTINGS_FILENAME)
+    return base_dir
+
+
+def get_settings_path() -> str:
+    """Get the path to the settings file."""
+    return os.path.join(get_data_dir(), SETTINGS_FILENAME)
+
+
+def load_policy(policy_path: Optional[str] = None) -> Policy:
+    """Load the machine policy (an empty policy if there is no file)."""
+    return Policy.from_dict(read_json_layer(policy_path or get_policy_path()))
 
 
 def load_settings() -> Dict[str, Any]:
     """
-    Load settings from JSON file.
-    Returns default settings if file doesn't exist or is corrupted.
+    Load the resolved settings: defaults, machine policy, then the user's
+    JSON file. Returns default settings if the files don't exist or are corrupted.
     """
-    settings_path = get_settings_path()
-    
-    try:
-        if os.path.exists(settings_path):
-            with open(settings_path, 'r', encoding='utf-8') as f:
-                saved_settings = json.load(f)
-            
-            # Merge with defaults to ensure all keys exist
-            # (handles case where new settings are added in updates)
-            merged = DEFAULT_SETTINGS.copy()
-            merged.update(saved_settings)
-            return merged
-    except (json.JSONDecodeError, IOError, OSError) as e:
-        print(f"Warning: Could not load settings: {e}")
-    
-    return DEFAULT_SETTINGS.copy()
+    user, _ = validate_settings(read_json_layer(get_settings_path()), 'user')
+    return resolve_settings(DEFAULT_SETTINGS, load_policy(), user).to_dict()
+
+
+def encode_settings(settings: Dict[str, Any]) -> bytes:
+    """Serialize settings the way they are stored on disk."""
+    return json.dumps(settings, indent=2).encode('utf-8')
 
 
 def save_settings(settings: Dict[str, Any]) -> bool:
@@ -53,14 +68,22 @@ def save_settings(settings: Dict[str, Any]) -> bool:
     Save settings to JSON file.
     Returns True on success, False on failure.
     """
+    return write_settings(encode_settings(settings))
+
+
+def write_settings(data: bytes) -> bool:
+    """Write encoded settings to the settings file."""
     settings_path = get_settings_path()
     
     try:
-        with open(settings_path, 'w', encoding='utf-8') as f:
-            json.dump(settings, f, indent=2)
+        with _save_time.time():
+            with open(settings_path, 'wb') as f:
+                f.write(data)
+        _save_count.inc()
+        _save_bytes.inc(len(data))
         return True
     except (IOError, OSError) as e:
-        print(f"Error: Could not save settings: {e}")
+        _log.error("Could not save settings: %s", e)
         return False
 
 
@@ -68,34 +91,164 @@ class SettingsManager:
     """
     Singleton-like settings manager for the application.
     Provides centralized access to settings with auto-save capability.
+    
+    Reads come from an immutable snapshot resolved from the layers
+    (defaults < machine policy < user file). Only the user layer is
+    written back; locked keys can't be set.
+    
+    Each layer is validated against the settings schema when it is read:
+    values of the wrong type fall back to the layer below, out-of-range
+    numbers are clamped, and both are listed by rejected_fields(). The
+    user file keeps what was written. `model` is a typed attribute view
+    of the result for hot paths.
     """
     
-    def __init__(self):
-        self._settings = load_settings()
+    def __init__(self, policy_path: Optional[str] = None):
+        self._policy_path = policy_path or get_policy_path()
+        self._policy = Policy()
+        self._user: Dict[str, Any] = {}         # As stored in the file
+        self._user_valid: Dict[str, Any] = {}   # Validated, used for resolving
+        self._policy_rejected: List[RejectedField] = []
+        self._user_rejected: List[RejectedField] = []
+        self.model = SettingsModel({})
+        self._signatures = (None, None)
+        self._written_digest = None   # Hash of our last write, to recognise it on disk
         self._listeners = []
+        self._reload_listeners = []
+        self.reload()
     
     def get(self, key: str, default: Any = None) -> Any:
         """Get a setting value."""
-        return self._settings.get(key, default)
+        return self._snapshot.get(key, default)
     
     def set(self, key: str, value: Any, auto_save: bool = True) -> None:
         """Set a setting value and optionally save to disk."""
-        self._settings[key] = value
+        if self._snapshot.is_locked(key):
+            _log.warning("Setting '%s' is locked by policy", key)
+            return
+        value, problems = validate_value(key, value)
+        self._log_rejected(problems)
+        if value is None:
+            return
+        self._user[key] = value
+        self._user_valid[key] = value
+        self._user_rejected = [p for p in self._user_rejected if p.key != key]
+        self._resolve()
         if auto_save:
             self.save()
-        self._notify_listeners(key, value)
+        self._notify_listeners(key, self._snapshot.get(key))
     
     def get_all(self) -> Dict[str, Any]:
         """Get all settings as a dictionary."""
-        return self._settings.copy()
+        return self._snapshot.to_dict()
+    
+    def layers(self) -> Dict[str, Dict[str, Any]]:
+        """The policy and the user's settings as they are in their files, unresolved."""
+        return {'policy': self._policy.to_dict(), 'user': dict(self._user)}
+    
+    def snapshot(self) -> SettingsSnapshot:
+        """Get the current resolved settings."""
+        return self._snapshot
+    
+    def policy_path(self) -> str:
+        """Path of the machine policy file (it may not exist)."""
+        return self._policy_path
+    
+    def is_locked(self, key: str) -> bool:
+        """Check if the machine policy fixes this setting."""
+        return self._snapshot.is_locked(key)
+    
+    def get_range(self, key: str):
+        """Get the (min, max) the policy allows for a setting, or None."""
+        return self._snapshot.get_range(key)
+    
+    def rejected_fields(self) -> List[RejectedField]:
+        """Stored values that were rejected or clamped at load."""
+        return self._policy_rejected + self._user_rejected
     
     def save(self) -> bool:
-        """Save current settings to disk."""
-        return save_settings(self._settings)
+        """Save the user's settings to disk."""
+        data = encode_settings(self._user)
+        saved = write_settings(data)
+        if saved:
+            self._written_digest = hashlib.sha256(data).digest()
+        # Our own write is not a layer change
+        self._signatures = self._layer_signatures()
+        return saved
     
     def reload(self) -> None:
-        """Reload settings from disk."""
-        self._settings = load_settings()
+        """Reload every layer from disk."""
+        self._signatures = self._layer_signatures()
+        self._set_policy(load_policy(self._policy_path))
+        self._set_user(read_json_layer(get_settings_path()))
+        self._resolve()
+    
+    def refresh(self) -> Dict[str, Any]:
+        """
+        Pick up layer files changed by someone else since the last read.
+        Our own writes (same content hash) and half-written files are
+        ignored. Reload listeners get the keys whose resolved value
+        changed; the same dict is returned.
+        """
+        signatures = self._layer_signatures()
+        if signatures == self._signatures:
+            return {}
+        policy_changed = signatures[0] != self._signatures[0]
+        self._signatures = signatures
+        
+        user = None
+        settings_path = get_settings_path()
+        try:
+            with open(settings_path, 'rb') as f:
+                data = f.read()
+            digest = hashlib.sha256(data).digest()
+            if digest != self._written_digest:
+                user = parse_json_layer(data, settings_path)
+                if user is not None:
+                    self._written_digest = digest
+        except FileNotFoundError:
+            user = {} if self._user else None
+        except (IOError, OSError) as e:
+            _log.warning("Could not read settings: %s", e)
+        
+        if user is None and not policy_changed:
+            return {}
+        
+        previous = self._snapshot
+        if policy_changed:
+            self._set_policy(load_policy(self._policy_path))
+        if user is not None:
+            self._set_user(user)
+        self._resolve()
+        
+        changes = previous.diff(self._snapshot)
+        if changes:
+            _log.info("Settings changed on disk: %s", ", ".join(sorted(changes)))
+            self._notify_reload_listeners(changes)
+        return changes
+    
+    def _layer_signatures(self):
+        return (file_signature(self._policy_path), file_signature(get_settings_path()))
+    
+    def _set_policy(self, policy: Policy) -> None:
+        defaults, rejected = validate_settings(policy.defaults, 'policy defaults')
+        locked, rejected_locked = validate_settings(policy.locked, 'policy locked')
+        self._policy = Policy(defaults, locked, policy.ranges)
+        self._policy_rejected = rejected + rejected_locked
+        self._log_rejected(self._policy_rejected)
+    
+    def _set_user(self, user: Dict[str, Any]) -> None:
+        self._user = user
+        self._user_valid, self._user_rejected = validate_settings(user, 'user')
+        self._log_rejected(self._user_rejected)
+    
+    def _log_rejected(self, problems: List[RejectedField]) -> None:
+        for problem in problems:
+            _log.warning("Setting %s", problem.describe())
+    
+    def _resolve(self) -> None:
+        self._snapshot = resolve_settings(DEFAULT_SETTINGS, self._policy, self._user_valid)
+        self.model = SettingsModel(self._snapshot.to_dict())
     
     def add_listener(self, callback) -> None:
         """Add a callback that gets called when settings change."""
@@ -106,13 +259,29 @@ class SettingsManager:
         if callback in self._listeners:
             self._listeners.remove(callback)
     
+    def add_reload_listener(self, callback) -> None:
+        """Add a callback that gets a {key: value} dict of settings changed on disk."""
+        self._reload_listeners.append(callback)
+    
+    def remove_reload_listener(self, callback) -> None:
+        """Remove a reload listener."""
+        if callback in self._reload_listeners:
+            self._reload_listeners.remove(callback)
+    
+    def _notify_reload_listeners(self, changes: Dict[str, Any]) -> None:
+        for listener in self._reload_listeners:
+            try:
+                listener(changes)
+            except Exception as e:
+                _log.error("Error in settings reload listener: %s", e)
+    
     def _notify_listeners(self, key: str, value: Any) -> None:
         """Notify all listeners of a setting change."""
         for listener in self._listeners:
             try:
                 listener(key, value)
             except Exception as e:
-                print(f"Error in settings listener: {e}")
+                _log.error("Error in settings listener: %s", e)
 
 
 # Global settings manager instance
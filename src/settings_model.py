@@ -0,0 +1,325 @@
+# Edge Light - Typed Settings Model
+# Field schema, load-time validation/coercion and a read-only attribute view
+
+import math
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+from constants import (
+    DEFAULT_SETTINGS, EDGE_OPTIONS,
+    BRIGHTNESS_MIN, BRIGHTNESS_MAX, COLOR_TEMP_MIN, COLOR_TEMP_MAX,
+    GLOW_WIDTH_MIN, GLOW_WIDTH_MAX, BREATHING_PERIOD_MIN_MS,
+)
+from log import LEVELS_BY_NAME
+from render_plan import EDGES
+
+
+class Field(NamedTuple):
+    """How one setting is typed: kind, optional range, optional choices."""
+    kind: str                               # bool, int, float, str, time, list, str_list, dict
+    low: Optional[int] = None
+    high: Optional[int] = None
+    choices: Optional[Tuple[str, ...]] = None   # For a dict: the keys it may have
+    item: Optional['Record'] = None             # For a list or dict: shape of its entries
+
+
+class Record(NamedTuple):
+    """Shape of an entry in a list or dict setting."""
+    fields: Dict[str, Field]                # In order, for entries written as lists
+    required: Tuple[str, ...] = ()
+    shapes: Tuple[type, ...] = (dict,)      # dict ({"name": value}) and/or list ([value, ...])
+
+
+class RejectedField(NamedTuple):
+    """A stored value that was not used as written."""
+    source: str     # 'user', 'policy defaults', 'policy locked', or 'set'
+    key: str
+    value: Any      # As found
+    reason: str
+    used: Any       # What the app uses instead (clamped value, or None for the default)
+    path: str = ''  # Entry inside the setting, e.g. 'schedule[2].brightness'
+
+    def describe(self) -> str:
+        return f"{self.path or self.key} = {self.value!r} ({self.source}): {self.reason}"
+
+
+_PERCENT = Field('int', 0, 100)
+_BRIGHTNESS = Field('int', BRIGHTNESS_MIN, BRIGHTNESS_MAX)
+_COLOR_TEMPERATURE = Field('int', COLOR_TEMP_MIN, COLOR_TEMP_MAX)
+
+_SCHEDULE_ENTRY = Record({
+    'time': Field('time'),
+    'color_temperature': _COLOR_TEMPERATURE,
+    'brightness': _BRIGHTNESS,
+    'enabled': Field('bool'),
+}, required=('time', 'color_temperature', 'brightness'))
+
+_EDGE_SPEC = Record({
+    'enabled': Field('bool'),
+    'thickness': Field('int', GLOW_WIDTH_MIN, GLOW_WIDTH_MAX),
+    'inset': Field('int', 0),
+    'brightness': _BRIGHTNESS,
+    'color_temperature': _COLOR_TEMPERATURE,
+})
+
+_EXCLUSION_ZONE = Record({
+    'x': Field('int'),
+    'y': Field('int'),
+    'width': Field('int', 1),
+    'height': Field('int', 1),
+}, required=('x', 'y', 'width', 'height'), shapes=(dict, list))
+
+_LUX_POINT = Record({
+    'lux': Field('float', 0),
+    'brightness': _BRIGHTNESS,
+}, required=('lux', 'brightness'), shapes=(list,))
+
+SETTINGS_SCHEMA: Dict[str, Field] = {
+    'enabled': Field('bool'),
+    'brightness': _BRIGHTNESS,
+    'color_temperature': _COLOR_TEMPERATURE,
+    'glow_width': Field('int', GLOW_WIDTH_MIN, GLOW_WIDTH_MAX),
+    'hotkey_toggle': Field('str'),
+    'hotkey_panel': Field('str'),
+    'hotkey_isolation': Field('bool'),
+    'edge_selection': Field('str', choices=tuple(value for value, _ in EDGE_OPTIONS)),
+    'edge_specs': Field('dict', choices=EDGES, item=_EDGE_SPEC),
+    'exclusion_zones': Field('list', item=_EXCLUSION_ZONE),
+    'avoid_taskbar': Field('bool'),
+    'schedule_enabled': Field('bool'),
+    'schedule': Field('list', item=_SCHEDULE_ENTRY),
+    'auto_off_minutes': Field('int', 0),
+    'fade_duration_ms': Field('int', 0),
+    'transition_duration_ms': Field('int', 0),
+    'breathing_enabled': Field('bool'),
+    'breathing_period_ms': Field('int', BREATHING_PERIOD_MIN_MS),
+    'breathing_depth': _PERCENT,
+    'prewarm_overlay': Field('bool'),
+    'background_rendering': Field('bool'),
+    'renderer': Field('str'),
+    'renderer_budget_ms': Field('int', 1),
+    'watchdog_enabled': Field('bool'),
+    'watchdog_threshold_ms': Field('int', 1),
+    'log_level': Field('str', choices=tuple(LEVELS_BY_NAME)),
+    'log_categories': Field('str_list'),
+    'log_to_file': Field('bool'),
+    'low_memory_mode': Field('bool'),
+    'call_watch_enabled': Field('bool'),
+    'call_watch_processes': Field('str_list'),
+    'power_saver_enabled': Field('bool'),
+    'power_saver_threshold': _PERCENT,
+    'power_saver_max_brightness': _BRIGHTNESS,
+    'usage_log_enabled': Field('bool'),
+    'usage_panel_watts': Field('int', 0, 1000),
+    'ambient_enabled': Field('bool'),
+    'ambient_curve': Field('list', item=_LUX_POINT),
+}
+
+_TRUE_STRINGS = ('true', 'yes', 'on', '1')
+_FALSE_STRINGS = ('false', 'no', 'off', '0')
+
+
+def _coerce(field: Field, value: Any) -> Any:
+    """Convert a value to the field's type, or raise ValueError."""
+    kind = field.kind
+    if kind == 'bool':
+        if isinstance(value, bool):
+            return value
+        if isinstance(value, int) and value in (0, 1):
+            return bool(value)
+        if isinstance(value, str) and value.strip().lower() in _TRUE_STRINGS + _FALSE_STRINGS:
+            return value.strip().lower() in _TRUE_STRINGS
+        raise ValueError("expected true or false")
+
+    if kind in ('int', 'float'):
+        if isinstance(value, bool):
+            raise ValueError("expected a number")
+        if isinstance(value, int):
+            return value if kind == 'int' else float(value)
+        if isinstance(value, str):
+            try:
+                value = float(value.strip())
+            except ValueError:
+                raise ValueError("expected a number") from None
+        if isinstance(value, float):
+            if not math.isfinite(value):
+                raise ValueError("expected a finite number")
+            return int(round(value)) if kind == 'int' else value
+        raise ValueError("expected a number")
+
+    if kind == 'time':
+        try:
+            hours, minutes = (int(part) for part in value.strip().split(':'))
+        except (AttributeError, ValueError):
+            raise ValueError("expected HH:MM") from None
+        if not (0 <= hours < 24 and 0 <= minutes < 60):
+            raise ValueError("expected HH:MM")
+        return f"{hours:02d}:{minutes:02d}"
+
+    if kind == 'str':
+        if not isinstance(value, str) or not value.strip():
+            raise ValueError("expected a non-empty string")
+        if field.choices is not None:
+            value = value.strip().lower()
+            if value not in field.choices:
+                raise ValueError(f"expected one of {', '.join(field.choices)}")
+        return value
+
+    if kind in ('list', 'str_list'):
+        if not isinstance(value, list):
+            raise ValueError("expected a list")
+        if kind == 'str_list':
+            for index, item in enumerate(value):
+                if not isinstance(item, str):
+                    raise ValueError(f"item {index} is not a string")
+        return value
+
+    if kind == 'dict':
+        if not isinstance(value, dict):
+            raise ValueError("expected an object")
+        return value
+
+    raise AssertionError(f"unknown field kind {kind}")
+
+
+def _check(field: Field, value: Any, source: str, key: str, path: str) -> Tuple[Any, List[RejectedField]]:
+    """
+    Coerce a value against a field. Returns (value to use, problems); a
+    rejected value comes back as None, a clamped one as the clamped value.
+    """
+    try:
+        coerced = _coerce(field, value)
+    except ValueError as e:
+        return None, [RejectedField(source, key, value, str(e), None, path)]
+
+    if field.kind in ('int', 'float'):
+        clamped = coerced
+        if field.low is not None and clamped < field.low:
+            clamped = field.low
+        if field.high is not None and clamped > field.high:
+            clamped = field.high
+        clamped = type(coerced)(clamped)
+        if clamped != coerced:
+            low = "" if field.low is None else field.low
+            high = "" if field.high is None else field.high
+            return clamped, [RejectedField(
+                source, key, value, f"outside {low}..{high}, clamped to {clamped}", clamped, path
+            )]
+
+    if field.item is not None and field.kind == 'list':
+        entries, problems = [], []
+        for index, entry in enumerate(coerced):
+            entry, entry_problems = _check_record(field.item, entry, source, key, f"{path}[{index}]")
+            problems += entry_problems
+            if entry is not None:
+                entries.append(entry)
+        return entries, problems
+
+    if field.item is not None and field.kind == 'dict':
+        entries, problems = {}, []
+        for name, entry in coerced.items():
+            entry_path = f"{path}.{name}"
+            if field.choices is not None and name not in field.choices:
+                problems.append(RejectedField(
+                    source, key, entry, f"expected one of {', '.join(field.choices)}", None, entry_path
+                ))
+                continue
+            entry, entry_problems = _check_record(field.item, entry, source, key, entry_path)
+            problems += entry_problems
+            if entry is not None:
+                entries[name] = entry
+        return entries, problems
+
+    return coerced, []
+
+
+def _check_record(record: Record, entry: Any, source: str, key: str, path: str) -> Tuple[Any, List[RejectedField]]:
+    """
+    Validate one entry of a list or dict setting, in the shape it was
+    written in. Bad optional fields are dropped; an entry with a bad or
+    missing required field is rejected whole (returned as None).
+    """
+    names = tuple(record.fields)
+    if list in record.shapes and isinstance(entry, list):
+        if len(entry) != len(names):
+            return None, [RejectedField(
+                source, key, entry, f"expected [{', '.join(names)}]", None, path
+            )]
+        items = [(name, value, f"{path}[{index}]") for index, (name, value) in enumerate(zip(names, entry))]
+    elif dict in record.shapes and isinstance(entry, dict):
+        items = [(name, value, f"{path}.{name}") for name, value in entry.items()]
+    else:
+        shapes = " or ".join("an object" if shape is dict else "a list" for shape in record.shapes)
+        return None, [RejectedField(source, key, entry, f"expected {shapes}", None, path)]
+
+    values, problems = {}, []
+    for name, value, field_path in items:
+        field = record.fields.get(name)
+        if field is None:
+            problems.append(RejectedField(source, key, value, "unknown field, ignored", None, field_path))
+            continue
+        value, field_problems = _check(field, value, source, key, field_path)
+        problems += field_problems
+        if value is not None:
+            values[name] = value
+        elif name in record.required:
+            return None, problems
+
+    missing = [name for name in record.required if name not in values]
+    if missing:
+        problems.append(RejectedField(source, key, entry, f"missing {', '.join(missing)}", None, path))
+        return None, problems
+
+    if isinstance(entry, list):
+        return [values[name] for name in names], problems
+    return values, problems
+
+
+def validate_value(key: str, value: Any, source: str = 'set') -> Tuple[Any, List[RejectedField]]:
+    """
+    Coerce one value. Returns (value to use, problems). A rejected value
+    comes back as (None, problems); a clamped one as (clamped, problems).
+    In a list or dict setting each bad entry is reported by its path and
+    left out (or clamped), and the rest is used.
+    Keys outside the schema pass through unchanged.
+    """
+    field = SETTINGS_SCHEMA.get(key)
+    if field is None:
+        return value, []
+    return _check(field, value, source, key, key)
+
+
+def validate_settings(values: Dict[str, Any], source: str) -> Tuple[Dict[str, Any], List[RejectedField]]:
+    """
+    Validate a whole layer. Rejected keys are left out of the result (so
+    a lower layer's value applies); coerced and clamped values replace the
+    stored ones.
+    """
+    valid: Dict[str, Any] = {}
+    problems: List[RejectedField] = []
+    for key, value in values.items():
+        coerced, value_problems = validate_value(key, value, source)
+        problems += value_problems
+        if coerced is not None:
+            valid[key] = coerced
+    return valid, problems
+
+
+class SettingsModel:
+    """
+    Typed, read-only view of the resolved settings, one slot per schema
+    field: `model.brightness` instead of `settings.get('brightness', 60)`.
+    A new model is built whenever the settings change.
+    """
+
+    __slots__ = tuple(SETTINGS_SCHEMA)
+
+    def __init__(self, values: Dict[str, Any]):
+        for key in self.__slots__:
+            object.__setattr__(self, key, values.get(key, DEFAULT_SETTINGS.get(key)))
+
+    def __setattr__(self, key, value):
+        raise AttributeError("SettingsModel is read-only; use SettingsManager.set()")
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{key}={getattr(self, key)!r}" for key in self.__slots__)
+        return f"SettingsModel({fields})"
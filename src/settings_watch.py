@@ -0,0 +1,57 @@
+# Edge Light - Settings Hot Reload
+# Watches the settings and policy files and applies edits made outside the app
+
+import os
+from typing import List
+
+from PyQt5.QtCore import QObject, QTimer, QFileSystemWatcher
+
+from constants import SETTINGS_RELOAD_DEBOUNCE_MS
+from settings_manager import SettingsManager, get_settings_path
+
+
+class SettingsWatcher(QObject):
+    """
+    QFileSystemWatcher on the layer files and their directories (editors
+    that save by replacing the file drop the file watch). Bursts of events
+    are debounced into one SettingsManager.refresh(), which ignores the
+    app's own writes and notifies reload listeners of the changed keys.
+    """
+
+    def __init__(self, settings_manager: SettingsManager,
+                 debounce_ms: int = SETTINGS_RELOAD_DEBOUNCE_MS, parent=None):
+        super().__init__(parent)
+
+        self._settings = settings_manager
+        self._paths = [get_settings_path(), settings_manager.policy_path()]
+
+        self._debounce = QTimer(self)
+        self._debounce.setSingleShot(True)
+        self._debounce.setInterval(debounce_ms)
+        self._debounce.timeout.connect(self._reload)
+
+        self._watcher = QFileSystemWatcher(self)
+        self._watcher.fileChanged.connect(self._on_changed)
+        self._watcher.directoryChanged.connect(self._on_changed)
+        self._watch_paths()
+
+    def _watch_paths(self) -> None:
+        """(Re-)add watches for the files that exist and their directories."""
+        wanted: List[str] = []
+        for path in self._paths:
+            if os.path.exists(path):
+                wanted.append(path)
+            directory = os.path.dirname(path)
+            if os.path.isdir(directory):
+                wanted.append(directory)
+        watched = set(self._watcher.files()) | set(self._watcher.directories())
+        missing = [p for p in dict.fromkeys(wanted) if p not in watched]
+        if missing:
+            self._watcher.addPaths(missing)
+
+    def _on_changed(self, path: str) -> None:
+        self._debounce.start()
+
+    def _reload(self) -> None:
+        self._watch_paths()   # A replaced file needs a new watch
+        self._settings.refresh()
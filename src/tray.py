@@ -3,12 +3,13 @@
 
 import os
 import sys
+import time
 from PyQt5.QtWidgets import (
     QSystemTrayIcon, QMenu, QAction, QWidgetAction,
     QWidget, QVBoxLayout, QHBoxLayout, QLabel, QSlider,
-    QPushButton, QFrame, QApplication, QCheckBox, QGridLayout
+    QPushButton, QFrame, QApplication, QCheckBox, QGridLayout, QFileDialog
 )
-from PyQt5.QtCore import Qt, pyqtSignal, QObject
+from PyQt5.QtCore import Qt, pyqtSignal, QObject, QTimer
 from PyQt5.QtGui import QIcon, QPixmap, QPainter, QColor, QFont
 
 from constants import (
@@ -17,7 +18,22 @@ from constants import (
     COLOR_TEMP_MIN, COLOR_TEMP_MAX,
     GLOW_WIDTH_MIN, GLOW_WIDTH_MAX,
     EDGE_OPTIONS, EDGE_ALL,
+    POPUP_RELEASE_DELAY_MS, USAGE_DIRNAME, LOG_FILENAME,
 )
+from schedule import CircadianScheduler
+from process_watch import ProcessWatcher
+from power import PowerPolicy
+from ambient import AmbientLight
+from renderers import get_renderer_registry
+from usage_log import UsageLog
+from autostart import AutostartService
+from profiler import get_startup_profiler
+from metrics import get_metrics
+from log import get_log
+from memory import trim_heap
+
+
+_popup_show_time = get_metrics().histogram('popup.show')
 
 
 def get_icon_path():
@@ -62,6 +78,29 @@ def create_default_icon():
     return QIcon(pixmap)
 
 
+CHECKBOX_STYLE = """
+    QCheckBox {
+        color: #B0B0B0;
+        font-size: 11px;
+        padding: 5px;
+    }
+    QCheckBox::indicator {
+        width: 16px;
+        height: 16px;
+        border-radius: 3px;
+        border: 1px solid #505050;
+        background: #303030;
+    }
+    QCheckBox::indicator:checked {
+        background: #FFD070;
+        border-color: #CC9F40;
+    }
+    QCheckBox::indicator:hover {
+        border-color: #707070;
+    }
+"""
+
+
 class HotkeyButton(QPushButton):
     """Button that captures key combinations when clicked."""
     
@@ -269,6 +308,9 @@ class SliderWidget(QWidget):
     def set_value(self, value):
         self.slider.setValue(value)
     
+    def set_range(self, min_val: int, max_val: int):
+        self.slider.setRange(min_val, max_val)
+    
     def value(self):
         return self.slider.value()
 
@@ -282,9 +324,13 @@ class SettingsPopup(QWidget):
     edgeSelectionChanged = pyqtSignal(str)
     toggleRequested = pyqtSignal()
     autostartChanged = pyqtSignal(bool)
+    scheduleChanged = pyqtSignal(bool)
+    breathingChanged = pyqtSignal(bool)
+    callWatchChanged = pyqtSignal(bool)
     hotkeyToggleChanged = pyqtSignal(str)
     hotkeyPanelChanged = pyqtSignal(str)
     quitRequested = pyqtSignal()
+    hidden = pyqtSignal()
     
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -449,29 +495,34 @@ class SettingsPopup(QWidget):
         sep3.setFixedHeight(1)
         layout.addWidget(sep3)
         
+        # Breathing checkbox
+        self.breathing_checkbox = QCheckBox("💫 Breathing effect")
+        self.breathing_checkbox.setStyleSheet(CHECKBOX_STYLE)
+        self.breathing_checkbox.stateChanged.connect(
+            lambda state: self.breathingChanged.emit(state == Qt.Checked)
+        )
+        layout.addWidget(self.breathing_checkbox)
+        
+        # Schedule checkbox
+        self.schedule_checkbox = QCheckBox("🌅 Follow daily schedule")
+        self.schedule_checkbox.setStyleSheet(CHECKBOX_STYLE)
+        self.schedule_checkbox.stateChanged.connect(
+            lambda state: self.scheduleChanged.emit(state == Qt.Checked)
+        )
+        layout.addWidget(self.schedule_checkbox)
+        
+        # Call watch checkbox
+        self.call_watch_checkbox = QCheckBox("📹 Light on during video calls")
+        self.call_watch_checkbox.setStyleSheet(CHECKBOX_STYLE)
+        self.call_watch_checkbox.stateChanged.connect(
+            lambda state: self.callWatchChanged.emit(state == Qt.Checked)
+        )
+        layout.addWidget(self.call_watch_checkbox)
+        
         # Auto-start checkbox
-        self.autostart_checkbox = QCheckBox("🚀 Start with Windows")
-        self.autostart_checkbox.setStyleSheet("""
-            QCheckBox {
-                color: #B0B0B0;
-                font-size: 11px;
-                padding: 5px;
-            }
-            QCheckBox::indicator {
-                width: 16px;
-                height: 16px;
-                border-radius: 3px;
-                border: 1px solid #505050;
-                background: #303030;
-            }
-            QCheckBox::indicator:checked {
-                background: #FFD070;
-                border-color: #CC9F40;
-            }
-            QCheckBox::indicator:hover {
-                border-color: #707070;
-            }
-        """)
+        autostart_label = "🚀 Start with Windows" if sys.platform == 'win32' else "🚀 Start at login"
+        self.autostart_checkbox = QCheckBox(autostart_label)
+        self.autostart_checkbox.setStyleSheet(CHECKBOX_STYLE)
         self.autostart_checkbox.stateChanged.connect(
             lambda state: self.autostartChanged.emit(state == Qt.Checked)
         )
@@ -500,6 +551,10 @@ class SettingsPopup(QWidget):
         main_layout.addWidget(container)
         self.setFixedWidth(290)
     
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        self.hidden.emit()
+    
     def update_toggle_button(self, enabled: bool):
         """Update toggle button text and style based on state."""
         if enabled:
@@ -561,6 +616,24 @@ class SettingsPopup(QWidget):
         self.autostart_checkbox.setChecked(enabled)
         self.autostart_checkbox.blockSignals(False)
     
+    def set_breathing_enabled(self, enabled: bool):
+        """Set breathing checkbox state without triggering signal."""
+        self.breathing_checkbox.blockSignals(True)
+        self.breathing_checkbox.setChecked(enabled)
+        self.breathing_checkbox.blockSignals(False)
+    
+    def set_schedule_enabled(self, enabled: bool):
+        """Set schedule checkbox state without triggering signal."""
+        self.schedule_checkbox.blockSignals(True)
+        self.schedule_checkbox.setChecked(enabled)
+        self.schedule_checkbox.blockSignals(False)
+    
+    def set_call_watch_enabled(self, enabled: bool):
+        """Set call watch checkbox state without triggering signal."""
+        self.call_watch_checkbox.blockSignals(True)
+        self.call_watch_checkbox.setChecked(enabled)
+        self.call_watch_checkbox.blockSignals(False)
+    
     def set_edge_selection(self, selection: str):
         """Set the current edge selection."""
         self._current_edge = selection
@@ -614,27 +687,115 @@ class TrayManager(QObject):
     # Signal to open popup (for hotkey)
     openPanelRequested = pyqtSignal()
     
-    def __init__(self, overlay, settings_manager, hotkey_manager=None):
+    # Quit was picked from the menu, after shutdown(); the owner decides what quits
+    quitRequested = pyqtSignal()
+    
+    def __init__(self, overlay, settings_manager, hotkey_manager=None,
+                 autostart_backend=None, defer_init=False, show_icon=True):
+        """
+        overlay is a GlowOverlay, or a callable creating one. With
+        defer_init, only the tray icon is created now; the overlay, popup
+        and schedule are built by ensure_initialized() on first use.
+        Without show_icon the tray icon is never shown (embedded or
+        headless use); everything is then driven through the methods.
+        """
         super().__init__()
         
-        self.overlay = overlay
+        self._overlay_source = overlay
+        self._initialized = False
+        self.overlay = None
+        self.popup = None
         self.settings = settings_manager
         self.hotkey_manager = hotkey_manager
+        self.recorder = None
+        
+        # Low-memory mode builds the popup on demand and frees it again
+        # after it has been hidden for a while
+        self._low_memory = settings_manager.get('low_memory_mode', False)
+        self._popup_release_timer = QTimer(self)
+        self._popup_release_timer.setSingleShot(True)
+        self._popup_release_timer.setInterval(POPUP_RELEASE_DELAY_MS)
+        self._popup_release_timer.timeout.connect(self._release_popup)
+        
+        self._call_turned_on = False   # The call watcher (not the user) turned the light on
+        
+        # Edits to the settings files made while running
+        self.settings.add_reload_listener(self._on_settings_reloaded)
         
-        self._setup_tray()
-        self._setup_popup()
-        self._load_settings()
+        # Registry/filesystem access happens off the GUI thread
+        self.autostart = AutostartService(autostart_backend, parent=self)
+        self.autostart.stateChanged.connect(self._on_autostart_state)
+        self.autostart.applyFinished.connect(self._on_autostart_applied)
+        
+        self._setup_tray(show_icon)
+        if not defer_init:
+            self.ensure_initialized()
         
         # Connect panel open signal
         self.openPanelRequested.connect(self._show_popup)
     
-    def _setup_tray(self):
+    def ensure_initialized(self):
+        """Build the overlay, popup and schedule if that was deferred."""
+        if self._initialized:
+            return
+        self._initialized = True
+        
+        with get_startup_profiler().phase('tray_deferred_init'):
+            if isinstance(self._overlay_source, QWidget):
+                self.overlay = self._overlay_source
+            else:
+                self.overlay = self._overlay_source()
+            self._overlay_source = None
+            self.overlay.rendererFallback.connect(self._on_renderer_fallback)
+            
+            self._load_settings()
+            self._setup_ambient_light()   # Before the schedule, which defers brightness to it
+            self._setup_usage_log()       # Before the schedule, which may switch the light
+            self._setup_schedule()
+            self._setup_call_watch()
+            self._setup_power_policy()
+            if not self._low_memory:
+                self._ensure_popup()
+    
+    def is_initialized(self) -> bool:
+        """Check if the overlay and popup exist yet."""
+        return self._initialized
+    
+    def _setup_tray(self, show_icon: bool = True):
         """Setup system tray icon."""
         self.tray_icon = QSystemTrayIcon()
         self.tray_icon.setIcon(create_default_icon())
         self.tray_icon.setToolTip(f"{APP_NAME} - Click to open settings")
         self.tray_icon.activated.connect(self._on_tray_activated)
-        self.tray_icon.show()
+        
+        # Right-click menu
+        self.tray_menu = QMenu()
+        self.tray_menu.setStyleSheet("""
+            QMenu {
+                background-color: #1E1E1E;
+                color: #E0E0E0;
+                border: 1px solid #404040;
+            }
+            QMenu::item:selected {
+                background-color: #353535;
+            }
+        """)
+        diagnostics_action = QAction("Diagnostics...", self.tray_menu)
+        diagnostics_action.triggered.connect(self._show_diagnostics)
+        self.tray_menu.addAction(diagnostics_action)
+        save_log_action = QAction("Save Recent Log...", self.tray_menu)
+        save_log_action.triggered.connect(self._save_recent_log)
+        self.tray_menu.addAction(save_log_action)
+        self.tray_menu.addSeparator()
+        quit_action = QAction("Quit", self.tray_menu)
+        quit_action.triggered.connect(self._on_quit)
+        self.tray_menu.addAction(quit_action)
+        self.tray_icon.setContextMenu(self.tray_menu)
+        
+        self.diagnostics = None
+        
+        if show_icon:
+            self.tray_icon.show()
     
     def _setup_popup(self):
         """Setup settings popup."""
@@ -646,37 +807,189 @@ class TrayManager(QObject):
         self.popup.edgeSelectionChanged.connect(self._on_edge_selection_changed)
         self.popup.toggleRequested.connect(self._on_toggle)
         self.popup.autostartChanged.connect(self._on_autostart_changed)
+        self.popup.scheduleChanged.connect(self._on_schedule_changed)
+        self.popup.breathingChanged.connect(self._on_breathing_changed)
+        self.popup.callWatchChanged.connect(self._on_call_watch_changed)
         self.popup.hotkeyToggleChanged.connect(self._on_hotkey_toggle_changed)
         self.popup.hotkeyPanelChanged.connect(self._on_hotkey_panel_changed)
         self.popup.quitRequested.connect(self._on_quit)
+        self.popup.hidden.connect(self._on_popup_hidden)
+        if self.recorder is not None:
+            self._connect_recorder()
+    
+    def set_recorder(self, recorder):
+        """Log the panel's input events to an InteractionRecorder."""
+        self.recorder = recorder
+        if self.popup is not None:
+            self._connect_recorder()
+    
+    def _connect_recorder(self):
+        record = self.recorder.record
+        self.popup.brightnessChanged.connect(lambda v: record('brightness', v))
+        self.popup.temperatureChanged.connect(lambda v: record('color_temperature', v))
+        self.popup.widthChanged.connect(lambda v: record('glow_width', v))
+        self.popup.edgeSelectionChanged.connect(lambda v: record('edge_selection', v))
+        self.popup.toggleRequested.connect(lambda: record('toggle'))
+        self.popup.breathingChanged.connect(lambda v: record('breathing', v))
+        self.popup.scheduleChanged.connect(lambda v: record('schedule', v))
+        self.popup.callWatchChanged.connect(lambda v: record('call_watch', v))
+    
+    def _ensure_popup(self):
+        """Create the popup if it doesn't exist (yet, or any more)."""
+        if self.popup is None:
+            self._setup_popup()
+            self._sync_popup()
+        return self.popup
+    
+    def _sync_popup(self):
+        """Show the current settings (and scheduled state) in the popup."""
+        model = self.settings.model
+        brightness = model.brightness
+        temperature = model.color_temperature
+        scheduled = self.scheduler.current_state()
+        if scheduled is not None:
+            temperature, brightness = scheduled
+        
+        self.popup.blockSignals(True)
+        self.popup.set_values(brightness, temperature, model.glow_width)
+        self.popup.blockSignals(False)
+        self.popup.update_toggle_button(self.overlay.is_enabled())
+        self.popup.set_autostart(bool(self.autostart.cached_state()))
+        self.popup.autostart_checkbox.setEnabled(self.autostart.is_supported())
+        self.popup.set_hotkey_toggle(model.hotkey_toggle)
+        self.popup.set_hotkey_panel(model.hotkey_panel)
+        self.popup.set_edge_selection(model.edge_selection)
+        self.popup.set_breathing_enabled(model.breathing_enabled)
+        self.popup.set_schedule_enabled(model.schedule_enabled)
+        self.popup.set_call_watch_enabled(model.call_watch_enabled)
+        self._apply_policy_to_popup()
+    
+    def _apply_policy_to_popup(self):
+        """Narrow the sliders to the policy ranges and disable locked controls."""
+        sliders = {
+            'brightness': (self.popup.brightness_slider, BRIGHTNESS_MIN, BRIGHTNESS_MAX),
+            'color_temperature': (self.popup.temp_slider, COLOR_TEMP_MIN, COLOR_TEMP_MAX),
+            'glow_width': (self.popup.width_slider, GLOW_WIDTH_MIN, GLOW_WIDTH_MAX),
+        }
+        self.popup.blockSignals(True)
+        for key, (slider, low, high) in sliders.items():
+            bounds = self.settings.get_range(key)
+            if bounds is not None:
+                policy_low, policy_high = bounds
+                if policy_low is not None:
+                    low = max(low, int(policy_low))
+                if policy_high is not None:
+                    high = min(high, int(policy_high))
+                slider.set_range(low, high)
+        self.popup.blockSignals(False)
+        
+        controls = {
+            'brightness': [self.popup.brightness_slider],
+            'color_temperature': [self.popup.temp_slider],
+            'glow_width': [self.popup.width_slider],
+            'edge_selection': list(self.popup.edge_buttons.values()),
+            'hotkey_toggle': [self.popup.hotkey_toggle_btn],
+            'hotkey_panel': [self.popup.hotkey_panel_btn],
+            'breathing_enabled': [self.popup.breathing_checkbox],
+            'schedule_enabled': [self.popup.schedule_checkbox],
+            'call_watch_enabled': [self.popup.call_watch_checkbox],
+        }
+        for key, widgets in controls.items():
+            if self.settings.is_locked(key):
+                for widget in widgets:
+                    widget.setEnabled(False)
+                    widget.setToolTip("Set by your administrator")
+    
+    def _on_popup_hidden(self):
+        if self._low_memory:
+            self._popup_release_timer.start()
+    
+    def _release_popup(self):
+        """Destroy the hidden popup and give its memory back."""
+        if self.popup is None or self.popup.isVisible():
+            return
+        popup, self.popup = self.popup, None
+        popup.destroyed.connect(trim_heap)
+        popup.deleteLater()
     
     def _load_settings(self):
-        """Load settings and apply to UI."""
-        brightness = self.settings.get('brightness', 60)
-        temperature = self.settings.get('color_temperature', 4500)
-        width = self.settings.get('glow_width', 175)
-        enabled = self.settings.get('enabled', False)
-        hotkey_toggle = self.settings.get('hotkey_toggle', 'alt+shift+l')
-        hotkey_panel = self.settings.get('hotkey_panel', 'alt+shift+p')
-        edge_selection = self.settings.get('edge_selection', EDGE_ALL)
-        
-        from autostart import is_autostart_enabled
-        autostart_enabled = is_autostart_enabled()
-        
-        self.popup.set_values(brightness, temperature, width)
-        self.popup.update_toggle_button(enabled)
-        self.popup.set_autostart(autostart_enabled)
-        self.popup.set_hotkey_toggle(hotkey_toggle)
-        self.popup.set_hotkey_panel(hotkey_panel)
-        self.popup.set_edge_selection(edge_selection)
-        
-        self.overlay.set_brightness(brightness)
-        self.overlay.set_color_temperature(temperature)
-        self.overlay.set_glow_width(width)
-        self.overlay.set_edge_selection(edge_selection)
-        if enabled:
+        """Load settings and apply them to the overlay."""
+        model = self.settings.model
+        
+        self.autostart.refresh()
+        
+        self.overlay.set_low_memory(self._low_memory)
+        self.overlay.set_background_rendering(model.background_rendering)
+        self._apply_renderer()
+        brightness_range = self.settings.get_range('brightness')
+        self.overlay.set_brightness_limit(brightness_range[1] if brightness_range else None)
+        self.overlay.set_fade_duration(model.fade_duration_ms)
+        self.overlay.set_transition_duration(model.transition_duration_ms)
+        self.overlay.set_breathing(
+            model.breathing_enabled, model.breathing_period_ms, model.breathing_depth
+        )
+        self.overlay.set_brightness(model.brightness)
+        self.overlay.set_color_temperature(model.color_temperature)
+        self.overlay.set_glow_width(model.glow_width)
+        self.overlay.set_edge_selection(model.edge_selection)
+        self.overlay.set_edge_specs(model.edge_specs)
+        self.overlay.set_exclusion_zones(model.exclusion_zones)
+        self.overlay.set_avoid_taskbar(model.avoid_taskbar)
+        if model.enabled:
             self.overlay.set_enabled(True)
     
+    def _apply_renderer(self):
+        """Give the overlay the configured renderer (plugins load on first use)."""
+        model = self.settings.model
+        renderer = get_renderer_registry().create(model.renderer)
+        self.overlay.set_renderer(renderer, model.renderer_budget_ms)
+    
+    def _on_renderer_fallback(self, name: str, reason: str):
+        self.show_notification("Renderer", f"'{name}' {reason}; using the solid ring")
+    
+    def _setup_schedule(self):
+        """Setup the circadian schedule engine."""
+        self.scheduler = CircadianScheduler(parent=self)
+        self.scheduler.stateChanged.connect(self._on_schedule_state)
+        self.scheduler.enabledChanged.connect(self.set_enabled)
+        
+        model = self.settings.model
+        self.scheduler.set_auto_off_minutes(model.auto_off_minutes)
+        self.scheduler.set_keyframes(model.schedule)
+        self.scheduler.notify_light_enabled(self.overlay.is_enabled())
+        self.scheduler.set_active(model.schedule_enabled)
+    
+    def _setup_call_watch(self):
+        """Setup the watcher that turns the light on during video calls."""
+        self.call_watcher = ProcessWatcher(parent=self)
+        self.call_watcher.runningChanged.connect(self._on_call_running)
+        self.call_watcher.set_targets(self.settings.model.call_watch_processes)
+        self.call_watcher.set_active(self.settings.model.call_watch_enabled)
+    
+    def _setup_power_policy(self):
+        """Setup the battery power policy."""
+        self.power_policy = PowerPolicy(parent=self)
+        self.power_policy.savingChanged.connect(self._on_power_saving)
+        self.power_policy.set_threshold(self.settings.model.power_saver_threshold)
+        self.power_policy.set_active(self.settings.model.power_saver_enabled)
+    
+    def _setup_ambient_light(self):
+        """Setup adaptive brightness from the ambient light sensor."""
+        self.ambient_light = AmbientLight(parent=self)
+        self.ambient_light.brightnessChanged.connect(self._on_ambient_brightness)
+        self.ambient_light.set_curve(self.settings.model.ambient_curve)
+        self.ambient_light.set_active(self.settings.model.ambient_enabled)
+    
+    def _setup_usage_log(self):
+        """Setup the usage log (started only if enabled)."""
+        from settings_manager import get_data_dir
+        self.usage_log = UsageLog(
+            self.overlay.usage_state, os.path.join(get_data_dir(), USAGE_DIRNAME),
+            self.settings.model.usage_panel_watts, parent=self,
+        )
+        if self.settings.model.usage_log_enabled:
+            self.usage_log.start()
+    
     def set_hotkey_manager(self, manager):
         """Set the hotkey manager reference."""
         self.hotkey_manager = manager
@@ -684,10 +997,40 @@ class TrayManager(QObject):
     def _on_tray_activated(self, reason):
         """Handle tray icon click."""
         if reason in (QSystemTrayIcon.Trigger, QSystemTrayIcon.DoubleClick):
+            if self.recorder is not None:
+                self.recorder.record('tray_click')
             self._show_popup()
     
+    def _show_diagnostics(self):
+        """Show the runtime metrics window."""
+        if self.diagnostics is None:
+            from diagnostics import DiagnosticsWindow
+            self.diagnostics = DiagnosticsWindow(
+                self.settings,
+                usage_log=self.usage_log if self._initialized else None
+            )
+        self.diagnostics.show()
+        self.diagnostics.raise_()
+        self.diagnostics.activateWindow()
+    
+    def _save_recent_log(self):
+        """Write the in-memory log to a file for a bug report."""
+        default_name = time.strftime("edgelight_log_%Y%m%d_%H%M%S.txt")
+        path, _ = QFileDialog.getSaveFileName(
+            None, "Save Recent Log", default_name, "Text files (*.txt)"
+        )
+        if path and get_log().dump(path):
+            self.show_notification("Log Saved", os.path.basename(path))
+    
     def _show_popup(self):
         """Show the settings popup near the tray icon."""
+        with _popup_show_time.time():
+            self._show_popup_now()
+    
+    def _show_popup_now(self):
+        self.ensure_initialized()
+        self._popup_release_timer.stop()
+        self._ensure_popup()
         geometry = self.tray_icon.geometry()
         
         popup_x = geometry.x() - self.popup.width() // 2 + geometry.width() // 2
@@ -701,6 +1044,9 @@ class TrayManager(QObject):
         if popup_y < 10:
             popup_y = geometry.y() + geometry.height() + 10
         
+        # Pick up changes made outside the app (e.g. Task Manager)
+        self.autostart.refresh()
+        
         self.popup.move(popup_x, popup_y)
         self.popup.show()
         self.popup.raise_()
@@ -723,11 +1069,213 @@ class TrayManager(QObject):
         self.settings.set('edge_selection', selection)
     
     def _on_autostart_changed(self, enabled: bool):
-        from autostart import set_autostart
-        success = set_autostart(enabled)
+        self.autostart.apply(enabled)
+    
+    def _on_autostart_state(self, enabled: bool):
+        if self.popup is not None:
+            self.popup.set_autostart(enabled)
+    
+    def _on_autostart_applied(self, enabled: bool, success: bool):
         if success:
             status = "enabled" if enabled else "disabled"
             self.show_notification("Auto-Start", f"Auto-start {status}")
+        else:
+            self.show_notification("Auto-Start", "Could not change auto-start")
+    
+    def _on_breathing_changed(self, enabled: bool):
+        self.overlay.set_breathing(enabled)
+        self.settings.set('breathing_enabled', enabled)
+    
+    def _on_schedule_changed(self, enabled: bool):
+        self.settings.set('schedule_enabled', enabled)
+        self.scheduler.set_active(enabled)
+    
+    def _on_call_watch_changed(self, enabled: bool):
+        self.settings.set('call_watch_enabled', enabled)
+        self._on_call_watch_state(enabled)
+    
+    def _on_call_watch_state(self, enabled: bool):
+        self.call_watcher.set_active(enabled)
+        if not enabled:
+            self._call_turned_on = False
+    
+    def _on_call_running(self, running: bool):
+        """Turn the light on for a call, and off afterwards if the call turned it on."""
+        if running:
+            if not self.overlay.is_enabled():
+                self.set_enabled(True)
+                self._call_turned_on = True
+        elif self._call_turned_on:
+            self._call_turned_on = False
+            self.set_enabled(False)
+    
+    def _on_power_saving(self, saving: bool):
+        self.overlay.set_power_saving(
+            saving, self.settings.model.power_saver_max_brightness
+        )
+    
+    def _on_schedule_state(self, temperature: int, brightness: int):
+        """Apply a scheduled state without persisting it as the user's choice."""
+        if self.ambient_light.is_active():
+            brightness = None    # The sensor owns brightness
+        self.overlay.animate_to(brightness=brightness, temperature=temperature)
+        
+        if self.popup is None:
+            return
+        self.popup.blockSignals(True)
+        if brightness is not None:
+            self.popup.brightness_slider.set_value(brightness)
+        self.popup.temp_slider.set_value(temperature)
+        self.popup.blockSignals(False)
+    
+    def _on_ambient_brightness(self, brightness: int):
+        """Apply the sensor's brightness without persisting it as the user's choice."""
+        self.overlay.animate_to(brightness=brightness)
+        
+        if self.popup is None:
+            return
+        self.popup.blockSignals(True)
+        self.popup.brightness_slider.set_value(brightness)
+        self.popup.blockSignals(False)
+    
+    def _set_ambient_active(self, active: bool):
+        """
+        Start or stop following the sensor. Its brightness was never saved,
+        so stopping goes back to the scheduled brightness, or the user's.
+        """
+        was_active = self.ambient_light.is_active()
+        self.ambient_light.set_active(active)
+        if not was_active or self.ambient_light.is_active():
+            return
+        state = self.scheduler.current_state()
+        brightness = state[1] if state is not None else self.settings.model.brightness
+        self.overlay.animate_to(brightness=brightness)
+        
+        if self.popup is None:
+            return
+        blocked = self.popup.blockSignals(True)   # Already blocked during a reload
+        self.popup.brightness_slider.set_value(brightness)
+        self.popup.blockSignals(blocked)
+    
+    def _apply_log_settings(self, changes: dict):
+        """Log level, category filter and file sink (read once by main() at startup)."""
+        model = self.settings.model
+        log = get_log()
+        if changes.keys() & {'log_level', 'log_categories'}:
+            log.configure(model.log_level, model.log_categories)
+        if 'log_to_file' in changes:
+            from settings_manager import get_data_dir
+            log.set_file(os.path.join(get_data_dir(), LOG_FILENAME) if model.log_to_file else None)
+    
+    def _set_low_memory(self, enabled: bool):
+        self._low_memory = enabled
+        if not self._initialized:
+            return
+        self.overlay.set_low_memory(enabled)
+        if not enabled:
+            self._popup_release_timer.stop()
+        elif self.popup is not None and not self.popup.isVisible():
+            self._popup_release_timer.start()
+    
+    def _on_settings_reloaded(self, changes: dict):
+        """Apply settings edited on disk, touching only what changed."""
+        self._apply_log_settings(changes)
+        if 'low_memory_mode' in changes:
+            self._set_low_memory(self.settings.model.low_memory_mode)
+        if not self._initialized:
+            return  # Everything is read when initialization happens
+        model = self.settings.model
+        overlay = self.overlay
+        popup = self.popup
+        
+        if popup is not None:
+            popup.blockSignals(True)
+        try:
+            if 'brightness' in changes:
+                overlay.set_brightness(model.brightness)
+                if popup is not None:
+                    popup.brightness_slider.set_value(model.brightness)
+            if 'color_temperature' in changes:
+                overlay.set_color_temperature(model.color_temperature)
+                if popup is not None:
+                    popup.temp_slider.set_value(model.color_temperature)
+            if 'glow_width' in changes:
+                overlay.set_glow_width(model.glow_width)
+                if popup is not None:
+                    popup.width_slider.set_value(model.glow_width)
+            if 'edge_selection' in changes:
+                overlay.set_edge_selection(model.edge_selection)
+                if popup is not None:
+                    popup.set_edge_selection(model.edge_selection)
+            if 'edge_specs' in changes:
+                overlay.set_edge_specs(model.edge_specs)
+            if 'exclusion_zones' in changes:
+                overlay.set_exclusion_zones(model.exclusion_zones)
+            if 'avoid_taskbar' in changes:
+                overlay.set_avoid_taskbar(model.avoid_taskbar)
+            if 'background_rendering' in changes:
+                overlay.set_background_rendering(model.background_rendering)
+            if changes.keys() & {'renderer', 'renderer_budget_ms'}:
+                self._apply_renderer()
+            if 'fade_duration_ms' in changes:
+                overlay.set_fade_duration(model.fade_duration_ms)
+            if 'transition_duration_ms' in changes:
+                overlay.set_transition_duration(model.transition_duration_ms)
+            if changes.keys() & {'breathing_enabled', 'breathing_period_ms', 'breathing_depth'}:
+                overlay.set_breathing(
+                    model.breathing_enabled,
+                    model.breathing_period_ms,
+                    model.breathing_depth,
+                )
+                if popup is not None:
+                    popup.set_breathing_enabled(model.breathing_enabled)
+            if 'auto_off_minutes' in changes:
+                self.scheduler.set_auto_off_minutes(model.auto_off_minutes)
+            if 'schedule' in changes:
+                self.scheduler.set_keyframes(model.schedule)
+            if 'schedule_enabled' in changes:
+                self.scheduler.set_active(model.schedule_enabled)
+                if popup is not None:
+                    popup.set_schedule_enabled(model.schedule_enabled)
+            if 'call_watch_processes' in changes:
+                self.call_watcher.set_targets(model.call_watch_processes)
+            if 'call_watch_enabled' in changes:
+                self._on_call_watch_state(model.call_watch_enabled)
+                if popup is not None:
+                    popup.set_call_watch_enabled(model.call_watch_enabled)
+            if 'power_saver_threshold' in changes:
+                self.power_policy.set_threshold(model.power_saver_threshold)
+            if 'power_saver_enabled' in changes:
+                self.power_policy.set_active(model.power_saver_enabled)
+            if 'power_saver_max_brightness' in changes and self.power_policy.is_saving():
+                self._on_power_saving(True)
+            if 'usage_panel_watts' in changes:
+                self.usage_log.set_panel_watts(model.usage_panel_watts)
+            if 'usage_log_enabled' in changes:
+                if model.usage_log_enabled:
+                    self.usage_log.start()
+                else:
+                    self.usage_log.close()
+            if 'ambient_curve' in changes:
+                self.ambient_light.set_curve(model.ambient_curve)
+            if 'ambient_enabled' in changes:
+                self._set_ambient_active(model.ambient_enabled)
+            if 'hotkey_toggle' in changes:
+                if self.hotkey_manager:
+                    self.hotkey_manager.update_hotkey('toggle', model.hotkey_toggle)
+                if popup is not None:
+                    popup.set_hotkey_toggle(model.hotkey_toggle)
+            if 'hotkey_panel' in changes:
+                if self.hotkey_manager:
+                    self.hotkey_manager.update_hotkey('panel', model.hotkey_panel)
+                if popup is not None:
+                    popup.set_hotkey_panel(model.hotkey_panel)
+        finally:
+            if popup is not None:
+                popup.blockSignals(False)
+        
+        if 'enabled' in changes:
+            self.set_enabled(model.enabled)
     
     def _on_hotkey_toggle_changed(self, hotkey_str: str):
         self.settings.set('hotkey_toggle', hotkey_str)
@@ -752,22 +1300,53 @@ class TrayManager(QObject):
     
     def toggle(self):
         """Toggle the overlay on/off."""
-        enabled = not self.overlay.is_enabled()
+        self.ensure_initialized()
+        self._call_turned_on = False   # The user took over
+        self.set_enabled(not self.overlay.is_enabled())
+    
+    def set_enabled(self, enabled: bool):
+        """Turn the overlay on or off."""
+        self.ensure_initialized()
+        if enabled == self.overlay.is_enabled():
+            return
         self.overlay.set_enabled(enabled)
+        self.usage_log.sample()   # Exact on/off times; other changes are sampled
         self.settings.set('enabled', enabled)
-        self.popup.update_toggle_button(enabled)
+        if self.popup is not None:
+            self.popup.update_toggle_button(enabled)
+        self.scheduler.notify_light_enabled(enabled)
     
     def open_panel(self):
         """Toggle the settings panel visibility (for hotkey use)."""
-        if self.popup.isVisible():
+        if self.popup is not None and self.popup.isVisible():
             self.popup.hide()
         else:
             self._show_popup()
     
     def _on_quit(self):
-        self.popup.hide()
+        self.shutdown()
+        self.quitRequested.emit()
+    
+    def shutdown(self):
+        """Stop the watchers, hide every window and the tray icon."""
+        self.settings.remove_reload_listener(self._on_settings_reloaded)
+        self._popup_release_timer.stop()
+        if self._initialized:
+            self.scheduler.set_active(False)
+            self.scheduler.set_auto_off_minutes(0)
+            self.call_watcher.set_active(False)
+            self.power_policy.set_active(False)
+            self.ambient_light.set_active(False)   # No brightness restore: the overlay is going away
+            self.usage_log.close()
+        self.autostart.shutdown()
+        if self.popup is not None:
+            self.popup.hide()
+        if self.diagnostics is not None:
+            self.diagnostics.close()
+        if self.overlay is not None:
+            self.overlay.hide()
+            self.overlay.release_resources()
         self.tray_icon.hide()
-        QApplication.quit()
     
     def show_notification(self, title: str, message: str):
         self.tray_icon.showMessage(title, message, QSystemTrayIcon.Information, 2000)
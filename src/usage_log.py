@@ -0,0 +1,470 @@
+# Edge Light - Usage Log
+# Append-only binary log of light state changes, with incremental daily rollups
+#
+# Each day has a segment file of fixed-size records (usage-YYYYMMDD.bin).
+# rollups.json holds the per-day totals folded so far and a cursor (segment
+# and byte offset), so opening the log or asking for stats only reads the
+# records written since the last fold. Segments past the retention period
+# are deleted; their days stay in the rollups.
+
+import json
+import os
+import queue
+import struct
+import threading
+import time
+from datetime import date, datetime, timedelta
+from typing import Callable, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal
+
+from constants import (
+    USAGE_ROLLUPS_FORMAT, USAGE_SAMPLE_MS, USAGE_HEARTBEAT_SECONDS,
+    USAGE_FLUSH_SECONDS, USAGE_RETENTION_DAYS,
+)
+from log import get_logger
+from metrics import get_metrics
+from render_plan import brightness_to_alpha
+
+_log = get_logger('usage')
+
+_record_count = get_metrics().counter('usage.records')
+_flush_time = get_metrics().histogram('usage.flush')
+
+# time (epoch seconds), flags, brightness, colour temperature, width, coverage (1/10000)
+RECORD = struct.Struct('<dBBHHH')
+SEGMENT_HEADER = struct.Struct('<4sHH')      # magic, version, record size
+SEGMENT_MAGIC = b'ELU1'
+SEGMENT_VERSION = 1
+
+FLAG_ON = 1
+FLAG_SESSION_START = 2     # First record of a run; the previous run may have crashed
+FLAG_SESSION_END = 4       # Clean shutdown
+
+ROLLUPS_FILENAME = "rollups.json"
+
+
+class UsageRecord(NamedTuple):
+    """The light's state from `time` until the next record."""
+    time: float
+    flags: int
+    brightness: int             # After power-saving and policy caps
+    color_temperature: int
+    glow_width: int
+    coverage: float             # Fraction of the screen the ring covers
+
+    @property
+    def on(self) -> bool:
+        return bool(self.flags & FLAG_ON)
+
+    def pack(self) -> bytes:
+        return RECORD.pack(self.time, self.flags, self.brightness, self.color_temperature,
+                           self.glow_width, int(round(self.coverage * 10000)))
+
+    @classmethod
+    def unpack(cls, data: bytes, offset: int = 0) -> 'UsageRecord':
+        t, flags, brightness, temperature, width, coverage = RECORD.unpack_from(data, offset)
+        return cls(t, flags, brightness, temperature, width, coverage / 10000)
+
+    def same_state(self, other: 'UsageRecord') -> bool:
+        return self[1:] == other[1:]
+
+
+def segment_name(timestamp: float) -> str:
+    """Segment file for the (local) day of a timestamp."""
+    return time.strftime("usage-%Y%m%d.bin", time.localtime(timestamp))
+
+
+def segment_day(name: str) -> Optional[date]:
+    """The day a segment file holds, or None if the name isn't a segment's."""
+    try:
+        return datetime.strptime(name, "usage-%Y%m%d.bin").date()
+    except ValueError:
+        return None
+
+
+def read_segment(path: str, offset: int = 0) -> Iterator[Tuple[UsageRecord, int]]:
+    """
+    Records from a byte offset on (0 = after the header), each with the
+    offset just past it. A torn record at the end is ignored.
+    """
+    with open(path, 'rb') as f:
+        header = f.read(SEGMENT_HEADER.size)
+        if len(header) < SEGMENT_HEADER.size:
+            return
+        magic, version, size = SEGMENT_HEADER.unpack(header)
+        if magic != SEGMENT_MAGIC or size != RECORD.size:
+            _log.warning("Skipping %s: not a usage segment (version %d)", path, version)
+            return
+        f.seek(max(offset, SEGMENT_HEADER.size))
+        position = f.tell()
+        data = f.read()
+    usable = len(data) - len(data) % RECORD.size
+    for start in range(0, usable, RECORD.size):
+        yield UsageRecord.unpack(data, start), position + start + RECORD.size
+
+
+def panel_watts_for(record: UsageRecord, panel_watts: float) -> float:
+    """Approximate extra panel power while a record's state holds."""
+    if not record.on:
+        return 0.0
+    return panel_watts * record.coverage * brightness_to_alpha(record.brightness) / 255
+
+
+class DayTotals:
+    """One day's usage."""
+
+    __slots__ = ('on_seconds', 'brightness_seconds', 'energy_wh', 'turned_on', 'sessions')
+
+    def __init__(self, on_seconds=0.0, brightness_seconds=0.0, energy_wh=0.0,
+                 turned_on=0, sessions=0):
+        self.on_seconds = on_seconds
+        self.brightness_seconds = brightness_seconds    # Brightness x seconds, for the average
+        self.energy_wh = energy_wh
+        self.turned_on = turned_on
+        self.sessions = sessions
+
+    @property
+    def average_brightness(self) -> Optional[float]:
+        return self.brightness_seconds / self.on_seconds if self.on_seconds else None
+
+    def copy(self) -> 'DayTotals':
+        return DayTotals(*(getattr(self, name) for name in self.__slots__))
+
+    def to_dict(self) -> dict:
+        return {name: round(getattr(self, name), 3) for name in self.__slots__}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'DayTotals':
+        return cls(*(data.get(name, 0) for name in cls.__slots__))
+
+    def __repr__(self):
+        return (f"DayTotals(on={self.on_seconds / 3600:.2f} h, "
+                f"avg={self.average_brightness}, {self.energy_wh:.1f} Wh)")
+
+
+class UsageRollups:
+    """
+    Per-day totals folded from the records, plus the cursor: the last
+    record folded and where the next one starts.
+    """
+
+    def __init__(self, panel_watts: float):
+        self.panel_watts = panel_watts
+        self.days: Dict[str, DayTotals] = {}
+        self.last: Optional[UsageRecord] = None
+        self.segment: Optional[str] = None
+        self.offset = 0
+
+    def fold(self, record: UsageRecord) -> None:
+        """Account for the time between the previous record and this one."""
+        last = self.last
+        if record.flags & FLAG_SESSION_START:
+            self._day(record.time).sessions += 1
+        if last is not None:
+            end = record.time
+            if record.flags & FLAG_SESSION_START and not last.flags & FLAG_SESSION_END:
+                # The previous run ended without saying so: trust it only
+                # up to the heartbeat it would have written next
+                end = min(end, last.time + USAGE_HEARTBEAT_SECONDS)
+            self._add_interval(last, end)
+        if record.on and (last is None or not last.on or record.flags & FLAG_SESSION_START):
+            self._day(record.time).turned_on += 1
+        self.last = record
+
+    def with_open_interval(self, now: float) -> Dict[str, DayTotals]:
+        """Totals including the time since the last record (which is still running)."""
+        saved = self.days
+        self.days = {day: totals.copy() for day, totals in saved.items()}
+        try:
+            if self.last is not None and not self.last.flags & FLAG_SESSION_END:
+                self._add_interval(self.last, now)
+            return self.days
+        finally:
+            self.days = saved
+
+    def _add_interval(self, record: UsageRecord, end: float) -> None:
+        if not record.on or end <= record.time:
+            return
+        watts = panel_watts_for(record, self.panel_watts)
+        start = record.time
+        while start < end:
+            day = datetime.fromtimestamp(start).date()
+            midnight = datetime.combine(day + timedelta(days=1), datetime.min.time()).timestamp()
+            stop = min(end, midnight)
+            seconds = stop - start
+            totals = self._day(start)
+            totals.on_seconds += seconds
+            totals.brightness_seconds += record.brightness * seconds
+            totals.energy_wh += watts * seconds / 3600
+            start = stop
+
+    def _day(self, timestamp: float) -> DayTotals:
+        key = datetime.fromtimestamp(timestamp).date().isoformat()
+        totals = self.days.get(key)
+        if totals is None:
+            totals = self.days[key] = DayTotals()
+        return totals
+
+    def catch_up(self, directory: str) -> int:
+        """Fold the records written after the cursor. Returns how many there were."""
+        try:
+            names = sorted(n for n in os.listdir(directory) if segment_day(n) is not None)
+        except OSError:
+            return 0
+        folded = 0
+        for name in names:
+            if self.segment is not None and name < self.segment:
+                continue    # Folded already
+            offset = self.offset if name == self.segment else 0
+            for record, end in read_segment(os.path.join(directory, name), offset):
+                self.fold(record)
+                self.segment, self.offset = name, end
+                folded += 1
+        return folded
+
+    def to_dict(self) -> dict:
+        return {
+            'format': USAGE_ROLLUPS_FORMAT,
+            'segment': self.segment,
+            'offset': self.offset,
+            'last': list(self.last) if self.last is not None else None,
+            'days': {day: totals.to_dict() for day, totals in sorted(self.days.items())},
+        }
+
+    @classmethod
+    def load(cls, path: str, panel_watts: float) -> 'UsageRollups':
+        """Read saved rollups (empty ones if missing or unreadable)."""
+        rollups = cls(panel_watts)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('format') != USAGE_ROLLUPS_FORMAT:
+                raise ValueError(f"unknown format {data.get('format')!r}")
+            rollups.days = {day: DayTotals.from_dict(t) for day, t in data['days'].items()}
+            rollups.segment = data['segment']
+            rollups.offset = int(data['offset'])
+            rollups.last = UsageRecord(*data['last']) if data['last'] else None
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            _log.warning("Rebuilding usage rollups (%s)", e)
+            rollups = cls(panel_watts)
+        return rollups
+
+
+class _UsageWriter(threading.Thread):
+    """
+    Appends records to the day's segment in batches, folds them into the
+    rollups and saves those, off the GUI thread. Also catches up and
+    rotates old segments when it starts.
+    """
+
+    def __init__(self, directory: str, panel_watts: float,
+                 flush_seconds: float = USAGE_FLUSH_SECONDS):
+        super().__init__(name="edgelight-usage", daemon=True)
+        self.queue = queue.SimpleQueue()
+        self.directory = directory
+        self.flush_seconds = flush_seconds
+        self.lock = threading.Lock()       # Guards rollups
+        self.rollups = UsageRollups(panel_watts)
+        self._pending: List[UsageRecord] = []
+
+    def run(self):
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            rollups = UsageRollups.load(self._rollups_path(), self.rollups.panel_watts)
+            folded = rollups.catch_up(self.directory)
+            with self.lock:
+                self.rollups = rollups
+            if folded:
+                _log.info("Folded %d usage records written after the last rollup", folded)
+                self._save_rollups()
+            self._rotate()
+        except OSError as e:
+            _log.error("Usage log unavailable: %s", e)
+
+        while True:
+            try:
+                item = self.queue.get(timeout=self.flush_seconds)
+            except queue.Empty:
+                self._flush()
+                continue
+            if item is None:
+                self._flush()
+                break
+            if callable(item):
+                self._flush()
+                item()      # A flush() notification
+                continue
+            self._pending.append(item)
+
+    def _flush(self):
+        if not self._pending:
+            return
+        records, self._pending = self._pending, []
+        started = time.perf_counter()
+        rotate = False
+        try:
+            for name, batch in self._by_segment(records):
+                path = os.path.join(self.directory, name)
+                with open(path, 'ab') as f:
+                    if f.tell() == 0:
+                        f.write(SEGMENT_HEADER.pack(SEGMENT_MAGIC, SEGMENT_VERSION, RECORD.size))
+                    f.write(b"".join(record.pack() for record in batch))
+                    end = f.tell()
+                with self.lock:
+                    rotate = rotate or name != self.rollups.segment
+                    for record in batch:
+                        self.rollups.fold(record)
+                    self.rollups.segment, self.rollups.offset = name, end
+            self._save_rollups()
+            if rotate:
+                self._rotate()
+        except OSError as e:
+            _log.error("Could not write usage log: %s", e)
+        _record_count.inc(len(records))
+        _flush_time.observe(time.perf_counter() - started)
+
+    @staticmethod
+    def _by_segment(records: List[UsageRecord]):
+        """Consecutive records grouped by the segment (day) they belong in."""
+        batch: List[UsageRecord] = []
+        name = None
+        for record in records:
+            record_segment = segment_name(record.time)
+            if record_segment != name and batch:
+                yield name, batch
+                batch = []
+            name = record_segment
+            batch.append(record)
+        if batch:
+            yield name, batch
+
+    def _save_rollups(self):
+        with self.lock:
+            data = self.rollups.to_dict()
+        temp_path = self._rollups_path() + ".tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, separators=(',', ':'))
+        os.replace(temp_path, self._rollups_path())
+
+    def _rotate(self):
+        """Delete folded segments older than the retention period."""
+        cutoff = date.today() - timedelta(days=USAGE_RETENTION_DAYS)
+        with self.lock:
+            current = self.rollups.segment
+        for name in os.listdir(self.directory):
+            day = segment_day(name)
+            if day is not None and day < cutoff and (current is None or name < current):
+                try:
+                    os.remove(os.path.join(self.directory, name))
+                    _log.debug("Rotated out %s", name)
+                except OSError as e:
+                    _log.warning("Could not remove %s: %s", name, e)
+
+    def _rollups_path(self) -> str:
+        return os.path.join(self.directory, ROLLUPS_FILENAME)
+
+
+class UsageLog(QObject):
+    """
+    Samples the light's state and logs a record whenever it changes, plus
+    a heartbeat while the light stays on (so a crash loses at most one
+    heartbeat interval of on-time). Call sample() right after toggles for
+    exact on/off times; everything else is picked up by the sampling timer.
+    """
+
+    # Everything queued before the last flush() call has been folded
+    flushed = pyqtSignal()
+
+    def __init__(self, state_source: Callable[[], tuple], directory: str,
+                 panel_watts: float, sample_ms: int = USAGE_SAMPLE_MS,
+                 clock: Callable[[], float] = time.time, parent=None):
+        """state_source returns (on, brightness, colour temperature, width, coverage)."""
+        super().__init__(parent)
+
+        self.directory = directory
+        self._state_source = state_source
+        self._clock = clock
+        self._writer: Optional[_UsageWriter] = None
+        self._panel_watts = panel_watts
+        self._last: Optional[UsageRecord] = None
+
+        self._timer = QTimer(self)
+        self._timer.setInterval(sample_ms)
+        self._timer.timeout.connect(self.sample)
+
+    def start(self) -> None:
+        """Open the log (catch-up and rotation run on the writer thread)."""
+        if self._writer is not None:
+            return
+        self._writer = _UsageWriter(self.directory, self._panel_watts)
+        self._writer.start()
+        self._log_state(FLAG_SESSION_START)
+        self._timer.start()
+
+    def close(self) -> None:
+        """Log the end of the session, write everything out and stop the writer."""
+        if self._writer is None:
+            return
+        self._timer.stop()
+        self._log_state(FLAG_SESSION_END, force_off=True)
+        writer, self._writer = self._writer, None
+        writer.queue.put(None)
+        writer.join(timeout=2.0)
+
+    def is_active(self) -> bool:
+        return self._writer is not None
+
+    def set_panel_watts(self, watts: float) -> None:
+        """Power model for records folded from now on (past days keep theirs)."""
+        self._panel_watts = watts
+        if self._writer is not None:
+            with self._writer.lock:
+                self._writer.rollups.panel_watts = watts
+
+    def sample(self) -> None:
+        """Log the current state if it changed, or a heartbeat if one is due."""
+        if self._writer is not None:
+            self._log_state(0)
+
+    def flush(self) -> None:
+        """
+        Have the writer write and fold the queued records now. Doesn't
+        block: `flushed` is emitted once that's done, after any catch-up.
+        """
+        if self._writer is not None:
+            self._writer.queue.put(self.flushed.emit)
+
+    def stats(self, days: int = 7) -> List[Tuple[str, DayTotals]]:
+        """
+        Totals for the last `days` days (oldest first) as folded so far,
+        including the running interval. Doesn't wait for the writer, so
+        they can be up to a flush interval behind; call flush() and read
+        them again on `flushed` for current ones.
+        """
+        writer = self._writer
+        if writer is None:
+            return []
+        with writer.lock:
+            totals = writer.rollups.with_open_interval(self._clock())
+        today = datetime.fromtimestamp(self._clock()).date()
+        keys = [(today - timedelta(days=n)).isoformat() for n in range(days - 1, -1, -1)]
+        return [(key, totals.get(key) or DayTotals()) for key in keys]
+
+    def _log_state(self, flags: int, force_off: bool = False) -> None:
+        on, brightness, temperature, width, coverage = self._state_source()
+        if on and not force_off:
+            flags |= FLAG_ON
+        record = UsageRecord(self._clock(), flags, int(round(brightness)),
+                             int(round(temperature)), int(width), coverage)
+        last = self._last
+        if (flags & (FLAG_SESSION_START | FLAG_SESSION_END)) == 0 and last is not None:
+            heartbeat_due = record.on and record.time - last.time >= USAGE_HEARTBEAT_SECONDS
+            if record.same_state(last) and not heartbeat_due:
+                return
+            if not record.on and not last.on:
+                return      # Changes while off cost nothing
+        self._last = record
+        self._writer.queue.put(record)
@@ -0,0 +1,149 @@
+# Edge Light - Event Loop Stall Watchdog
+# Detects GUI thread stalls and records what the main thread was doing
+
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from typing import List, Optional
+
+from PyQt5.QtCore import QObject, QTimer
+
+from constants import (
+    WATCHDOG_HEARTBEAT_MS, WATCHDOG_MAX_ENTRIES, WATCHDOG_MAX_LOG_BYTES,
+)
+from log import get_logger
+from metrics import get_metrics
+
+STALL_BUCKETS_MS = (100, 250, 500, 1000, 2000, 5000, 10000, 30000)
+
+_log = get_logger('watchdog')
+
+
+class StallRecord:
+    """One detected stall: when, how long, and the main thread's stack."""
+
+    __slots__ = ('started_at', 'duration_ms', 'stack')
+
+    def __init__(self, started_at: float, stack: str):
+        self.started_at = started_at
+        self.duration_ms: Optional[float] = None   # Filled in once the loop recovers
+        self.stack = stack
+
+    def format(self) -> str:
+        when = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(self.started_at))
+        duration = "ongoing" if self.duration_ms is None else f"{self.duration_ms:.0f} ms"
+        return f"[{when}] GUI thread stalled ({duration})\n{self.stack}"
+
+
+class StallWatchdog(QObject):
+    """
+    A QTimer on the GUI thread bumps a heartbeat; a daemon thread checks it.
+    When the heartbeat is older than the threshold, the watchdog grabs the
+    main thread's Python stack via sys._current_frames() - that is the code
+    that was blocking the event loop.
+    """
+
+    def __init__(self, threshold_ms: int, log_path: Optional[str] = None,
+                 heartbeat_ms: int = WATCHDOG_HEARTBEAT_MS,
+                 max_entries: int = WATCHDOG_MAX_ENTRIES,
+                 max_log_bytes: int = WATCHDOG_MAX_LOG_BYTES, parent=None):
+        super().__init__(parent)
+
+        self._threshold = threshold_ms / 1000.0
+        self._log_path = log_path
+        self._max_log_bytes = max_log_bytes
+        self._records = deque(maxlen=max_entries)
+
+        self._main_ident = threading.main_thread().ident
+        self._last_beat = time.monotonic()
+        self._current: Optional[StallRecord] = None
+        self._recovered = deque()    # Finished stalls, logged by the watcher thread
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        self._stall_count = get_metrics().counter('watchdog.stalls')
+        self._stall_time = get_metrics().histogram('watchdog.stall', STALL_BUCKETS_MS)
+
+        self._timer = QTimer(self)
+        self._timer.setInterval(heartbeat_ms)
+        self._timer.timeout.connect(self._beat)
+
+    def start(self) -> None:
+        """Start the heartbeat and the watcher thread."""
+        if self._thread is not None:
+            return
+        self._last_beat = time.monotonic()
+        self._stop_event.clear()
+        self._timer.start()
+        self._thread = threading.Thread(
+            target=self._watch, name="edgelight-watchdog", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop watching."""
+        self._timer.stop()
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+
+    def records(self) -> List[StallRecord]:
+        """Recent stalls, oldest first."""
+        return list(self._records)
+
+    def _beat(self) -> None:
+        """GUI thread: prove the event loop is alive, close any open stall (no I/O here)."""
+        now = time.monotonic()
+        record = self._current
+        if record is not None:
+            self._current = None
+            stalled = now - self._last_beat
+            record.duration_ms = stalled * 1000.0
+            self._stall_time.observe(stalled)
+            self._recovered.append(record)
+        self._last_beat = now
+
+    def _watch(self) -> None:
+        """Watcher thread: sample the main stack when the heartbeat is late, write the log."""
+        check_interval = max(0.02, self._threshold / 4)
+        while not self._stop_event.wait(check_interval):
+            while self._recovered:
+                record = self._recovered.popleft()
+                self._append_to_log(f"  ... recovered after {record.duration_ms:.0f} ms\n")
+
+            if self._current is not None:
+                continue
+            late = time.monotonic() - self._last_beat
+            if late < self._threshold:
+                continue
+
+            frame = sys._current_frames().get(self._main_ident)
+            stack = "".join(traceback.format_stack(frame)) if frame else "(no frame)\n"
+            del frame
+
+            record = StallRecord(time.time() - late, stack)
+            self._records.append(record)
+            self._current = record
+            self._stall_count.inc()
+            # Written now, so a stall that never ends still leaves a trace
+            self._append_to_log(record.format())
+
+    def _append_to_log(self, text: str) -> None:
+        """Append to the stall log, keeping only the newest part of it."""
+        if not self._log_path:
+            return
+        try:
+            with open(self._log_path, 'a', encoding='utf-8') as f:
+                f.write(text)
+            if os.path.getsize(self._log_path) > self._max_log_bytes:
+                with open(self._log_path, 'rb') as f:
+                    f.seek(-self._max_log_bytes // 2, os.SEEK_END)
+                    tail = f.read()
+                with open(self._log_path, 'wb') as f:
+                    f.write(tail)
+        except (IOError, OSError) as e:
+            _log.warning("Could not write stall log: %s", e)